@@ -0,0 +1,66 @@
+"""
+Skill Memory Benchmark
+Compare bytes per skill for Skill dataclasses and the compact SkillStore
+
+Usage (from backend/): python -m scripts.benchmark_skill_memory [count]
+"""
+import gc
+import sys
+import tracemalloc
+
+from src.services.skill_registry import Skill, SkillRegistry
+from src.services.skill_store import SkillStore
+
+AUTHORS = ["steipete", "arnarsson", "seyhunak", "athena", "community"]
+TAGS = ["search", "web", "api", "git", "docker", "ai", "ui", "cli", "data", "devops"]
+
+
+def make_skills(count: int):
+    """Generate a realistic-looking catalog with repeated categories, authors and tags"""
+    categories = list(SkillRegistry.CATEGORIES)
+    for i in range(count):
+        yield Skill(
+            id=f"skill-{i}",
+            name=f"Skill {i}",
+            description=f"Generated skill number {i} used to measure registry memory usage",
+            category=categories[i % len(categories)],
+            author=AUTHORS[i % len(AUTHORS)],
+            tags=[TAGS[i % len(TAGS)], TAGS[(i * 7) % len(TAGS)]]
+        )
+
+
+def measure(build) -> int:
+    """Bytes allocated by ``build`` and still held by its result"""
+    gc.collect()
+    tracemalloc.start()
+    container = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del container
+    return size
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    def build_dataclasses():
+        return {skill.id: skill for skill in make_skills(count)}
+
+    def build_store():
+        store = SkillStore(Skill)
+        for skill in make_skills(count):
+            store.put(skill)
+        return store
+
+    before = measure(build_dataclasses)
+    after = measure(build_store)
+
+    print(f"skills:            {count}")
+    print(f"dataclass dict:    {before / count:8.1f} bytes/skill")
+    print(f"compact store:     {after / count:8.1f} bytes/skill")
+    print(f"reduction:         {100 * (1 - after / before):8.1f} %")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,181 @@
 """
 Agents API Router
 """
-from fastapi import APIRouter, HTTPException, Request, Query
-from typing import Optional, List
-from pydantic import BaseModel
+
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Request,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict, Optional, List
+from pydantic import BaseModel, Field, model_validator
+import asyncio
+
+import orjson
+
+from src.api.responses import json_response
+from src.api.skills import install_with_dependencies
+from src.config.settings import settings
+from src.services.task_events import Subscription
+from src.services.task_scheduler import SchedulerFullError
 
 router = APIRouter()
 
 
 class TaskRequest(BaseModel):
-    """Task request model"""
-    agent_id: str
+    """
+    Task request model
+
+    Without ``agent_id`` the task is routed to an agent that has every
+    listed skill and, if given, the agent type.
+    """
+
+    agent_id: Optional[str] = None
     input: str
+    skills: List[str] = []
+    agent_type: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_target(self) -> "TaskRequest":
+        if self.agent_id is None and not self.skills and self.agent_type is None:
+            raise ValueError("Either agent_id or skills/agent_type is required")
+        return self
+
+
+class BatchTaskRequest(BaseModel):
+    """Batch task request model"""
+
+    tasks: List[TaskRequest] = Field(
+        ..., min_length=1, max_length=settings.TASK_BATCH_MAX_SIZE
+    )
+    priority: int = Field(0, ge=-100, le=100)
+    wait: bool = True
+    stream: bool = False
 
 
 class TaskResponse(BaseModel):
     """Task response model"""
+
     task_id: str
     status: str
     output: Optional[str] = None
 
 
+def _sse_frame(event: str, data: bytes) -> bytes:
+    """Encode a Server-Sent Events frame"""
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+
+async def _sse_events(
+    subscription: Subscription, snapshot: bytes, until_final: bool
+) -> AsyncIterator[bytes]:
+    """Stream a snapshot and then subscribed events as Server-Sent Events"""
+    with subscription:
+        yield snapshot
+        while True:
+            event = await subscription.get(timeout=settings.TASK_STREAM_HEARTBEAT)
+            if event is None:
+                if subscription.overflowed:
+                    yield _sse_frame("overflow", b"{}")
+                    return
+                yield b": keep-alive\n\n"
+                continue
+            yield event.sse
+            if until_final and event.final:
+                return
+
+
+async def _forward_events(
+    websocket: WebSocket,
+    subscription: Subscription,
+    snapshot: str,
+    until_final: bool,
+    finished: bool = False,
+) -> None:
+    """
+    Send a snapshot and then subscribed events over a WebSocket.
+
+    With ``finished`` the snapshot is already final and the socket is
+    closed right after it.
+    """
+    with subscription:
+        await websocket.accept()
+        # Watch for the client going away while waiting for events
+        receiver = asyncio.ensure_future(websocket.receive())
+        try:
+            await websocket.send_text(snapshot)
+            while not finished:
+                getter = asyncio.ensure_future(
+                    subscription.get(timeout=settings.TASK_STREAM_HEARTBEAT)
+                )
+                await asyncio.wait(
+                    {getter, receiver}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if receiver.done():
+                    getter.cancel()
+                    if receiver.result()["type"] == "websocket.disconnect":
+                        return
+                    # Messages from the client are ignored
+                    receiver = asyncio.ensure_future(websocket.receive())
+                    continue
+
+                event = getter.result()
+                if event is None:
+                    if subscription.overflowed:
+                        await websocket.close(code=1013)
+                        return
+                    await websocket.send_text('{"event":"heartbeat"}')
+                    continue
+                await websocket.send_text(event.text)
+                if until_final and event.final:
+                    break
+            await websocket.close()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            receiver.cancel()
+
+
+async def _resolve_agent(
+    orchestrator, req: TaskRequest, assigned: Optional[Dict[str, int]] = None
+) -> Optional[str]:
+    """The requested agent, or the one the task is routed to"""
+    if req.agent_id is not None:
+        return req.agent_id
+    return await orchestrator.route_task(req.skills, req.agent_type, assigned)
+
+
+def _routing_target(req: TaskRequest) -> str:
+    if req.agent_id is not None:
+        return req.agent_id
+    target = f"skills={','.join(req.skills)}" if req.skills else ""
+    if req.agent_type is not None:
+        target += f"{' ' if target else ''}type={req.agent_type}"
+    return target
+
+
+def _task_snapshot(task) -> bytes:
+    """Current state of a task as the first event of a stream"""
+    return orjson.dumps({"event": "snapshot", **task.to_dict()})
+
+
 @router.get("/")
 async def list_agents(request: Request):
     """List all available agents"""
     orchestrator = request.app.state.agent_orchestrator
     agents = await orchestrator.get_all_agents()
-    
-    return {
-        "total": len(agents),
-        "agents": [agent.to_dict() for agent in agents]
-    }
+
+    return json_response(
+        request,
+        {
+            "total": len(agents),
+            "agents": [orjson.Fragment(agent.to_json()) for agent in agents],
+        },
+    )
 
 
 @router.get("/stats")
@@ -38,7 +183,7 @@ async def get_agent_stats(request: Request):
     """Get aggregated agent statistics"""
     orchestrator = request.app.state.agent_orchestrator
     stats = await orchestrator.get_agent_stats()
-    
+
     return stats
 
 
@@ -47,48 +192,178 @@ async def get_agent(agent_id: str, request: Request):
     """Get a specific agent by ID"""
     orchestrator = request.app.state.agent_orchestrator
     agent = await orchestrator.get_agent(agent_id)
-    
+
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
-    
-    return agent.to_dict()
+
+    return json_response(request, agent.to_json())
 
 
 @router.post("/task")
 async def create_task(req: TaskRequest, request: Request):
-    """Create a new task for an agent"""
+    """Create a new task for an agent, or for one matching its skills"""
     orchestrator = request.app.state.agent_orchestrator
-    
-    task = await orchestrator.create_task(req.agent_id, req.input)
-    
+
+    agent_id = await _resolve_agent(orchestrator, req)
+    if agent_id is None:
+        raise HTTPException(
+            status_code=404, detail=f"No agent matches {_routing_target(req)}"
+        )
+
+    task = await orchestrator.create_task(agent_id, req.input)
+
     if not task:
         raise HTTPException(status_code=404, detail="Agent not found")
-    
+
     return {
         "task_id": task.id,
         "agent_id": task.agent_id,
         "status": task.status,
-        "created_at": task.created_at.isoformat()
+        "created_at": task.created_at.isoformat(),
     }
 
 
-@router.post("/task/{task_id}/execute")
-async def execute_task(task_id: str, request: Request):
-    """Execute a pending task"""
+@router.post("/tasks/batch")
+async def create_task_batch(req: BatchTaskRequest, request: Request):
+    """
+    Create and run many tasks in one call.
+
+    Either every task is created and queued or none is. With ``wait`` the
+    response holds every task once all have finished, in request order;
+    with ``stream`` each task is sent as a JSON line as soon as it
+    finishes; otherwise the queued tasks are returned immediately.
+    """
+    orchestrator = request.app.state.agent_orchestrator
+
+    # Hold queue room for the whole batch before creating any task
+    try:
+        reservation = orchestrator.reserve(len(req.tasks))
+    except SchedulerFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    with reservation:
+        assigned: Dict[str, int] = {}
+        agent_ids = [
+            await _resolve_agent(orchestrator, item, assigned) for item in req.tasks
+        ]
+
+        tasks = None
+        if None not in agent_ids:
+            tasks = await orchestrator.create_tasks(
+                [(agent_id, item.input) for agent_id, item in zip(agent_ids, req.tasks)]
+            )
+        if tasks is None:
+            missing = []
+            for agent_id, item in zip(agent_ids, req.tasks):
+                if agent_id is None or not await orchestrator.get_agent(agent_id):
+                    target = _routing_target(item)
+                    if target not in missing:
+                        missing.append(target)
+            raise HTTPException(
+                status_code=404, detail=f"Agents not found: {', '.join(missing)}"
+            )
+
+        await orchestrator.submit_tasks(
+            tasks, priority=req.priority, reservation=reservation
+        )
+
+    if req.stream:
+
+        async def stream_results():
+            async for task in orchestrator.as_completed(tasks):
+                yield orjson.dumps(task.to_dict()) + b"\n"
+
+        return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+    if req.wait:
+        for task in tasks:
+            await orchestrator.wait_task(task)
+
+    results = [task.to_dict() for task in tasks]
+    return json_response(
+        request,
+        {
+            "total": len(results),
+            "completed": sum(1 for task in tasks if task.status == "completed"),
+            "failed": sum(1 for task in tasks if task.status == "failed"),
+            "tasks": results,
+        },
+    )
+
+
+@router.get("/task/{task_id}")
+async def get_task(task_id: str, request: Request):
+    """Get the status and output of a task"""
     orchestrator = request.app.state.agent_orchestrator
-    
-    task = await orchestrator.execute_task(task_id)
-    
+    task = await orchestrator.get_task(task_id)
+
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    
-    return {
-        "task_id": task.id,
-        "status": task.status,
-        "output": task.output,
-        "error": task.error,
-        "completed_at": task.completed_at.isoformat() if task.completed_at else None
-    }
+
+    return task.to_dict()
+
+
+@router.post("/task/{task_id}/execute", status_code=202)
+async def execute_task(
+    task_id: str, request: Request, priority: int = Query(0, ge=-100, le=100)
+):
+    """Queue a pending task for execution; poll the task for its result"""
+    orchestrator = request.app.state.agent_orchestrator
+
+    try:
+        task = await orchestrator.submit_task(task_id, priority=priority)
+    except SchedulerFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    return task.to_dict()
+
+
+@router.get("/task/{task_id}/events")
+async def stream_task_events(task_id: str, request: Request):
+    """Stream a task's status changes and output as Server-Sent Events"""
+    orchestrator = request.app.state.agent_orchestrator
+
+    # Subscribe before reading the task so no transition is missed
+    subscription = orchestrator.subscribe_task(task_id)
+    task = await orchestrator.get_task(task_id)
+    if not task:
+        subscription.close()
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    snapshot = _sse_frame("snapshot", _task_snapshot(task))
+    if task.status in ("completed", "failed"):
+        subscription.close()
+        return StreamingResponse(iter([snapshot]), media_type="text/event-stream")
+
+    return StreamingResponse(
+        _sse_events(subscription, snapshot, until_final=True),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/task/{task_id}/ws")
+async def task_events_socket(websocket: WebSocket, task_id: str):
+    """Stream a task's status changes and output over a WebSocket"""
+    orchestrator = websocket.app.state.agent_orchestrator
+
+    subscription = orchestrator.subscribe_task(task_id)
+    task = await orchestrator.get_task(task_id)
+    if not task:
+        subscription.close()
+        await websocket.close(code=4404)
+        return
+
+    await _forward_events(
+        websocket,
+        subscription,
+        _task_snapshot(task).decode(),
+        until_final=True,
+        finished=task.status in ("completed", "failed"),
+    )
 
 
 @router.get("/{agent_id}/skills")
@@ -96,12 +371,83 @@ async def get_agent_skills(agent_id: str, request: Request):
     """Get skills assigned to an agent"""
     orchestrator = request.app.state.agent_orchestrator
     agent = await orchestrator.get_agent(agent_id)
-    
+
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
-    
+
     return {
         "agent_id": agent_id,
         "agent_name": agent.name,
-        "skills": agent.config.skills
+        "skills": agent.config.skills,
+    }
+
+
+@router.post("/{agent_id}/skills/install")
+async def install_agent_skills(agent_id: str, request: Request):
+    """
+    Install the skills assigned to an agent, with dependencies.
+
+    Assigned skills that are not in the catalog are skipped and reported
+    as ``missing``.
+    """
+    orchestrator = request.app.state.agent_orchestrator
+    agent = await orchestrator.get_agent(agent_id)
+
+    if not agent:
+        raise HTTPException(status_code=404, detail="Agent not found")
+
+    registry = request.app.state.skill_registry
+    available: List[str] = []
+    missing: List[str] = []
+    for skill_id in agent.config.skills:
+        if await registry.get_skill(skill_id):
+            available.append(skill_id)
+        else:
+            missing.append(skill_id)
+
+    installed = await install_with_dependencies(registry, available)
+
+    return {
+        "agent_id": agent_id,
+        "status": "partial" if missing else "installed",
+        "installed": installed,
+        "missing": missing,
+        "total": len(installed),
     }
+
+
+@router.get("/{agent_id}/events")
+async def stream_agent_events(agent_id: str, request: Request):
+    """Stream status changes and output of every task of an agent as Server-Sent Events"""
+    orchestrator = request.app.state.agent_orchestrator
+    agent = await orchestrator.get_agent(agent_id)
+
+    if not agent:
+        raise HTTPException(status_code=404, detail="Agent not found")
+
+    snapshot = _sse_frame("snapshot", agent.to_json())
+    return StreamingResponse(
+        _sse_events(
+            orchestrator.subscribe_agent(agent_id), snapshot, until_final=False
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/{agent_id}/ws")
+async def agent_events_socket(websocket: WebSocket, agent_id: str):
+    """Stream status changes and output of every task of an agent over a WebSocket"""
+    orchestrator = websocket.app.state.agent_orchestrator
+    agent = await orchestrator.get_agent(agent_id)
+
+    if not agent:
+        await websocket.close(code=4404)
+        return
+
+    await _forward_events(
+        websocket,
+        orchestrator.subscribe_agent(agent_id),
+        agent.to_json().decode(),
+        until_final=False,
+    )
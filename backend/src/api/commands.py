@@ -1,16 +1,21 @@
 """
 Commands API Router - Slash Commands
 """
+
 from fastapi import APIRouter, HTTPException, Request
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel
 from enum import Enum
 
+from src.services.dependency_resolver import DependencyError
+from src.services.skill_executor import run_skill
+
 router = APIRouter()
 
 
 class CommandType(str, Enum):
     """Available slash command types"""
+
     SEARCH = "search"
     INSTALL = "install"
     RUN = "run"
@@ -27,61 +32,63 @@ SLASH_COMMANDS = {
         "description": "Search for skills in the registry",
         "usage": "/search <query>",
         "example": "/search web scraping",
-        "category": "discovery"
+        "category": "discovery",
     },
     "install": {
         "name": "/install",
         "description": "Install a skill from the registry",
         "usage": "/install <skill-slug>",
         "example": "/install brave-search",
-        "category": "management"
+        "category": "management",
     },
     "run": {
         "name": "/run",
         "description": "Run a skill with given input",
         "usage": "/run <skill-slug> <input>",
         "example": "/run brave-search 'AI news'",
-        "category": "execution"
+        "category": "execution",
     },
     "list": {
         "name": "/list",
         "description": "List installed skills or available agents",
         "usage": "/list [skills|agents]",
         "example": "/list skills",
-        "category": "discovery"
+        "category": "discovery",
     },
     "help": {
         "name": "/help",
         "description": "Get help for a command or skill",
         "usage": "/help [command|skill]",
         "example": "/help search",
-        "category": "utility"
+        "category": "utility",
     },
     "status": {
         "name": "/status",
         "description": "Check system or agent status",
         "usage": "/status [agent-id]",
         "example": "/status coding-agent",
-        "category": "monitoring"
+        "category": "monitoring",
     },
     "config": {
         "name": "/config",
         "description": "View or modify configuration",
         "usage": "/config [key] [value]",
         "example": "/config timeout 30",
-        "category": "management"
-    }
+        "category": "management",
+    },
 }
 
 
 class CommandRequest(BaseModel):
     """Command execution request"""
+
     command: str
     args: Optional[List[str]] = []
 
 
 class CommandResponse(BaseModel):
     """Command execution response"""
+
     command: str
     status: str
     result: Optional[Dict[str, Any]] = None
@@ -91,10 +98,7 @@ class CommandResponse(BaseModel):
 @router.get("/")
 async def list_commands():
     """List all available slash commands"""
-    return {
-        "total": len(SLASH_COMMANDS),
-        "commands": SLASH_COMMANDS
-    }
+    return {"total": len(SLASH_COMMANDS), "commands": SLASH_COMMANDS}
 
 
 @router.get("/{command_name}")
@@ -102,7 +106,7 @@ async def get_command(command_name: str):
     """Get details for a specific command"""
     if command_name not in SLASH_COMMANDS:
         raise HTTPException(status_code=404, detail="Command not found")
-    
+
     return SLASH_COMMANDS[command_name]
 
 
@@ -110,93 +114,102 @@ async def get_command(command_name: str):
 async def execute_command(req: CommandRequest, request: Request):
     """Execute a slash command"""
     command = req.command.lstrip("/").lower()
-    
+
     if command not in SLASH_COMMANDS:
         raise HTTPException(
-            status_code=400, 
-            detail=f"Unknown command: /{command}. Use /help for available commands."
+            status_code=400,
+            detail=f"Unknown command: /{command}. Use /help for available commands.",
         )
-    
+
     result = await _execute_command(command, req.args, request)
-    
+
     return {
         "command": f"/{command}",
         "status": "success" if not result.get("error") else "error",
-        "result": result
+        "result": result,
     }
 
 
 async def _execute_command(
-    command: str, 
-    args: List[str], 
-    request: Request
+    command: str, args: List[str], request: Request
 ) -> Dict[str, Any]:
     """Internal command execution logic"""
-    
+
     if command == "search":
         if not args:
             return {"error": "Please provide a search query"}
-        
+
         registry = request.app.state.skill_registry
         query = " ".join(args)
-        skills = await registry.search_skills(query=query, limit=10)
-        
+        result = await registry.query_skills(
+            query=query, limit=10, ranked=True, substring=True
+        )
+
         return {
             "query": query,
-            "results": [{"id": s.id, "name": s.name, "description": s.description} 
-                       for s in skills]
+            "total": result.total,
+            "results": [
+                {"id": s.id, "name": s.name, "description": s.description}
+                for s in result.skills
+            ],
         }
-    
+
     elif command == "install":
         if not args:
             return {"error": "Please provide a skill slug"}
-        
+
         skill_id = args[0]
         registry = request.app.state.skill_registry
-        success = await registry.install_skill(skill_id)
-        
+        try:
+            success = await registry.install_skill(skill_id)
+        except DependencyError as e:
+            return {"error": str(e)}
+
         if success:
             return {"message": f"Successfully installed {skill_id}"}
         else:
             return {"error": f"Skill '{skill_id}' not found"}
-    
+
     elif command == "list":
         target = args[0] if args else "skills"
-        
+
         if target == "skills":
             registry = request.app.state.skill_registry
             count = await registry.count()
             return {"type": "skills", "total": count}
-        
+
         elif target == "agents":
             orchestrator = request.app.state.agent_orchestrator
             agents = await orchestrator.get_all_agents()
             return {
                 "type": "agents",
                 "total": len(agents),
-                "agents": [{"id": a.id, "name": a.name, "status": a.status.value} 
-                          for a in agents]
+                "agents": [
+                    {"id": a.id, "name": a.name, "status": a.status.value}
+                    for a in agents
+                ],
             }
         else:
             return {"error": f"Unknown target: {target}"}
-    
+
     elif command == "status":
         orchestrator = request.app.state.agent_orchestrator
-        
+
         if args:
             agent = await orchestrator.get_agent(args[0])
             if agent:
                 return {
                     "agent_id": agent.id,
                     "status": agent.status.value,
-                    "task_count": agent.task_count
+                    "task_count": agent.task_count,
+                    **await orchestrator.get_agent_metrics(agent.id),
                 }
             else:
                 return {"error": f"Agent '{args[0]}' not found"}
-        
+
         stats = await orchestrator.get_agent_stats()
         return {"system_status": "operational", **stats}
-    
+
     elif command == "help":
         if args:
             cmd_name = args[0].lstrip("/")
@@ -204,12 +217,12 @@ async def _execute_command(
                 return SLASH_COMMANDS[cmd_name]
             else:
                 return {"error": f"Unknown command: {cmd_name}"}
-        
+
         return {
             "message": "Available commands",
-            "commands": list(SLASH_COMMANDS.keys())
+            "commands": list(SLASH_COMMANDS.keys()),
         }
-    
+
     elif command == "config":
         if len(args) == 0:
             return {"message": "Current configuration", "config": {}}
@@ -217,18 +230,28 @@ async def _execute_command(
             return {"key": args[0], "value": "default"}
         else:
             return {"message": f"Set {args[0]} = {args[1]}"}
-    
+
     elif command == "run":
         if len(args) < 1:
             return {"error": "Usage: /run <skill-slug> [input]"}
-        
+
         skill_id = args[0]
         input_text = " ".join(args[1:]) if len(args) > 1 else ""
-        
+
+        registry = request.app.state.skill_registry
+        skill = await registry.get_skill(skill_id)
+        if not skill:
+            return {"error": f"Skill '{skill_id}' not found"}
+
+        executor = request.app.state.skill_executor
+        mode = executor.mode_for(skill.config)
+        output = await run_skill(executor, mode, skill_id, input_text)
+
         return {
             "skill": skill_id,
             "input": input_text,
-            "output": f"[Simulated output for {skill_id}]"
+            "mode": mode.value,
+            "output": output,
         }
-    
+
     return {"error": "Command not implemented"}
@@ -1,7 +1,9 @@
 """
 Health Check API Router
 """
+
 from fastapi import APIRouter, Request
+
 from datetime import datetime
 import platform
 import sys
@@ -15,7 +17,7 @@ async def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
-        "service": "athena-agent-api"
+        "service": "athena-agent-api",
     }
 
 
@@ -26,31 +28,25 @@ async def readiness_check(request: Request):
         # Check if core services are initialized
         skill_registry = request.app.state.skill_registry
         agent_orchestrator = request.app.state.agent_orchestrator
-        
+
         skill_count = await skill_registry.count()
         agent_count = await agent_orchestrator.agent_count()
-        
+
         return {
             "status": "ready",
             "checks": {
                 "skill_registry": {"status": "ok", "skills": skill_count},
-                "agent_orchestrator": {"status": "ok", "agents": agent_count}
-            }
+                "agent_orchestrator": {"status": "ok", "agents": agent_count},
+            },
         }
     except Exception as e:
-        return {
-            "status": "not_ready",
-            "error": str(e)
-        }
+        return {"status": "not_ready", "error": str(e)}
 
 
 @router.get("/live")
 async def liveness_check():
     """Kubernetes liveness probe"""
-    return {
-        "status": "alive",
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    return {"status": "alive", "timestamp": datetime.utcnow().isoformat()}
 
 
 @router.get("/info")
@@ -58,7 +54,7 @@ async def system_info(request: Request):
     """Get system information"""
     skill_registry = request.app.state.skill_registry
     agent_orchestrator = request.app.state.agent_orchestrator
-    
+
     return {
         "service": "athena-agent-api",
         "version": "2.0.0",
@@ -67,7 +63,9 @@ async def system_info(request: Request):
         "stats": {
             "total_skills": await skill_registry.count(),
             "total_agents": await agent_orchestrator.agent_count(),
-            "categories": len(await skill_registry.get_categories())
+            "categories": len(await skill_registry.get_categories()),
         },
-        "timestamp": datetime.utcnow().isoformat()
+        "skill_cache": skill_registry.cache_stats(),
+        "http_client": request.app.state.http_transport.stats(),
+        "timestamp": datetime.utcnow().isoformat(),
     }
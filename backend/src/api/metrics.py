@@ -0,0 +1,23 @@
+"""
+Metrics API Router
+"""
+
+from fastapi import APIRouter, Request, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from src.services.metrics import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    """Metrics in the Prometheus text format"""
+    agent_orchestrator = request.app.state.agent_orchestrator
+    skill_registry = request.app.state.skill_registry
+
+    body = metrics.render(
+        agent_stats=await agent_orchestrator.get_agent_stats(),
+        skill_cache=skill_registry.cache_stats(),
+    )
+    return Response(content=body, headers={"Content-Type": CONTENT_TYPE_LATEST})
@@ -0,0 +1,75 @@
+"""
+Profiling API Router - Admin only
+"""
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from typing import Optional
+import asyncio
+
+from src.config.settings import settings
+
+router = APIRouter()
+
+
+async def require_admin(request: Request, x_admin_token: Optional[str] = Header(None)):
+    """Reject callers without the profiling admin token"""
+    if not request.app.state.profiler.is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+@router.get("/requests", dependencies=[Depends(require_admin)])
+async def list_profiles(request: Request):
+    """List the slowest profiled requests, slowest first"""
+    profiler = request.app.state.profiler
+
+    return {
+        **profiler.stats(),
+        "profiles": [entry.to_dict() for entry in profiler.profiles()],
+    }
+
+
+@router.get("/requests/{profile_id}", dependencies=[Depends(require_admin)])
+async def download_profile(
+    profile_id: str,
+    request: Request,
+    format: str = Query("pstats", pattern="^(pstats|collapsed)$"),
+):
+    """Download a request profile as a pstats file or collapsed stacks"""
+    entry = request.app.state.profiler.get(profile_id)
+
+    if not entry:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    if format == "collapsed":
+        return Response(content=entry.collapsed(), media_type="text/plain")
+    return Response(
+        content=entry.pstats_bytes(),
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.pstats"'},
+    )
+
+
+@router.delete("/requests", dependencies=[Depends(require_admin)])
+async def clear_profiles(request: Request):
+    """Drop the kept request profiles"""
+    request.app.state.profiler.clear()
+
+    return {"success": True}
+
+
+@router.post("/sample", dependencies=[Depends(require_admin)])
+async def sample_worker(
+    request: Request,
+    seconds: float = Query(10.0, gt=0, le=settings.PROFILING_MAX_SAMPLE_SECONDS),
+    interval: float = Query(0.005, ge=0.001, le=1.0),
+):
+    """Sample every thread of this worker for a while and return collapsed stacks"""
+    sampler = request.app.state.stack_sampler
+
+    stacks = await asyncio.to_thread(sampler.sample, seconds, interval)
+    if stacks is None:
+        raise HTTPException(
+            status_code=409, detail="A sampling run is already in progress"
+        )
+
+    return Response(content=stacks, media_type="text/plain")
@@ -0,0 +1,46 @@
+"""
+Response helpers
+JSON responses assembled from pre-serialized payloads with ETag support
+"""
+
+from fastapi import Request, Response
+from typing import Any
+import hashlib
+
+import orjson
+
+
+def _etag(body: bytes) -> str:
+    """Strong ETag for a response body"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def json_response(request: Request, content: Any) -> Response:
+    """
+    Encode ``content`` with orjson and answer conditional requests.
+
+    Pre-serialized values can be embedded without re-encoding by wrapping
+    them in ``orjson.Fragment``. Returns 304 with an empty body when the
+    request's If-None-Match already names the body's ETag.
+    """
+    body = content if isinstance(content, bytes) else orjson.dumps(content)
+    etag = _etag(body)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
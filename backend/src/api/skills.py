@@ -1,15 +1,22 @@
 """
 Skills API Router
 """
+
 from fastapi import APIRouter, HTTPException, Request, Query
 from typing import Optional, List
 from pydantic import BaseModel
 
+import orjson
+
+from src.api.responses import json_response
+from src.services.dependency_resolver import DependencyCycleError, MissingSkillError
+
 router = APIRouter()
 
 
 class SkillResponse(BaseModel):
     """Skill response model"""
+
     id: str
     name: str
     description: str
@@ -23,42 +30,77 @@ class SkillResponse(BaseModel):
 
 class SkillSearchRequest(BaseModel):
     """Skill search request"""
+
     query: Optional[str] = ""
     category: Optional[str] = None
     tags: Optional[List[str]] = None
     limit: int = 50
     offset: int = 0
+    ranked: bool = False
+    cursor: Optional[str] = None
 
 
 class InstallSkillRequest(BaseModel):
     """Install skill request"""
+
     skill_id: str
 
 
+class BatchInstallRequest(BaseModel):
+    """Batch install request"""
+
+    skill_ids: List[str]
+
+
+async def install_with_dependencies(registry, skill_ids: List[str]) -> List[str]:
+    """Install skills and their dependencies, mapping resolver errors to HTTP errors"""
+    try:
+        return await registry.install_skills(skill_ids)
+    except MissingSkillError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except DependencyCycleError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
 @router.get("/")
 async def list_skills(
     request: Request,
     query: str = Query("", description="Search query"),
     category: Optional[str] = Query(None, description="Filter by category"),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    ranked: bool = Query(False, description="Order results by relevance"),
+    facets: bool = Query(False, description="Include facet counts for the query"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page"),
 ):
     """List all skills with optional filters"""
     registry = request.app.state.skill_registry
-    
-    skills = await registry.search_skills(
-        query=query,
-        category=category,
-        limit=limit,
-        offset=offset
-    )
-    
-    return {
-        "total": await registry.count(),
+
+    try:
+        result = await registry.query_skills(
+            query=query,
+            category=category,
+            limit=limit,
+            offset=offset,
+            ranked=ranked,
+            facets=facets,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    response = {
+        "total": result.total,
         "limit": limit,
-        "offset": offset,
-        "skills": [skill.to_dict() for skill in skills]
+        # A cursor page starts after the cursor, not at an offset
+        "offset": None if cursor else offset,
+        "next_cursor": result.next_cursor,
+        "skills": [orjson.Fragment(payload) for payload in result.payloads()],
     }
+    if result.facets is not None:
+        response["facets"] = result.facets
+
+    return json_response(request, response)
 
 
 @router.get("/categories")
@@ -66,36 +108,58 @@ async def get_categories(request: Request):
     """Get all skill categories"""
     registry = request.app.state.skill_registry
     categories = await registry.get_categories()
-    
-    return {
-        "total_categories": len(categories),
-        "categories": categories
-    }
+
+    return json_response(
+        request, {"total_categories": len(categories), "categories": categories}
+    )
+
+
+@router.get("/facets")
+async def get_facets(request: Request):
+    """Get skill counts per category, tag, author and active state"""
+    registry = request.app.state.skill_registry
+
+    return json_response(
+        request,
+        {"total": await registry.count(), "facets": await registry.get_facets()},
+    )
 
 
 @router.get("/{skill_id}")
 async def get_skill(skill_id: str, request: Request):
     """Get a specific skill by ID"""
     registry = request.app.state.skill_registry
-    skill = await registry.get_skill(skill_id)
-    
-    if not skill:
+    payload = await registry.get_skill_payload(skill_id)
+
+    if payload is None:
         raise HTTPException(status_code=404, detail="Skill not found")
-    
-    return skill.to_dict()
+
+    return json_response(request, payload)
 
 
 @router.post("/install")
 async def install_skill(req: InstallSkillRequest, request: Request):
     """Install a skill"""
     registry = request.app.state.skill_registry
-    
-    success = await registry.install_skill(req.skill_id)
-    
-    if not success:
-        raise HTTPException(status_code=404, detail="Skill not found")
-    
-    return {"status": "installed", "skill_id": req.skill_id}
+
+    installed = await install_with_dependencies(registry, [req.skill_id])
+
+    return {"status": "installed", "skill_id": req.skill_id, "installed": installed}
+
+
+@router.post("/install/batch")
+async def install_skills(req: BatchInstallRequest, request: Request):
+    """Install a set of skills and their dependencies"""
+    registry = request.app.state.skill_registry
+
+    installed = await install_with_dependencies(registry, req.skill_ids)
+
+    return {
+        "status": "installed",
+        "requested": req.skill_ids,
+        "installed": installed,
+        "total": len(installed),
+    }
 
 
 @router.get("/category/{category}")
@@ -103,23 +167,29 @@ async def get_skills_by_category(
     category: str,
     request: Request,
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page"),
 ):
     """Get skills by category"""
     registry = request.app.state.skill_registry
-    
-    skills = await registry.search_skills(
-        category=category,
-        limit=limit,
-        offset=offset
-    )
-    
+
+    try:
+        result = await registry.query_skills(
+            category=category, limit=limit, offset=offset, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     categories = await registry.get_categories()
     if category not in categories:
         raise HTTPException(status_code=404, detail="Category not found")
-    
-    return {
-        "category": category,
-        "category_info": categories[category],
-        "skills": [skill.to_dict() for skill in skills]
-    }
+
+    return json_response(
+        request,
+        {
+            "category": category,
+            "category_info": categories[category],
+            "next_cursor": result.next_cursor,
+            "skills": [orjson.Fragment(payload) for payload in result.payloads()],
+        },
+    )
@@ -2,20 +2,26 @@
 Athena Agent - Backend API
 Intelligent Multi-Agent Orchestration Platform
 """
-from fastapi import FastAPI, HTTPException
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
 
-from src.api import skills, agents, commands, health
+from src.api import skills, agents, commands, health, metrics, profiling
 from src.config.settings import settings
 from src.services.skill_registry import SkillRegistry
 from src.services.agent_orchestrator import AgentOrchestrator
+from src.services.skill_executor import SkillExecutor
+from src.services.http_client import create_http_client, create_transport
+from src.services.persistence import WriteBehindStore
+from src.services.state_backend import create_state_backend
+from src.services.metrics import MetricsMiddleware
+from src.services.profiler import ProfilingMiddleware, RequestProfiler, StackSampler
 
 # Configure logging
 logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
@@ -24,23 +30,55 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Application lifespan handler"""
     logger.info("🏛️ Athena Agent starting up...")
-    
+
     # Initialize services
-    app.state.skill_registry = SkillRegistry()
-    app.state.agent_orchestrator = AgentOrchestrator()
-    
+    app.state.state_backend = create_state_backend(
+        settings.STATE_BACKEND, settings.REDIS_URL
+    )
+    await app.state.state_backend.start()
+
+    app.state.write_behind = None
+    if settings.PERSISTENCE_ENABLED:
+        app.state.write_behind = WriteBehindStore(
+            settings.DATABASE_URL,
+            batch_size=settings.PERSISTENCE_BATCH_SIZE,
+            flush_interval=settings.PERSISTENCE_FLUSH_INTERVAL,
+            max_backlog=settings.PERSISTENCE_MAX_BACKLOG,
+        )
+        await app.state.write_behind.start()
+
+    app.state.skill_registry = SkillRegistry(
+        backend=app.state.state_backend, store=app.state.write_behind
+    )
+    app.state.http_transport = create_transport()
+    app.state.http_client = create_http_client(app.state.http_transport)
+    app.state.skill_executor = SkillExecutor(http_client=app.state.http_client)
+    app.state.agent_orchestrator = AgentOrchestrator(
+        executor=app.state.skill_executor,
+        skill_registry=app.state.skill_registry,
+        backend=app.state.state_backend,
+        store=app.state.write_behind,
+    )
+
     await app.state.skill_registry.initialize()
     await app.state.agent_orchestrator.initialize()
-    
+
     logger.info(f"✅ Loaded {await app.state.skill_registry.count()} skills")
-    logger.info(f"✅ Initialized {await app.state.agent_orchestrator.agent_count()} agents")
-    
+    logger.info(
+        f"✅ Initialized {await app.state.agent_orchestrator.agent_count()} agents"
+    )
+
     yield
-    
+
     # Cleanup
     logger.info("🏛️ Athena Agent shutting down...")
     await app.state.skill_registry.cleanup()
     await app.state.agent_orchestrator.cleanup()
+    app.state.skill_executor.shutdown()
+    await app.state.http_client.aclose()
+    if app.state.write_behind is not None:
+        await app.state.write_behind.close()
+    await app.state.state_backend.close()
 
 
 # Create FastAPI application
@@ -50,7 +88,7 @@ app = FastAPI(
     version="2.0.0",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
-    lifespan=lifespan
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -62,11 +100,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Profiling
+app.state.profiler = RequestProfiler(
+    admin_token=settings.PROFILING_ADMIN_TOKEN,
+    sample_rate=settings.PROFILING_SAMPLE_RATE,
+    slowest=settings.PROFILING_SLOWEST,
+)
+app.state.stack_sampler = StackSampler()
+if app.state.profiler.enabled:
+    app.add_middleware(ProfilingMiddleware, profiler=app.state.profiler)
+
 # Include routers
 app.include_router(health.router, prefix="/api/health", tags=["Health"])
 app.include_router(skills.router, prefix="/api/skills", tags=["Skills"])
 app.include_router(agents.router, prefix="/api/agents", tags=["Agents"])
 app.include_router(commands.router, prefix="/api/commands", tags=["Commands"])
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router, tags=["Metrics"])
+app.include_router(profiling.router, prefix="/api/admin/profiling", tags=["Profiling"])
 
 
 @app.get("/")
@@ -76,13 +131,16 @@ async def root():
         "name": "Athena Agent",
         "version": "2.0.0",
         "status": "operational",
-        "description": "Intelligent Multi-Agent Orchestration Platform"
+        "description": "Intelligent Multi-Agent Orchestration Platform",
     }
 
 
 @app.get("/api")
-async def api_info():
+async def api_info(request: Request):
     """API information endpoint"""
+    skill_registry = request.app.state.skill_registry
+    agent_orchestrator = request.app.state.agent_orchestrator
+
     return {
         "version": "2.0.0",
         "endpoints": {
@@ -90,22 +148,20 @@ async def api_info():
             "skills": "/api/skills",
             "agents": "/api/agents",
             "commands": "/api/commands",
-            "docs": "/api/docs"
+            "docs": "/api/docs",
         },
         "stats": {
-            "total_skills": 2987,
-            "specialized_agents": 6,
-            "slash_commands": 7,
-            "categories": 32
-        }
+            "total_skills": await skill_registry.count(),
+            "specialized_agents": await agent_orchestrator.agent_count(),
+            "slash_commands": len(commands.SLASH_COMMANDS),
+            "categories": len(await skill_registry.get_categories()),
+        },
     }
 
 
 if __name__ == "__main__":
     import uvicorn
+
     uvicorn.run(
-        "main:app",
-        host=settings.HOST,
-        port=settings.PORT,
-        reload=settings.DEBUG
+        "main:app", host=settings.HOST, port=settings.PORT, reload=settings.DEBUG
     )
@@ -2,19 +2,53 @@
 Agent Orchestrator Service
 Manages AI agents and their lifecycle
 """
-from typing import Dict, List, Optional, Any
+
+from typing import (
+    AsyncIterator,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Any,
+    Sequence,
+    Set,
+    Tuple,
+)
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 import asyncio
 import logging
+import time
 import uuid
 
+import orjson
+
+from src.config.settings import settings
+from src.services.agent_pool import AgentPool
+from src.services.agent_stats import AgentStats, LatencyHistogram
+from src.services.metrics import metrics
+from src.services.persistence import WriteBehindStore
+from src.services.execution_policy import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ExecutionPolicy,
+    PolicyCounters,
+)
+from src.services.query_cache import QueryCache
+from src.services.skill_executor import ExecutionMode, SkillExecutor, run_agent_task
+from src.services.state_backend import NearCache, StateBackend
+from src.services.task_events import Subscription, TaskEventBus
+from src.services.task_router import TaskRouter
+from src.services.task_scheduler import Reservation, TaskScheduler
+from src.services.task_store import FINISHED_STATUSES, TaskStore
+
 logger = logging.getLogger(__name__)
 
 
 class AgentStatus(Enum):
     """Agent status enumeration"""
+
     IDLE = "idle"
     RUNNING = "running"
     PAUSED = "paused"
@@ -24,6 +58,7 @@ class AgentStatus(Enum):
 
 class AgentType(Enum):
     """Specialized agent types"""
+
     CODING = "coding"
     RESEARCH = "research"
     DEVOPS = "devops"
@@ -35,16 +70,18 @@ class AgentType(Enum):
 @dataclass
 class AgentConfig:
     """Agent configuration"""
+
     max_tokens: int = 4096
     temperature: float = 0.7
     timeout: int = 30
     retry_count: int = 3
     skills: List[str] = field(default_factory=list)
-    
-    
+
+
 @dataclass
 class Agent:
     """Represents an AI agent"""
+
     id: str
     name: str
     agent_type: AgentType
@@ -55,7 +92,14 @@ class Agent:
     last_active: Optional[datetime] = None
     task_count: int = 0
     success_rate: float = 100.0
-    
+    _json: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Any field change drops the cached JSON payload
+        object.__setattr__(self, name, value)
+        if name != "_json":
+            object.__setattr__(self, "_json", None)
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert agent to dictionary"""
         return {
@@ -69,18 +113,25 @@ class Agent:
                 "temperature": self.config.temperature,
                 "timeout": self.config.timeout,
                 "retry_count": self.config.retry_count,
-                "skills": self.config.skills
+                "skills": self.config.skills,
             },
             "created_at": self.created_at.isoformat(),
             "last_active": self.last_active.isoformat() if self.last_active else None,
             "task_count": self.task_count,
-            "success_rate": self.success_rate
+            "success_rate": self.success_rate,
         }
 
+    def to_json(self) -> bytes:
+        """Serialized ``to_dict`` output, cached until the agent changes"""
+        if self._json is None:
+            self._json = orjson.dumps(self.to_dict())
+        return self._json
 
-@dataclass 
+
+@dataclass
 class Task:
     """Represents a task for an agent"""
+
     id: str
     agent_id: str
     input: str
@@ -89,13 +140,93 @@ class Task:
     created_at: datetime = field(default_factory=datetime.utcnow)
     completed_at: Optional[datetime] = None
     error: Optional[str] = None
+    attempts: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert task to dictionary"""
+        return {
+            "task_id": self.id,
+            "agent_id": self.agent_id,
+            "input": self.input,
+            "status": self.status,
+            "output": self.output,
+            "error": self.error,
+            "attempts": self.attempts,
+            "created_at": self.created_at.isoformat(),
+            "completed_at": (
+                self.completed_at.isoformat() if self.completed_at else None
+            ),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Task":
+        """Create a task from the output of ``to_dict``"""
+        return cls(
+            id=data["task_id"],
+            agent_id=data["agent_id"],
+            input=data["input"],
+            output=data["output"],
+            status=data["status"],
+            created_at=datetime.fromisoformat(data["created_at"]),
+            completed_at=(
+                datetime.fromisoformat(data["completed_at"])
+                if data["completed_at"]
+                else None
+            ),
+            error=data["error"],
+            attempts=data["attempts"],
+        )
 
 
 class AgentOrchestrator:
     """
     Orchestrates multiple AI agents
+
+    Tasks are executed by a ``TaskScheduler`` on a pool of replicas of
+    their agent. At most ``MAX_CONCURRENT_SKILLS`` tasks run at once in
+    total and ``AGENT_MAX_CONCURRENT_TASKS`` per replica, each under the
+    agent's timeout capped at ``AGENT_TIMEOUT``, which covers all of a
+    task's attempts and the backoff between them. A pool grows by one
+    replica, up to ``AGENT_POOL_MAX_SIZE`` and ``MAX_AGENTS`` in total,
+    whenever ``AGENT_POOL_SCALE_UP_QUEUE`` tasks are waiting or a task
+    waited ``AGENT_POOL_SCALE_UP_WAIT`` seconds to start, and drops
+    replicas idle for ``AGENT_POOL_IDLE_TIMEOUT`` seconds. Finished tasks
+    are archived and kept for ``TASK_RETENTION_TTL`` seconds, at most
+    ``TASK_RETENTION_MAX_FINISHED`` of them. Tasks never submitted fail
+    after ``TASK_PENDING_TTL`` seconds, or once more than
+    ``TASK_PENDING_MAX`` are pending, oldest first. Status changes and
+    output chunks are published to subscribers of the task and of its agent.
+
+    Statistics are updated as tasks change state, so reading them does
+    not depend on the number of agents or tasks.
+
+    Failed attempts are retried up to the agent's ``retry_count`` with
+    jittered backoff, slow attempts can be hedged once the agent's
+    ``TASK_HEDGE_PERCENTILE`` latency has passed, and each agent has a
+    circuit breaker that fails tasks fast after repeated failures.
+
+    Tasks can also name the skills or agent type they need instead of an
+    agent; ``route_task`` then picks a matching agent by queue depth and
+    recent latency.
+
+    A task identical to one already queued or running, same agent,
+    configuration and input up to whitespace, shares that execution
+    instead of running again. With ``TASK_RESULT_CACHE_SIZE`` set,
+    successful outputs are also reused for ``TASK_RESULT_CACHE_TTL``
+    seconds.
+
+    The blocking part of a task runs on the ``SkillExecutor`` in the
+    heaviest execution mode any of the agent's skills asks for.
+
+    With a shared ``StateBackend`` every task change is written to it in
+    batches, so any worker can look a task up, and a worker executing a
+    task created elsewhere claims it first so it runs only once.
+
+    With a ``WriteBehindStore`` tasks and agent activity are also
+    persisted, without waiting for the database, and agent activity is
+    restored on startup.
     """
-    
+
     # Predefined specialized agents based on Athena's 6 agents
     SPECIALIZED_AGENTS = [
         {
@@ -103,59 +234,125 @@ class AgentOrchestrator:
             "name": "Coding Agent",
             "type": AgentType.CODING,
             "description": "Specialized in code generation, review, and refactoring",
-            "skills": ["github", "git-essentials", "docker-essentials", "coding-agent"]
+            "skills": ["github", "git-essentials", "docker-essentials", "coding-agent"],
         },
         {
             "id": "research-agent",
             "name": "Research Agent",
             "type": AgentType.RESEARCH,
             "description": "Deep research and analysis capabilities",
-            "skills": ["deep-research", "brave-search", "arxiv-watcher", "academic-deep-research"]
+            "skills": [
+                "deep-research",
+                "brave-search",
+                "arxiv-watcher",
+                "academic-deep-research",
+            ],
         },
         {
             "id": "devops-agent",
             "name": "DevOps Agent",
             "type": AgentType.DEVOPS,
             "description": "Infrastructure and deployment automation",
-            "skills": ["docker-essentials", "kubernetes", "github-actions", "deploy-agent"]
+            "skills": [
+                "docker-essentials",
+                "kubernetes",
+                "github-actions",
+                "deploy-agent",
+            ],
         },
         {
             "id": "frontend-agent",
             "name": "Frontend Agent",
             "type": AgentType.FRONTEND,
             "description": "UI/UX design and frontend development",
-            "skills": ["frontend-design", "tailwindcss", "react-patterns", "figma"]
+            "skills": ["frontend-design", "tailwindcss", "react-patterns", "figma"],
         },
         {
             "id": "data-agent",
             "name": "Data Agent",
             "type": AgentType.DATA,
             "description": "Data analysis and processing",
-            "skills": ["data-analytics", "database-operations", "chart-image"]
+            "skills": ["data-analytics", "database-operations", "chart-image"],
         },
         {
             "id": "general-agent",
             "name": "General Agent",
             "type": AgentType.GENERAL,
             "description": "Multi-purpose agent for various tasks",
-            "skills": ["brave-search", "github", "productivity-tasks"]
-        }
+            "skills": ["brave-search", "github", "productivity-tasks"],
+        },
     ]
-    
-    def __init__(self):
+
+    def __init__(
+        self,
+        executor: Optional[SkillExecutor] = None,
+        skill_registry: Any = None,
+        backend: Optional[StateBackend] = None,
+        store: Optional[WriteBehindStore] = None,
+    ):
+        self._executor = executor or SkillExecutor()
+        self._store = store
+        self._skill_registry = skill_registry
+        self._backend = backend
+        self._shared_tasks: Optional[NearCache] = None
+        if backend is not None and backend.shared:
+            self._shared_tasks = NearCache(
+                backend,
+                "tasks",
+                max_entries=settings.STATE_NEAR_CACHE_SIZE,
+                ttl=settings.STATE_NEAR_CACHE_TTL,
+                on_invalidate=self._forget_remote,
+            )
+        self._unshared: Dict[str, Task] = {}
+        self._share_flush: Optional[asyncio.Task] = None
         self._agents: Dict[str, Agent] = {}
-        self._tasks: Dict[str, Task] = {}
+        self._pools: Dict[str, AgentPool] = {}
+        self._pooled = 0
+        self._tasks = TaskStore(
+            Task,
+            max_finished=settings.TASK_RETENTION_MAX_FINISHED,
+            ttl=settings.TASK_RETENTION_TTL,
+            max_pending=settings.TASK_PENDING_MAX,
+            pending_ttl=settings.TASK_PENDING_TTL,
+        )
+        self._running: Dict[str, int] = {}
+        self._task_states: Dict[str, int] = {}
+        self._agent_stats: Dict[str, AgentStats] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._policy_counters: Dict[str, PolicyCounters] = {}
+        self._agent_types: Dict[str, int] = {
+            agent_type.value: 0 for agent_type in AgentType
+        }
+        self._latency = LatencyHistogram()
+        self._total_tasks = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._flights: Dict[Hashable, Task] = {}
+        self._coalesced = 0
+        self._results = QueryCache(
+            max_entries=settings.TASK_RESULT_CACHE_SIZE,
+            ttl=settings.TASK_RESULT_CACHE_TTL,
+        )
+        self._events = TaskEventBus(max_queued=settings.TASK_STREAM_QUEUE_SIZE)
+        self._router = TaskRouter(strategy=settings.TASK_ROUTING_STRATEGY)
+        self._scheduler = TaskScheduler(
+            max_workers=min(
+                settings.MAX_CONCURRENT_SKILLS,
+                settings.MAX_AGENTS * settings.AGENT_MAX_CONCURRENT_TASKS,
+            ),
+            max_per_group=settings.AGENT_MAX_CONCURRENT_TASKS,
+            max_queue=settings.TASK_QUEUE_MAX_SIZE,
+        )
         self._initialized: bool = False
         self._lock = asyncio.Lock()
-        
+
     async def initialize(self) -> None:
         """Initialize the agent orchestrator"""
         async with self._lock:
             if self._initialized:
                 return
-                
+
             logger.info("Initializing agent orchestrator...")
-            
+
             # Create specialized agents
             for agent_data in self.SPECIALIZED_AGENTS:
                 agent = Agent(
@@ -163,99 +360,696 @@ class AgentOrchestrator:
                     name=agent_data["name"],
                     agent_type=agent_data["type"],
                     description=agent_data["description"],
-                    config=AgentConfig(skills=agent_data["skills"])
+                    config=AgentConfig(skills=agent_data["skills"]),
                 )
-                self._agents[agent.id] = agent
-            
+                self._register_agent(agent)
+
+            if self._store is not None:
+                for agent_id, activity in (
+                    await self._store.load_agent_activity()
+                ).items():
+                    agent = self._agents.get(agent_id)
+                    if agent is not None:
+                        agent.task_count = activity["task_count"]
+                        agent.last_active = activity["last_active"]
+
+            if self._shared_tasks is not None:
+                await self._shared_tasks.start()
+            self._scheduler.start()
             self._initialized = True
-            logger.info(f"Agent orchestrator initialized with {len(self._agents)} agents")
-    
+            logger.info(
+                f"Agent orchestrator initialized with {len(self._agents)} agents"
+            )
+
+    def _register_agent(self, agent: Agent) -> None:
+        """Add an agent and its statistics"""
+        self._agents[agent.id] = agent
+        self._agent_stats[agent.id] = AgentStats()
+        self._breakers[agent.id] = CircuitBreaker(
+            agent.id,
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.CIRCUIT_RESET_TIMEOUT,
+            half_open_probes=settings.CIRCUIT_HALF_OPEN_PROBES,
+        )
+        self._policy_counters[agent.id] = PolicyCounters()
+        self._agent_types[agent.agent_type.value] += 1
+        self._router.add_agent(agent.id, agent.agent_type.value, agent.config.skills)
+        pool = AgentPool(
+            agent,
+            max_size=settings.AGENT_POOL_MAX_SIZE,
+            slots=settings.AGENT_MAX_CONCURRENT_TASKS,
+            idle_timeout=settings.AGENT_POOL_IDLE_TIMEOUT,
+        )
+        self._pools[agent.id] = pool
+        self._pooled += len(pool)
+        self._scheduler.set_limit(agent.id, pool.capacity)
+
+    def _scale_up(self, pool: AgentPool, waited: float = 0.0) -> None:
+        """Add a replica to a pool whose queue or wait time is past its threshold"""
+        agent_id = pool.agent.id
+        waiting = self._scheduler.depth(agent_id) - self._scheduler.running(agent_id)
+        if (
+            waiting < settings.AGENT_POOL_SCALE_UP_QUEUE
+            and waited < settings.AGENT_POOL_SCALE_UP_WAIT
+        ):
+            return
+        if self._pooled >= settings.MAX_AGENTS:
+            return
+
+        replica = pool.grow()
+        if replica is None:
+            return
+        self._pooled += 1
+        self._scheduler.set_limit(agent_id, pool.capacity)
+        logger.info(
+            f"Scaled {agent_id} up to {len(pool)} replicas ({waiting} tasks waiting)"
+        )
+
+    def _scale_down(self, pool: AgentPool) -> None:
+        """Remove a pool's replicas that have been idle too long"""
+        removed = pool.shrink()
+        if not removed:
+            return
+        self._pooled -= removed
+        self._scheduler.set_limit(pool.agent.id, pool.capacity)
+        logger.info(f"Scaled {pool.agent.id} down to {len(pool)} replicas")
+
+    def _set_status(self, task: Task, status: str) -> None:
+        """Move a task to a new state, keeping the per-state counts current"""
+        if task.status == "pending":
+            self._tasks.start(task.id)
+        self._task_states[task.status] -= 1
+        self._task_states[status] = self._task_states.get(status, 0) + 1
+        task.status = status
+        self._task_changed(task)
+
+    def _task_changed(self, task: Task) -> None:
+        """Schedule a new or changed task to be shared and persisted"""
+        self._share(task)
+        if self._store is not None:
+            self._store.record_task(task)
+
+    def _share(self, task: Task) -> None:
+        """Schedule a changed task to be written to the shared state"""
+        if self._shared_tasks is None:
+            return
+        self._unshared[task.id] = task
+        if self._share_flush is None:
+            self._share_flush = asyncio.create_task(self._flush_shared())
+
+    async def _flush_shared(self) -> None:
+        """Write every task changed since the last flush in one batch"""
+        # Let the rest of this change, and others made meanwhile, land first
+        await asyncio.sleep(0)
+        self._share_flush = None
+        tasks, self._unshared = self._unshared, {}
+        try:
+            await self._shared_tasks.set_many(
+                {
+                    task_id: orjson.dumps(task.to_dict())
+                    for task_id, task in tasks.items()
+                },
+                ttl=settings.TASK_RETENTION_TTL,
+            )
+        except Exception as e:
+            logger.error(f"Failed to write {len(tasks)} tasks to shared state: {e}")
+
+    def _forget_remote(self, task_ids: Set[str]) -> None:
+        """Drop local pending copies of tasks another worker has taken over"""
+        for task_id in task_ids:
+            task = self._tasks.get(task_id)
+            if task is None or task.status != "pending" or task_id in self._inflight:
+                continue
+            self._tasks.discard(task_id)
+            self._task_states["pending"] -= 1
+
+    async def _claim(self, tasks: List[Task]) -> List[Task]:
+        """The tasks this worker may run, claimed in one batch when state is shared"""
+        if self._shared_tasks is None or not tasks:
+            return tasks
+        try:
+            claimed = await self._backend.add_many(
+                {
+                    f"tasks:claim:{task.id}": self._shared_tasks.origin.encode()
+                    for task in tasks
+                },
+                ttl=settings.TASK_RETENTION_TTL,
+            )
+        except Exception as e:
+            logger.error(
+                f"Failed to claim tasks in shared state, running them locally: {e}"
+            )
+            return tasks
+        return [task for task, won in zip(tasks, claimed) if won]
+
+    def _fail_abandoned(self) -> None:
+        """Fail tasks left pending too long or beyond the pending limit"""
+        for task in self._tasks.abandoned():
+            self._set_status(task, "failed")
+            task.error = "Task was never submitted"
+            task.completed_at = datetime.utcnow()
+            self._tasks.finish(task.id)
+            self._events.publish("status", task, final=True)
+
+    def _count_new_task(self, agent: Agent, now: datetime) -> None:
+        """Count a newly created pending task"""
+        self._task_states["pending"] = self._task_states.get("pending", 0) + 1
+        self._total_tasks += 1
+        agent.task_count += 1
+        agent.last_active = now
+        if self._store is not None:
+            self._store.record_agent_task(agent.id, now)
+
     async def agent_count(self) -> int:
         """Get number of agents"""
         return len(self._agents)
-    
+
     async def get_agent(self, agent_id: str) -> Optional[Agent]:
         """Get an agent by ID"""
         return self._agents.get(agent_id)
-    
+
     async def get_all_agents(self) -> List[Agent]:
         """Get all agents"""
         return list(self._agents.values())
-    
+
     async def create_task(self, agent_id: str, input_text: str) -> Optional[Task]:
         """Create a new task for an agent"""
         agent = await self.get_agent(agent_id)
         if not agent:
             return None
-        
-        task = Task(
-            id=str(uuid.uuid4()),
-            agent_id=agent_id,
-            input=input_text
+
+        task = Task(id=str(uuid.uuid4()), agent_id=agent_id, input=input_text)
+
+        self._tasks.add(task)
+        self._count_new_task(agent, datetime.utcnow())
+        self._task_changed(task)
+        self._fail_abandoned()
+
+        return task
+
+    async def create_tasks(
+        self, requests: Sequence[Tuple[str, str]]
+    ) -> Optional[List[Task]]:
+        """
+        Create tasks for many (agent ID, input) pairs in one pass.
+
+        Returns None without creating anything if any agent does not exist.
+        """
+        if any(agent_id not in self._agents for agent_id, _ in requests):
+            return None
+
+        now = datetime.utcnow()
+        tasks = []
+        for agent_id, input_text in requests:
+            task = Task(
+                id=str(uuid.uuid4()),
+                agent_id=agent_id,
+                input=input_text,
+                created_at=now,
+            )
+            self._tasks.add(task)
+            self._count_new_task(self._agents[agent_id], now)
+            self._task_changed(task)
+            tasks.append(task)
+        self._fail_abandoned()
+
+        return tasks
+
+    async def route_task(
+        self,
+        skills: Sequence[str] = (),
+        agent_type: Optional[str] = None,
+        assigned: Optional[Dict[str, int]] = None,
+    ) -> Optional[str]:
+        """
+        Choose an agent that has every skill and, if given, the type.
+
+        Among matching agents the one with the fewest queued and running
+        tasks per replica relative to its recent latency wins; agents whose circuit is
+        open are only chosen when no other agent matches. ``assigned``
+        counts tasks already routed but not yet queued, e.g. earlier tasks
+        of a batch, and is updated with the choice. Returns None if no
+        agent matches.
+        """
+        assigned = assigned if assigned is not None else {}
+        agent_id = self._router.choose(
+            self._router.candidates(skills, agent_type),
+            depth=lambda agent_id: (
+                self._scheduler.depth(agent_id) + assigned.get(agent_id, 0)
+            )
+            / len(self._pools[agent_id]),
+            available=lambda agent_id: self._breakers[agent_id].state
+            != CircuitBreaker.OPEN,
         )
-        
-        self._tasks[task.id] = task
-        agent.task_count += 1
-        agent.last_active = datetime.utcnow()
-        
+        if agent_id is not None:
+            assigned[agent_id] = assigned.get(agent_id, 0) + 1
+        return agent_id
+
+    async def get_task(self, task_id: str) -> Optional[Task]:
+        """Get a task by ID, from shared state or storage if it is not known locally"""
+        task = self._tasks.get(task_id)
+        if task is None and self._shared_tasks is not None:
+            found = await self._shared_tasks.get_many([task_id])
+            if task_id in found:
+                task = Task.from_dict(orjson.loads(found[task_id]))
+        if task is None and self._store is not None:
+            row = await self._store.get_task(task_id)
+            if row is not None:
+                task = Task(**row)
         return task
-    
-    async def execute_task(self, task_id: str) -> Optional[Task]:
-        """Execute a task"""
+
+    async def submit_task(self, task_id: str, priority: int = 0) -> Optional[Task]:
+        """
+        Queue a pending task for execution and return without waiting.
+
+        Tasks that are already queued, running or finished are returned
+        unchanged. A task with a cached result finishes at once, and one
+        identical to a task in flight follows that task's execution.
+        Higher priorities run first. Raises ``SchedulerFullError`` when the
+        queue is at capacity.
+
+        With shared state, a task created by another worker is taken over
+        and run here, unless some worker has already claimed it.
+        """
+        task = await self._adopt(task_id)
+        if not task:
+            return None
+        if task.status != "pending":
+            return task
+
+        if await self._claim([task]):
+            self._submit(task, priority)
+        return task
+
+    async def _adopt(self, task_id: str) -> Optional[Task]:
+        """A local task, or a pending one from the shared state made local"""
         task = self._tasks.get(task_id)
+        if task is not None or self._shared_tasks is None:
+            return task
+
+        task = await self.get_task(task_id)
+        if (
+            task is not None
+            and task.status == "pending"
+            and task.agent_id in self._agents
+        ):
+            self._tasks.add(task)
+            self._task_states["pending"] = self._task_states.get("pending", 0) + 1
+        return task
+
+    def _submit(
+        self, task: Task, priority: int, reservation: Optional[Reservation] = None
+    ) -> None:
+        """Queue a claimed pending task, or finish it from a cached or in-flight duplicate"""
+        agent = self._agents.get(task.agent_id)
+        key = self._task_key(agent, task.input) if agent else None
+        if key is not None:
+            if self._results.max_entries > 0:
+                output = self._results.get(key)
+                if output is not None:
+                    self._set_status(task, "completed")
+                    task.output = output
+                    task.completed_at = datetime.utcnow()
+                    self._tasks.finish(task.id)
+                    self._events.publish("status", task, final=True)
+                    return
+            leader = self._flights.get(key)
+            if leader is not None:
+                self._follow(task, leader)
+                return
+
+        queued_at = time.monotonic()
+        future = self._scheduler.submit(
+            lambda: self._run_task(task, queued_at),
+            group=task.agent_id,
+            priority=priority,
+            reservation=reservation,
+        )
+        self._set_status(task, "queued")
+        self._inflight[task.id] = future
+        future.add_done_callback(lambda _: self._inflight.pop(task.id, None))
+        future.add_done_callback(
+            lambda done: done.cancelled() and self._finish_cancelled(task)
+        )
+        if key is not None and settings.TASK_COALESCE_DUPLICATES:
+            self._flights[key] = task
+            future.add_done_callback(lambda _: self._land(key, task))
+        self._events.publish("status", task)
+        pool = self._pools.get(task.agent_id)
+        if pool is not None:
+            self._scale_up(pool)
+
+    @staticmethod
+    def _task_key(agent: Agent, input_text: str) -> Hashable:
+        """Identity of a task's work: agent, configuration and normalized input"""
+        config = agent.config
+        return (
+            agent.id,
+            config.max_tokens,
+            config.temperature,
+            config.timeout,
+            config.retry_count,
+            tuple(config.skills),
+            " ".join(input_text.split()),
+        )
+
+    def _follow(self, task: Task, leader: Task) -> None:
+        """Finish a task with the outcome of an identical task in flight"""
+        follower = asyncio.get_running_loop().create_future()
+
+        def finish(leader_future: asyncio.Future) -> None:
+            self._inflight.pop(task.id, None)
+            if leader_future.cancelled():
+                self._finish_cancelled(task)
+                follower.cancel()
+                return
+            self._set_status(task, leader.status)
+            task.output = leader.output
+            task.error = leader.error
+            task.completed_at = leader.completed_at
+            self._tasks.finish(task.id)
+            self._events.publish("status", task, final=True)
+            follower.set_result(None)
+
+        self._set_status(task, "queued")
+        self._inflight[task.id] = follower
+        self._inflight[leader.id].add_done_callback(finish)
+        self._coalesced += 1
+        self._events.publish("status", task)
+
+    def _finish_cancelled(self, task: Task) -> None:
+        """Fail a task whose execution was cancelled before it finished"""
+        if task.status in FINISHED_STATUSES:
+            return
+        self._set_status(task, "failed")
+        task.error = "Task was cancelled"
+        task.completed_at = datetime.utcnow()
+        self._tasks.finish(task.id)
+        self._events.publish("status", task, final=True)
+
+    def _land(self, key: Hashable, task: Task) -> None:
+        """Stop coalescing onto a finished task and cache its output"""
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        if task.status == "completed" and self._results.max_entries > 0:
+            self._results.put(key, task.output)
+
+    def reserve(self, count: int) -> Reservation:
+        """
+        Hold queue room for ``count`` tasks to be submitted with
+        ``submit_tasks``. Raises ``SchedulerFullError`` if there is none.
+        """
+        return self._scheduler.reserve(count)
+
+    async def submit_tasks(
+        self,
+        tasks: List[Task],
+        priority: int = 0,
+        reservation: Optional[Reservation] = None,
+    ) -> List[Task]:
+        """
+        Queue many tasks at once.
+
+        Room for the batch is reserved before the tasks are claimed, so
+        concurrent submitters cannot fill the queue halfway through it.
+        Pass a ``reservation`` from ``reserve`` to hold room from before the
+        tasks were created. Raises ``SchedulerFullError`` without queueing
+        any of them if the queue cannot take the whole batch.
+        """
+        pending = [task for task in tasks if task.status == "pending"]
+        if reservation is None:
+            reservation = self._scheduler.reserve(len(pending))
+
+        with reservation:
+            for task in await self._claim(pending):
+                self._submit(task, priority, reservation)
+        return tasks
+
+    async def execute_task(self, task_id: str, priority: int = 0) -> Optional[Task]:
+        """Execute a task and wait for it to finish"""
+        task = await self.submit_task(task_id, priority)
         if not task:
             return None
-        
+        return await self.wait_task(task)
+
+    async def wait_task(self, task: Task) -> Task:
+        """Wait until a submitted task has finished"""
+        future = self._inflight.get(task.id)
+        if future is not None:
+            # Leaving early must not cancel the task for other waiters
+            await asyncio.shield(future)
+        return task
+
+    async def as_completed(self, tasks: List[Task]) -> AsyncIterator[Task]:
+        """Yield submitted tasks in the order they finish"""
+        for finished in asyncio.as_completed([self.wait_task(task) for task in tasks]):
+            yield await finished
+
+    def subscribe_task(self, task_id: str) -> Subscription:
+        """Subscribe to the status changes and output of a task"""
+        return self._events.subscribe(TaskEventBus.task_topic(task_id))
+
+    def subscribe_agent(self, agent_id: str) -> Subscription:
+        """Subscribe to the status changes and output of an agent's tasks"""
+        return self._events.subscribe(TaskEventBus.agent_topic(agent_id))
+
+    async def _run_task(self, task: Task, queued_at: float) -> None:
+        """Run a task on a replica of its agent, recording the outcome on the task"""
         agent = self._agents.get(task.agent_id)
         if not agent:
-            task.status = "failed"
+            self._set_status(task, "failed")
             task.error = "Agent not found"
-            return task
-        
+            task.completed_at = datetime.utcnow()
+            self._tasks.finish(task.id)
+            self._events.publish("status", task, final=True)
+            return
+
+        pool = self._pools[agent.id]
+        waited = time.monotonic() - queued_at
+        metrics.task_queue_wait.observe(waited)
+        self._scale_up(pool, waited=waited)
+        replica = pool.acquire()
+
+        timeout = min(agent.config.timeout, settings.AGENT_TIMEOUT)
+        self._running[agent.id] = self._running.get(agent.id, 0) + 1
+        agent.status = AgentStatus.RUNNING
+        self._set_status(task, "running")
+        self._events.publish("status", task)
+        started = time.perf_counter()
+
+        # The timeout covers all attempts and the backoff between them: each
+        # attempt gets the time left, and no retry starts once it is used up
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        policy = ExecutionPolicy(
+            retries=agent.config.retry_count,
+            backoff_base=settings.TASK_RETRY_BACKOFF_BASE,
+            backoff_max=settings.TASK_RETRY_BACKOFF_MAX,
+            hedge_delay=self._hedge_delay(agent.id),
+            deadline=deadline,
+        )
+        # Output of the attempt whose chunks are being streamed
+        stream: List[List[str]] = []
+
+        async def attempt() -> str:
+            task.attempts += 1
+            return await asyncio.wait_for(
+                self._collect(replica, task, stream, task.attempts),
+                deadline - loop.time(),
+            )
+
         try:
-            agent.status = AgentStatus.RUNNING
-            task.status = "running"
-            
-            # Simulate task execution
-            await asyncio.sleep(0.1)
-            
-            # In production, this would call the actual AI model
-            task.output = f"Task completed by {agent.name}"
-            task.status = "completed"
+            task.output = await policy.run(
+                attempt, self._breakers[agent.id], self._policy_counters[agent.id]
+            )
+            self._set_status(task, "completed")
+            task.completed_at = datetime.utcnow()
+
+        except asyncio.TimeoutError:
+            self._set_status(task, "failed")
+            task.error = f"Task timed out after {timeout}s"
+            task.completed_at = datetime.utcnow()
+            logger.error(f"Task {task.id} timed out on {agent.id}")
+
+        except asyncio.CancelledError:
+            self._set_status(task, "failed")
+            task.error = "Task was cancelled"
+            task.completed_at = datetime.utcnow()
+            raise
+
+        except CircuitOpenError as e:
+            self._set_status(task, "failed")
+            task.error = str(e)
             task.completed_at = datetime.utcnow()
-            
-            agent.status = AgentStatus.IDLE
-            
+
         except Exception as e:
-            task.status = "failed"
+            self._set_status(task, "failed")
             task.error = str(e)
-            agent.status = AgentStatus.ERROR
+            task.completed_at = datetime.utcnow()
             logger.error(f"Task execution failed: {e}")
-        
-        return task
-    
+
+        finally:
+            duration = time.perf_counter() - started
+            stats = self._agent_stats[agent.id]
+            stats.record(task.status == "completed", duration)
+            self._latency.record(duration)
+            self._router.observe(agent.id, duration)
+            metrics.task_duration.labels(agent.id, task.status).observe(duration)
+            pool.release(replica)
+            self._scale_down(pool)
+            agent.success_rate = stats.success_rate
+
+            remaining = self._running[agent.id] - 1
+            if remaining:
+                self._running[agent.id] = remaining
+            else:
+                del self._running[agent.id]
+                circuit_open = self._breakers[agent.id].state == CircuitBreaker.OPEN
+                agent.status = AgentStatus.ERROR if circuit_open else AgentStatus.IDLE
+            self._tasks.finish(task.id)
+            self._events.publish("status", task, final=True)
+
+    def _hedge_delay(self, agent_id: str) -> Optional[float]:
+        """Latency after which a slow attempt is hedged, if hedging applies"""
+        if not settings.TASK_HEDGE_PERCENTILE:
+            return None
+        latency = self._agent_stats[agent_id].latency
+        if latency.count < settings.TASK_HEDGE_MIN_SAMPLES:
+            return None
+        return latency.percentiles(settings.TASK_HEDGE_PERCENTILE)[0]
+
+    async def _collect(
+        self, agent: Agent, task: Task, stream: List[List[str]], attempt: int
+    ) -> str:
+        """
+        Run one attempt of a task and return its output.
+
+        The first attempt to produce output streams it: its chunks are
+        appended to the task and published as they arrive. If it fails,
+        the next attempt to produce output takes over from scratch.
+        """
+        chunks: List[str] = []
+        try:
+            async for chunk in self._perform(agent, task):
+                chunks.append(chunk)
+                if not stream:
+                    stream.append(chunks)
+                    task.output = None
+                if stream[0] is chunks:
+                    task.output = (task.output or "") + chunk
+                    self._events.publish("output", task, chunk=chunk, attempt=attempt)
+        except BaseException:
+            if stream and stream[0] is chunks:
+                stream.clear()
+            raise
+        return "".join(chunks)
+
+    async def _perform(self, agent: Agent, task: Task) -> AsyncIterator[str]:
+        """Produce the output of a task in chunks"""
+        # Simulate task execution
+        await asyncio.sleep(0.1)
+
+        # In production, this would stream from the actual AI model
+        mode = await self._execution_mode(agent)
+        yield await run_agent_task(self._executor, mode, agent.name, task.input)
+
+    async def _execution_mode(self, agent: Agent) -> ExecutionMode:
+        """Heaviest execution mode requested by the agent's skills"""
+        if self._skill_registry is None:
+            return self._executor.default_mode
+        configs = []
+        for skill_id in agent.config.skills:
+            skill = await self._skill_registry.get_skill(skill_id)
+            if skill is not None:
+                configs.append(skill.config)
+        return self._executor.heaviest(configs)
+
     async def get_agent_stats(self) -> Dict[str, Any]:
-        """Get aggregated agent statistics"""
-        total_tasks = sum(agent.task_count for agent in self._agents.values())
-        active_agents = sum(1 for agent in self._agents.values() 
-                          if agent.status == AgentStatus.RUNNING)
-        
+        """
+        Get aggregated agent statistics.
+
+        ``tasks`` counts tasks per state; finished states count every task
+        that ever finished, including ones no longer retained. Latencies
+        cover every execution, successful or not. Pools are reported after
+        dropping replicas that have been idle too long.
+        """
+        for pool in self._pools.values():
+            self._scale_down(pool)
+
         return {
             "total_agents": len(self._agents),
-            "active_agents": active_agents,
-            "total_tasks": total_tasks,
-            "agent_types": {
-                agent_type.value: sum(1 for a in self._agents.values() 
-                                     if a.agent_type == agent_type)
-                for agent_type in AgentType
-            }
+            "active_agents": len(self._running),
+            "total_tasks": self._total_tasks,
+            "tasks": dict(self._task_states),
+            "latency": self._latency.summary(),
+            "agents": {
+                agent_id: self._agent_metrics(agent_id)
+                for agent_id in self._agent_stats
+            },
+            "scheduler": self._scheduler.stats(),
+            "task_store": self._tasks.stats(),
+            "events": self._events.stats(),
+            "executor": self._executor.stats(),
+            "shared_state": (
+                {**self._backend.stats(), "tasks": self._shared_tasks.stats()}
+                if self._shared_tasks is not None
+                else None
+            ),
+            "persistence": self._store.stats() if self._store is not None else None,
+            "routing": self._router.stats(),
+            "pools": {
+                "agents": self._pooled,
+                "max_agents": settings.MAX_AGENTS,
+                "by_agent": {
+                    agent_id: pool.stats() for agent_id, pool in self._pools.items()
+                },
+            },
+            "dedup": {
+                "coalesced": self._coalesced,
+                "in_flight": len(self._flights),
+                "result_cache": self._results.stats(),
+            },
+            "agent_types": dict(self._agent_types),
+        }
+
+    async def get_agent_metrics(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        """Get task outcomes and latency percentiles of one agent"""
+        if agent_id not in self._agent_stats:
+            return None
+        return self._agent_metrics(agent_id)
+
+    def _agent_metrics(self, agent_id: str) -> Dict[str, Any]:
+        return {
+            **self._agent_stats[agent_id].to_dict(),
+            "policy": self._policy_counters[agent_id].to_dict(),
+            "circuit": self._breakers[agent_id].stats(),
         }
-    
+
     async def cleanup(self) -> None:
         """Cleanup resources"""
+        await self._scheduler.stop()
+        self._running.clear()
+        self._inflight.clear()
+        self._flights.clear()
+        self._results.clear()
+        self._unshared.clear()
+        if self._shared_tasks is not None:
+            self._shared_tasks.clear()
+        self._coalesced = 0
+        self._task_states.clear()
+        self._agent_stats.clear()
+        self._breakers.clear()
+        self._policy_counters.clear()
+        self._router.clear()
+        self._pools.clear()
+        self._pooled = 0
+        self._agent_types = {agent_type.value: 0 for agent_type in AgentType}
+        self._latency = LatencyHistogram()
+        self._total_tasks = 0
+
         for agent in self._agents.values():
             agent.status = AgentStatus.TERMINATED
-        
+
         self._agents.clear()
         self._tasks.clear()
         self._initialized = False
@@ -0,0 +1,115 @@
+"""
+Agent Pool
+Replicas of an agent that grow with demand and shrink when idle
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+import dataclasses
+import time
+
+
+class AgentPool:
+    """
+    Replicas of one agent sharing its tasks.
+
+    The pool starts with the agent itself, which is never removed. ``grow``
+    adds a replica with the same type and configuration, up to
+    ``max_size`` members, and ``shrink`` removes replicas that have been
+    idle for ``idle_timeout`` seconds. Each member runs up to ``slots``
+    tasks at once; ``acquire`` hands out the least busy member.
+    """
+
+    def __init__(
+        self,
+        agent: Any,
+        max_size: int,
+        slots: int,
+        idle_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.agent = agent
+        self.max_size = max(1, max_size)
+        self.slots = slots
+        self.idle_timeout = idle_timeout
+        self._clock = clock
+        self._members: List[Any] = [agent]
+        self._running: Dict[str, int] = {agent.id: 0}
+        self._idle_since: Dict[str, float] = {agent.id: clock()}
+        self._next_replica = 2
+        self.scaled_up = 0
+        self.scaled_down = 0
+
+    def __len__(self) -> int:
+        """Number of members"""
+        return len(self._members)
+
+    @property
+    def capacity(self) -> int:
+        """Number of tasks the members can run at once"""
+        return len(self._members) * self.slots
+
+    def running(self) -> int:
+        """Number of tasks the members are running"""
+        return sum(self._running.values())
+
+    def grow(self) -> Optional[Any]:
+        """Add a replica and return it, or None if the pool is full"""
+        if len(self._members) >= self.max_size:
+            return None
+
+        number = self._next_replica
+        self._next_replica += 1
+        replica = dataclasses.replace(
+            self.agent,
+            id=f"{self.agent.id}-{number}",
+            name=f"{self.agent.name} #{number}",
+        )
+        self._members.append(replica)
+        self._running[replica.id] = 0
+        self._idle_since[replica.id] = self._clock()
+        self.scaled_up += 1
+        return replica
+
+    def shrink(self) -> int:
+        """Remove replicas idle for longer than the timeout; returns how many"""
+        cutoff = self._clock() - self.idle_timeout
+        idle = [
+            member
+            for member in self._members[1:]
+            if self._idle_since.get(member.id, cutoff + 1) <= cutoff
+        ]
+        for member in idle:
+            self._members.remove(member)
+            del self._running[member.id]
+            del self._idle_since[member.id]
+        self.scaled_down += len(idle)
+        return len(idle)
+
+    def acquire(self) -> Any:
+        """Take a slot on the least busy member"""
+        member = min(self._members, key=lambda member: self._running[member.id])
+        self._running[member.id] += 1
+        self._idle_since.pop(member.id, None)
+        return member
+
+    def release(self, member: Any) -> None:
+        """Give back a slot taken with ``acquire``"""
+        remaining = self._running[member.id] - 1
+        self._running[member.id] = remaining
+        if not remaining:
+            self._idle_since[member.id] = self._clock()
+
+    def stats(self) -> Dict[str, Any]:
+        """Size, load and scaling counters"""
+        running = self.running()
+        return {
+            "agent_type": self.agent.agent_type.value,
+            "size": len(self._members),
+            "max_size": self.max_size,
+            "busy": sum(1 for count in self._running.values() if count),
+            "running": running,
+            "capacity": self.capacity,
+            "utilization": round(running / self.capacity * 100, 2),
+            "scaled_up": self.scaled_up,
+            "scaled_down": self.scaled_down,
+        }
@@ -0,0 +1,117 @@
+"""
+Agent Statistics
+Incrementally maintained task outcomes and fixed-memory latency histograms
+"""
+
+from typing import Any, Dict, List, Tuple
+from bisect import bisect_left
+from functools import lru_cache
+import math
+
+
+@lru_cache(maxsize=None)
+def _bucket_bounds(
+    min_value: float, max_value: float, growth: float
+) -> Tuple[float, ...]:
+    """Upper bounds of geometrically growing buckets, shared by histograms"""
+    count = math.ceil(math.log(max_value / min_value) / math.log(growth)) + 1
+    return tuple(min_value * growth**position for position in range(count))
+
+
+class LatencyHistogram:
+    """
+    Histogram of durations in seconds with logarithmic buckets.
+
+    Bucket bounds grow by ``growth`` from ``min_value`` to ``max_value``,
+    so a percentile is within ``growth - 1`` (5% by default) of the exact
+    value while memory stays fixed however many samples are recorded.
+    Longer durations fall into an overflow bucket reported as the
+    observed maximum.
+    """
+
+    __slots__ = ("_bounds", "_counts", "count", "total", "max")
+
+    def __init__(
+        self, min_value: float = 0.001, max_value: float = 600.0, growth: float = 1.05
+    ):
+        self._bounds = _bucket_bounds(min_value, max_value, growth)
+        self._counts: List[int] = [0] * (len(self._bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """Add one duration"""
+        self._counts[bisect_left(self._bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentiles(self, *quantiles: float) -> List[float]:
+        """Durations at the given percentiles (0-100), in one pass over the buckets"""
+        if not self.count:
+            return [0.0] * len(quantiles)
+
+        ranks = sorted(
+            (max(1, math.ceil(quantile / 100 * self.count)), position)
+            for position, quantile in enumerate(quantiles)
+        )
+        results = [0.0] * len(quantiles)
+        seen = 0
+        next_rank = 0
+        for bucket, bucket_count in enumerate(self._counts):
+            seen += bucket_count
+            while next_rank < len(ranks) and ranks[next_rank][0] <= seen:
+                bound = self._bounds[bucket] if bucket < len(self._bounds) else self.max
+                results[ranks[next_rank][1]] = min(bound, self.max)
+                next_rank += 1
+            if next_rank == len(ranks):
+                break
+        return results
+
+    def summary(self) -> Dict[str, Any]:
+        """Sample count, mean, p50/p95/p99 and maximum in milliseconds"""
+        p50, p95, p99 = self.percentiles(50, 95, 99)
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(p50 * 1000, 3),
+            "p95_ms": round(p95 * 1000, 3),
+            "p99_ms": round(p99 * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class AgentStats:
+    """Outcome counters and execution latency of one agent"""
+
+    __slots__ = ("completed", "failed", "latency")
+
+    def __init__(self):
+        self.completed = 0
+        self.failed = 0
+        self.latency = LatencyHistogram()
+
+    @property
+    def success_rate(self) -> float:
+        """Percentage of finished tasks that completed"""
+        finished = self.completed + self.failed
+        return round(self.completed / finished * 100, 2) if finished else 100.0
+
+    def record(self, succeeded: bool, duration: float) -> None:
+        """Count a finished execution"""
+        if succeeded:
+            self.completed += 1
+        else:
+            self.failed += 1
+        self.latency.record(duration)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Counters and latency summary"""
+        return {
+            "completed": self.completed,
+            "failed": self.failed,
+            "success_rate": self.success_rate,
+            "latency": self.latency.summary(),
+        }
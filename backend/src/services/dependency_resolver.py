@@ -0,0 +1,128 @@
+"""
+Dependency Resolver
+Transitive dependency closures for skills with cycle detection
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+
+class DependencyError(Exception):
+    """Raised when a set of skills cannot be resolved"""
+
+
+class MissingSkillError(DependencyError):
+    """Raised when a requested skill or one of its dependencies does not exist"""
+
+    def __init__(self, skill_id: str, required_by: Optional[str] = None):
+        self.skill_id = skill_id
+        self.required_by = required_by
+        if required_by:
+            super().__init__(
+                f"Skill '{skill_id}' required by '{required_by}' not found"
+            )
+        else:
+            super().__init__(f"Skill '{skill_id}' not found")
+
+
+class DependencyCycleError(DependencyError):
+    """Raised when skill dependencies form a cycle"""
+
+    def __init__(self, cycle: List[str]):
+        self.cycle = cycle
+        super().__init__(f"Dependency cycle: {' -> '.join(cycle)}")
+
+
+class DependencyResolver:
+    """
+    Computes dependency closures in install order (dependencies first).
+
+    Closures are memoized per skill. ``invalidate`` drops every memoized
+    closure containing a changed skill, so unrelated closures survive
+    catalog updates.
+    """
+
+    def __init__(self, get_dependencies: Callable[[str], Optional[Sequence[str]]]):
+        self._get_dependencies = get_dependencies
+        self._closures: Dict[str, Tuple[str, ...]] = {}
+        self._dependents: Dict[str, Set[str]] = {}
+
+    def closure(self, skill_id: str) -> Tuple[str, ...]:
+        """Return a skill and all its transitive dependencies in install order"""
+        cached = self._closures.get(skill_id)
+        if cached is not None:
+            return cached
+
+        order: List[str] = []
+        done: Set[str] = set()
+        path = [skill_id]
+        on_path = {skill_id}
+        stack = [(skill_id, iter(self._dependencies(skill_id, None)))]
+
+        while stack:
+            node, dependencies = stack[-1]
+            for dependency in dependencies:
+                if dependency in done:
+                    continue
+                if dependency in on_path:
+                    raise DependencyCycleError(
+                        path[path.index(dependency) :] + [dependency]
+                    )
+
+                memoized = self._closures.get(dependency)
+                if memoized is not None:
+                    for member in memoized:
+                        if member not in done:
+                            done.add(member)
+                            order.append(member)
+                    continue
+
+                path.append(dependency)
+                on_path.add(dependency)
+                stack.append((dependency, iter(self._dependencies(dependency, node))))
+                break
+            else:
+                stack.pop()
+                path.pop()
+                on_path.discard(node)
+                done.add(node)
+                order.append(node)
+
+        closure = tuple(order)
+        self._closures[skill_id] = closure
+        for member in closure:
+            self._dependents.setdefault(member, set()).add(skill_id)
+        return closure
+
+    def resolve(self, skill_ids: Iterable[str]) -> List[str]:
+        """Return the deduplicated union of closures in install order"""
+        order: List[str] = []
+        seen: Set[str] = set()
+        for skill_id in skill_ids:
+            for member in self.closure(skill_id):
+                if member not in seen:
+                    seen.add(member)
+                    order.append(member)
+        return order
+
+    def invalidate(self, skill_id: str) -> None:
+        """Forget every memoized closure that contains a skill"""
+        for root in self._dependents.pop(skill_id, ()):
+            for member in self._closures.pop(root, ()):
+                if member == skill_id:
+                    continue
+                roots = self._dependents.get(member)
+                if roots is not None:
+                    roots.discard(root)
+                    if not roots:
+                        del self._dependents[member]
+
+    def clear(self) -> None:
+        """Forget all memoized closures"""
+        self._closures.clear()
+        self._dependents.clear()
+
+    def _dependencies(self, skill_id: str, required_by: Optional[str]) -> Sequence[str]:
+        dependencies = self._get_dependencies(skill_id)
+        if dependencies is None:
+            raise MissingSkillError(skill_id, required_by)
+        return dependencies
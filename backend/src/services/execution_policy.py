@@ -0,0 +1,254 @@
+"""
+Execution Policy
+Retries with jittered backoff, hedged attempts and circuit breaking
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, TypeVar
+from dataclasses import dataclass
+import asyncio
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because its circuit is open"""
+
+    def __init__(self, name: str):
+        self.name = name
+        super().__init__(f"Circuit open for {name}")
+
+
+class CircuitBreaker:
+    """
+    Fails fast after repeated failures and recovers through probes.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    every call is rejected. Once ``reset_timeout`` seconds have passed it
+    turns half-open and lets ``half_open_probes`` calls through: a success
+    closes it again, a failure reopens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        half_open_probes: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self._clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        """Current state, turning half-open once the reset timeout has passed"""
+        if (
+            self._state == self.OPEN
+            and self._clock() - self._opened_at >= self.reset_timeout
+        ):
+            self._state = self.HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may proceed; reserves a probe while half-open"""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and self._probes < self.half_open_probes:
+            self._probes += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        """Report a successful call"""
+        self._failures = 0
+        self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        """Report a failed call"""
+        self._failures += 1
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                self.opened += 1
+                logger.warning(
+                    f"Circuit for {self.name} opened after {self._failures} failures"
+                )
+            self._state = self.OPEN
+            self._opened_at = self._clock()
+
+    def record_cancelled(self) -> None:
+        """Report a call that was abandoned before it finished"""
+        if self._state == self.HALF_OPEN and self._probes:
+            self._probes -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """State and counters"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+class PolicyCounters:
+    """Retry and hedging counters for one agent"""
+
+    __slots__ = ("retries", "hedges", "hedge_wins")
+
+    def __init__(self):
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        """Counter values"""
+        return {
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+        }
+
+
+@dataclass
+class ExecutionPolicy:
+    """
+    How a unit of work is attempted.
+
+    A failed attempt is retried up to ``retries`` times after a random
+    delay of up to ``backoff_base * 2 ** retry`` seconds, capped at
+    ``backoff_max`` ("full jitter"). When ``hedge_delay`` is set and an
+    attempt is still running after that many seconds, a duplicate is
+    started and the first to succeed wins; the other is cancelled. With a
+    ``deadline`` (event loop time), no retry is started that could not
+    begin before it.
+    """
+
+    retries: int = 0
+    backoff_base: float = 0.1
+    backoff_max: float = 2.0
+    hedge_delay: Optional[float] = None
+    deadline: Optional[float] = None
+
+    def backoff(self, retry: int) -> float:
+        """Delay before a retry"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**retry))
+
+    async def run(
+        self,
+        attempt: Callable[[], Awaitable[T]],
+        breaker: Optional[CircuitBreaker] = None,
+        counters: Optional[PolicyCounters] = None,
+    ) -> T:
+        """
+        Run ``attempt`` under the policy and return the first successful result.
+
+        Raises ``CircuitOpenError`` when the breaker rejects the first
+        attempt, and the last attempt's exception once retries are
+        exhausted or the breaker rejects a retry.
+        """
+        counters = counters or PolicyCounters()
+        retry = 0
+        error: Optional[Exception] = None
+        while True:
+            if breaker is not None and not breaker.allow():
+                # A retry cut short by the breaker reports the real failure
+                if error is not None:
+                    raise error
+                raise CircuitOpenError(breaker.name)
+            try:
+                return await self._hedged(attempt, breaker, counters)
+            except Exception as e:
+                error = e
+                if retry >= self.retries:
+                    raise
+                delay = self.backoff(retry)
+                if not self._time_left(delay):
+                    raise
+                logger.warning(
+                    f"Attempt {retry + 1} failed ({e!r}), retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+                counters.retries += 1
+                retry += 1
+
+    async def _hedged(
+        self,
+        attempt: Callable[[], Awaitable[T]],
+        breaker: Optional[CircuitBreaker],
+        counters: PolicyCounters,
+    ) -> T:
+        primary = asyncio.ensure_future(self._tracked(attempt, breaker))
+        if self.hedge_delay is None:
+            return await primary
+
+        pending: Set[asyncio.Future] = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.hedge_delay)
+            if done:
+                return primary.result()
+
+            if self._time_left(0) and (breaker is None or breaker.allow()):
+                counters.hedges += 1
+                pending.add(asyncio.ensure_future(self._tracked(attempt, breaker)))
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    if future.exception() is None:
+                        if future is not primary:
+                            counters.hedge_wins += 1
+                        return future.result()
+                    error = future.exception()
+            raise error
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _time_left(self, delay: float) -> bool:
+        """Whether an attempt started after ``delay`` seconds beats the deadline"""
+        if self.deadline is None:
+            return True
+        return asyncio.get_running_loop().time() + delay < self.deadline
+
+    @staticmethod
+    async def _tracked(
+        attempt: Callable[[], Awaitable[T]], breaker: Optional[CircuitBreaker]
+    ) -> T:
+        """Run one attempt and report its outcome to the breaker"""
+        try:
+            result = await attempt()
+        except asyncio.CancelledError:
+            if breaker is not None:
+                breaker.record_cancelled()
+            raise
+        except Exception:
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+        if breaker is not None:
+            breaker.record_success()
+        return result
@@ -0,0 +1,260 @@
+"""
+HTTP Client
+Shared pooled async HTTP client for outbound skill calls
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import functools
+import importlib.util
+import logging
+import socket
+import time
+
+import httpcore
+import httpx
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CachingNetworkBackend(httpcore.AsyncNetworkBackend):
+    """
+    Network backend that caches DNS lookups for ``ttl`` seconds.
+
+    Concurrent lookups of one host share a single query. Connections are
+    opened to a resolved address, trying each in turn; TLS still verifies
+    the original host name.
+    """
+
+    def __init__(
+        self, ttl: float, backend: Optional[httpcore.AsyncNetworkBackend] = None
+    ):
+        self.ttl = ttl
+        self._backend = backend or httpcore.AnyIOBackend()
+        self._addresses: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+        self._lookups: Dict[Tuple[str, int], "asyncio.Future[List[str]]"] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float] = None,
+        local_address: Optional[str] = None,
+        socket_options: Optional[Iterable[Any]] = None,
+    ) -> httpcore.AsyncNetworkStream:
+        addresses = await self._resolve(host, port)
+        for address in addresses[:-1]:
+            try:
+                return await self._backend.connect_tcp(
+                    address, port, timeout, local_address, socket_options
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout):
+                continue
+        try:
+            return await self._backend.connect_tcp(
+                addresses[-1], port, timeout, local_address, socket_options
+            )
+        except (httpcore.ConnectError, httpcore.ConnectTimeout):
+            # Let the next connection resolve again
+            self._addresses.pop((host, port), None)
+            raise
+
+    async def connect_unix_socket(
+        self,
+        path: str,
+        timeout: Optional[float] = None,
+        socket_options: Optional[Iterable[Any]] = None,
+    ) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(path, timeout, socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hosts": len(self._addresses),
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    async def _resolve(self, host: str, port: int) -> List[str]:
+        key = (host, port)
+        cached = self._addresses.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self.hits += 1
+            return cached[1]
+
+        lookup = self._lookups.get(key)
+        if lookup is not None:
+            self.hits += 1
+            return await asyncio.shield(lookup)
+
+        self.misses += 1
+        lookup = self._lookups[key] = asyncio.ensure_future(self._lookup(host, port))
+        lookup.add_done_callback(lambda _: self._lookups.pop(key, None))
+        return await asyncio.shield(lookup)
+
+    async def _lookup(self, host: str, port: int) -> List[str]:
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                host, port, type=socket.SOCK_STREAM
+            )
+        except socket.gaierror as e:
+            raise httpcore.ConnectError(str(e)) from e
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        self._addresses[(host, port)] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+
+class _HostLimitedStream(httpx.AsyncByteStream):
+    """Response body that frees its host slot when closed"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+
+class PooledTransport(httpx.AsyncHTTPTransport):
+    """
+    httpx transport with per-host connection limits and cached DNS.
+
+    Connections are kept alive and reused per origin by the underlying
+    pool, which holds at most ``max_connections``. At most
+    ``max_per_host`` requests to one host are in flight at once; further
+    ones wait for a slot, which is counted as pool saturation.
+    """
+
+    def __init__(
+        self,
+        max_connections: int,
+        max_per_host: int,
+        max_keepalive: int,
+        keepalive_expiry: float,
+        http2: bool,
+        dns_ttl: float,
+    ):
+        # AsyncHTTPTransport.__init__ only builds ``_pool``, and cannot pass
+        # it a network backend, so the pool is built here instead
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.http2 = http2
+        self.dns = CachingNetworkBackend(dns_ttl)
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+            http1=True,
+            http2=http2,
+            network_backend=self.dns,
+        )
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight: Dict[str, int] = {}
+        self.requests = 0
+        self.waits = 0
+        self.max_wait_ms = 0.0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        slot = self._slots.get(host)
+        if slot is None:
+            slot = self._slots[host] = asyncio.Semaphore(self.max_per_host)
+
+        self.requests += 1
+        if slot.locked():
+            self.waits += 1
+            started = time.perf_counter()
+            await slot.acquire()
+            self.max_wait_ms = max(
+                self.max_wait_ms, (time.perf_counter() - started) * 1000
+            )
+        else:
+            await slot.acquire()
+
+        self._in_flight[host] = self._in_flight.get(host, 0) + 1
+        try:
+            response = await super().handle_async_request(request)
+        except BaseException:
+            self._done(host, slot)
+            raise
+        response.stream = _HostLimitedStream(
+            response.stream, functools.partial(self._done, host, slot)
+        )
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Connection pool usage and saturation"""
+        connections = self._pool.connections
+        idle = sum(1 for connection in connections if connection.is_idle())
+        active = len(connections) - idle
+        return {
+            "http2": self.http2,
+            "max_connections": self.max_connections,
+            "max_per_host": self.max_per_host,
+            "connections": len(connections),
+            "active": active,
+            "idle": idle,
+            "saturation": (
+                round(active / self.max_connections, 3) if self.max_connections else 0.0
+            ),
+            "in_flight": sum(self._in_flight.values()),
+            "in_flight_by_host": {host: n for host, n in self._in_flight.items() if n},
+            "requests": self.requests,
+            "host_limit_waits": self.waits,
+            "max_wait_ms": round(self.max_wait_ms, 3),
+            "dns": self.dns.stats(),
+        }
+
+    def _done(self, host: str, slot: asyncio.Semaphore) -> None:
+        self._in_flight[host] -= 1
+        slot.release()
+
+
+def http2_available() -> bool:
+    """Whether the ``h2`` package needed for HTTP/2 is installed"""
+    return importlib.util.find_spec("h2") is not None
+
+
+def create_transport() -> PooledTransport:
+    """Transport configured from the ``HTTP_CLIENT_*`` settings"""
+    http2 = settings.HTTP_CLIENT_HTTP2 and http2_available()
+    if settings.HTTP_CLIENT_HTTP2 and not http2:
+        logger.warning("HTTP/2 requested but h2 is not installed, using HTTP/1.1")
+
+    return PooledTransport(
+        max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+        max_per_host=settings.HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST,
+        max_keepalive=settings.HTTP_CLIENT_MAX_KEEPALIVE,
+        keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY,
+        http2=http2,
+        dns_ttl=settings.HTTP_CLIENT_DNS_TTL,
+    )
+
+
+def create_http_client(transport: PooledTransport) -> httpx.AsyncClient:
+    """Shared client sending requests through ``transport``"""
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=settings.HTTP_CLIENT_TIMEOUT,
+        headers={"User-Agent": f"{settings.APP_NAME}/{settings.VERSION}"},
+        follow_redirects=True,
+    )
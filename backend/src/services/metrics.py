@@ -0,0 +1,300 @@
+"""
+Metrics
+Prometheus histograms for request and subsystem latencies
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from bisect import bisect_left
+import time
+
+from prometheus_client import CollectorRegistry, generate_latest
+from prometheus_client.core import (
+    CounterMetricFamily,
+    GaugeMetricFamily,
+    HistogramMetricFamily,
+)
+from prometheus_client.gc_collector import GCCollector
+from prometheus_client.platform_collector import PlatformCollector
+from prometheus_client.process_collector import ProcessCollector
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+SIZE_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class Histogram:
+    """
+    Cumulative-on-read histogram with fixed upper bounds.
+
+    Observing is a bisect and three additions with no lock: every
+    observation comes from the event loop thread, and a scrape only reads
+    the counts, so at worst it sees one observation half applied.
+    """
+
+    __slots__ = ("bounds", "_counts", "count", "sum")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self._counts: List[int] = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Add one sample"""
+        self._counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def buckets(self) -> List[Tuple[str, int]]:
+        """Cumulative ``(le, count)`` pairs ending with ``+Inf``"""
+        cumulative = []
+        seen = 0
+        for bound, count in zip(self.bounds, self._counts):
+            seen += count
+            cumulative.append((repr(float(bound)), seen))
+        cumulative.append(("+Inf", seen + self._counts[-1]))
+        return cumulative
+
+
+class HistogramVec:
+    """Histograms of one metric keyed by label values"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str],
+        bounds: Sequence[float],
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.bounds = tuple(bounds)
+        self._children: Dict[Tuple[str, ...], Histogram] = {}
+
+    def labels(self, *values: str) -> Histogram:
+        """Histogram for one combination of label values"""
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = Histogram(self.bounds)
+        return child
+
+    def family(self) -> HistogramMetricFamily:
+        family = HistogramMetricFamily(
+            self.name, self.documentation, labels=self.label_names
+        )
+        # Copy first: a new label set may be added while this runs
+        for values, child in list(self._children.items()):
+            family.add_metric(list(values), child.buckets(), child.sum)
+        return family
+
+
+class Metrics:
+    """
+    Request and subsystem latencies exposed in the Prometheus text format.
+
+    Hot paths only observe into the histograms here. Queue depths, pool
+    usage and cache hit ratios already kept by the services are read when
+    Prometheus scrapes, so they cost nothing between scrapes.
+    """
+
+    def __init__(self):
+        self.request_duration = HistogramVec(
+            "athena_http_request_duration_seconds",
+            "HTTP request latency by route template",
+            ("method", "route", "status"),
+            LATENCY_BUCKETS,
+        )
+        self.search_duration = HistogramVec(
+            "athena_skill_search_duration_seconds",
+            "Skill registry search latency",
+            ("cache",),
+            LATENCY_BUCKETS,
+        )
+        self.search_matches = Histogram(SIZE_BUCKETS)
+        self.task_queue_wait = Histogram(LATENCY_BUCKETS)
+        self.task_duration = HistogramVec(
+            "athena_task_duration_seconds",
+            "Task execution time by agent and outcome",
+            ("agent", "status"),
+            LATENCY_BUCKETS,
+        )
+        self._registry = CollectorRegistry(auto_describe=False)
+        ProcessCollector(registry=self._registry)
+        PlatformCollector(registry=self._registry)
+        GCCollector(registry=self._registry)
+
+    def render(
+        self,
+        agent_stats: Optional[Dict[str, Any]] = None,
+        skill_cache: Optional[Dict[str, Any]] = None,
+    ) -> bytes:
+        """Metrics in the text format, with gauges from the given service stats"""
+        families = list(self._histograms())
+        if agent_stats is not None:
+            families.extend(_agent_families(agent_stats))
+        caches = {"skill_query": skill_cache}
+        if agent_stats is not None:
+            caches["task_result"] = agent_stats["dedup"]["result_cache"]
+            if agent_stats["shared_state"] is not None:
+                caches["shared_tasks"] = agent_stats["shared_state"]["tasks"]
+        families.extend(_cache_families(caches))
+
+        registry = CollectorRegistry(auto_describe=False)
+        registry.register(_Families(families))
+        return generate_latest(self._registry) + generate_latest(registry)
+
+    def _histograms(self) -> Iterator[Any]:
+        yield self.request_duration.family()
+        yield self.search_duration.family()
+        yield _histogram_family(
+            "athena_skill_search_matches",
+            "Skills matching each search",
+            self.search_matches,
+        )
+        yield _histogram_family(
+            "athena_task_queue_wait_seconds",
+            "Time tasks wait in the scheduler queue before running",
+            self.task_queue_wait,
+        )
+        yield self.task_duration.family()
+
+
+class _Families:
+    """Collector returning families built for one scrape"""
+
+    def __init__(self, families: List[Any]):
+        self._families = families
+
+    def collect(self) -> Iterable[Any]:
+        return self._families
+
+
+def _histogram_family(
+    name: str, documentation: str, histogram: Histogram
+) -> HistogramMetricFamily:
+    family = HistogramMetricFamily(name, documentation)
+    family.add_metric([], histogram.buckets(), histogram.sum)
+    return family
+
+
+def _agent_families(stats: Dict[str, Any]) -> Iterator[Any]:
+    scheduler = stats["scheduler"]
+    yield GaugeMetricFamily(
+        "athena_scheduler_queued_tasks",
+        "Tasks waiting in the scheduler queue",
+        value=scheduler["queued"],
+    )
+    yield GaugeMetricFamily(
+        "athena_scheduler_parked_tasks",
+        "Queued tasks held back by their agent's concurrency limit",
+        value=scheduler["parked"],
+    )
+    yield GaugeMetricFamily(
+        "athena_scheduler_running_tasks",
+        "Tasks running now",
+        value=scheduler["running"],
+    )
+    yield CounterMetricFamily(
+        "athena_scheduler_rejected_tasks",
+        "Tasks rejected because the queue was full",
+        value=scheduler["rejected"],
+    )
+
+    replicas = GaugeMetricFamily(
+        "athena_agent_replicas", "Replicas in each agent pool", labels=["agent"]
+    )
+    busy = GaugeMetricFamily(
+        "athena_agent_busy_replicas", "Replicas running a task", labels=["agent"]
+    )
+    for agent_id, pool in stats["pools"]["by_agent"].items():
+        replicas.add_metric([agent_id], pool["size"])
+        busy.add_metric([agent_id], pool["busy"])
+    yield replicas
+    yield busy
+
+    yield CounterMetricFamily(
+        "athena_tasks_coalesced",
+        "Tasks answered by an identical task in flight",
+        value=stats["dedup"]["coalesced"],
+    )
+
+
+def _cache_families(caches: Dict[str, Optional[Dict[str, Any]]]) -> Iterator[Any]:
+    hits = CounterMetricFamily(
+        "athena_cache_hits", "Cache lookups answered from the cache", labels=["cache"]
+    )
+    misses = CounterMetricFamily(
+        "athena_cache_misses", "Cache lookups that missed", labels=["cache"]
+    )
+    ratio = GaugeMetricFamily(
+        "athena_cache_hit_ratio", "Share of cache lookups that hit", labels=["cache"]
+    )
+    size = GaugeMetricFamily(
+        "athena_cache_entries", "Entries held by the cache", labels=["cache"]
+    )
+    for name, stats in caches.items():
+        if stats is None:
+            continue
+        hits.add_metric([name], stats["hits"])
+        misses.add_metric([name], stats["misses"])
+        ratio.add_metric([name], stats["hit_ratio"])
+        size.add_metric([name], stats["size"])
+    yield hits
+    yield misses
+    yield ratio
+    yield size
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing each HTTP request.
+
+    Requests are labelled with the template of the route that handled
+    them, such as ``/api/skills/{skill_id}``, so IDs in paths do not
+    create new series; requests matching no route share ``unmatched``.
+    """
+
+    def __init__(self, app: Any, registry: Optional[Metrics] = None):
+        self.app = app
+        self.metrics = registry if registry is not None else metrics
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            self.metrics.request_duration.labels(
+                scope["method"], getattr(route, "path", "unmatched"), str(status)
+            ).observe(time.perf_counter() - started)
+
+
+metrics = Metrics()
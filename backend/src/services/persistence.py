@@ -0,0 +1,334 @@
+"""
+Persistence
+Write-behind storage of tasks, skill usage and agent activity in SQL
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+from datetime import datetime
+import asyncio
+import logging
+import time
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, Text, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+
+logger = logging.getLogger(__name__)
+
+metadata = MetaData()
+
+tasks_table = Table(
+    "tasks",
+    metadata,
+    Column("id", String(36), primary_key=True),
+    Column("agent_id", String(64), nullable=False, index=True),
+    Column("input", Text, nullable=False),
+    Column("output", Text),
+    Column("status", String(16), nullable=False),
+    Column("error", Text),
+    Column("attempts", Integer, nullable=False, default=0),
+    Column("created_at", DateTime, nullable=False),
+    Column("completed_at", DateTime),
+)
+
+skill_usage_table = Table(
+    "skill_usage",
+    metadata,
+    Column("skill_id", String(128), primary_key=True),
+    Column("installs", Integer, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+agent_activity_table = Table(
+    "agent_activity",
+    metadata,
+    Column("agent_id", String(64), primary_key=True),
+    Column("task_count", Integer, nullable=False),
+    Column("last_active", DateTime),
+)
+
+TASK_COLUMNS = tuple(column.name for column in tasks_table.columns)
+
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """``DATABASE_URL`` with the async driver for its database"""
+    scheme, separator, rest = url.partition("://")
+    if "+" in scheme or not separator:
+        return url
+    return f"{_ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+
+class WriteBehindStore:
+    """
+    Buffers writes in memory and flushes them to the database in bulk.
+
+    Recording a write never touches the database: task changes are
+    coalesced by task ID (the latest state is written), skill installs
+    and agent task counts are summed. A background task flushes every
+    ``flush_interval`` seconds, or as soon as ``batch_size`` writes are
+    pending, with one upsert per table in a single transaction. At most
+    ``max_backlog`` writes are held; further ones are dropped and counted
+    until a flush makes room. A failed flush is retried with the next one.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        batch_size: int,
+        flush_interval: float,
+        max_backlog: int,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.url = async_database_url(url)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backlog = max_backlog
+        self._clock = clock
+        self._engine: Optional[AsyncEngine] = None
+        self._tasks: Dict[str, Any] = {}
+        self._installs: Dict[str, int] = {}
+        self._agents: Dict[str, List[Any]] = {}
+        self._wakeup = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self.flushes = 0
+        self.rows_written = 0
+        self.dropped = 0
+        self.failures = 0
+        self.last_flush_ms = 0.0
+
+    def __len__(self) -> int:
+        """Number of pending writes"""
+        return len(self._tasks) + len(self._installs) + len(self._agents)
+
+    async def start(self) -> None:
+        """Connect, create missing tables and start flushing"""
+        self._engine = create_async_engine(self.url, pool_pre_ping=True)
+        async with self._engine.begin() as connection:
+            await connection.run_sync(metadata.create_all)
+        self._stopping.clear()
+        self._flusher = asyncio.create_task(
+            self._flush_loop(), name="write-behind-flusher"
+        )
+        logger.info(
+            f"Write-behind store connected to {self._engine.url.render_as_string()}"
+        )
+
+    async def close(self) -> None:
+        """Flush what is pending and disconnect"""
+        if self._flusher is not None:
+            # Let a flush in progress finish rather than cancelling it
+            self._stopping.set()
+            self._wakeup.set()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        if self._engine is not None:
+            await self.flush()
+            await self._engine.dispose()
+            self._engine = None
+
+    def record_task(self, task: Any) -> None:
+        """Queue the current state of a task; read when flushed"""
+        if task.id not in self._tasks and not self._has_room():
+            return
+        self._tasks[task.id] = task
+        self._pending_changed()
+
+    def record_install(self, skill_id: str, count: int = 1) -> None:
+        """Queue installs of a skill"""
+        if skill_id not in self._installs and not self._has_room():
+            return
+        self._installs[skill_id] = self._installs.get(skill_id, 0) + count
+        self._pending_changed()
+
+    def record_agent_task(self, agent_id: str, last_active: datetime) -> None:
+        """Queue a new task of an agent"""
+        pending = self._agents.get(agent_id)
+        if pending is None:
+            if not self._has_room():
+                return
+            self._agents[agent_id] = [1, last_active]
+        else:
+            pending[0] += 1
+            pending[1] = last_active
+        self._pending_changed()
+
+    async def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Stored columns of a task, including writes not flushed yet"""
+        task = self._tasks.get(task_id)
+        if task is not None:
+            return self._task_row(task)
+        async with self._engine.connect() as connection:
+            result = await connection.execute(
+                select(tasks_table).where(tasks_table.c.id == task_id)
+            )
+            row = result.mappings().first()
+        return dict(row) if row else None
+
+    async def load_installs(self) -> Dict[str, int]:
+        """Stored install counts by skill ID"""
+        async with self._engine.connect() as connection:
+            result = await connection.execute(
+                select(skill_usage_table.c.skill_id, skill_usage_table.c.installs)
+            )
+            return {skill_id: installs for skill_id, installs in result}
+
+    async def load_agent_activity(self) -> Dict[str, Dict[str, Any]]:
+        """Stored task counts and last activity by agent ID"""
+        async with self._engine.connect() as connection:
+            result = await connection.execute(select(agent_activity_table))
+            return {row["agent_id"]: dict(row) for row in result.mappings()}
+
+    async def flush(self) -> int:
+        """Write everything pending now; returns the number of rows written"""
+        async with self._flush_lock:
+            if not len(self):
+                return 0
+            tasks, self._tasks = self._tasks, {}
+            installs, self._installs = self._installs, {}
+            agents, self._agents = self._agents, {}
+
+            started = self._clock()
+            task_rows = [self._task_row(task) for task in tasks.values()]
+            try:
+                async with self._engine.begin() as connection:
+                    await self._write(connection, task_rows, installs, agents)
+            except Exception as e:
+                self.failures += 1
+                logger.error(
+                    f"Write-behind flush of {len(task_rows)} tasks failed: {e}"
+                )
+                self._restore(tasks, installs, agents)
+                return 0
+            except asyncio.CancelledError:
+                self._restore(tasks, installs, agents)
+                raise
+
+            written = len(task_rows) + len(installs) + len(agents)
+            self.flushes += 1
+            self.rows_written += written
+            self.last_flush_ms = round((self._clock() - started) * 1000, 3)
+            return written
+
+    def stats(self) -> Dict[str, Any]:
+        """Backlog and flush counters"""
+        return {
+            "pending": len(self),
+            "max_backlog": self.max_backlog,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "dropped": self.dropped,
+            "failures": self.failures,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+    def _has_room(self) -> bool:
+        if len(self) < self.max_backlog:
+            return True
+        self.dropped += 1
+        if self.dropped == 1 or self.dropped % 1000 == 0:
+            logger.warning(f"Write-behind backlog full, {self.dropped} writes dropped")
+        return False
+
+    def _pending_changed(self) -> None:
+        if len(self) >= self.batch_size:
+            self._wakeup.set()
+
+    async def _flush_loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    @staticmethod
+    def _task_row(task: Any) -> Dict[str, Any]:
+        return {name: getattr(task, name) for name in TASK_COLUMNS}
+
+    def _restore(
+        self,
+        tasks: Dict[str, Any],
+        installs: Dict[str, int],
+        agents: Dict[str, List[Any]],
+    ) -> None:
+        """Put back the writes of a failed flush under newer ones"""
+        self._tasks = {**tasks, **self._tasks}
+        for skill_id, count in installs.items():
+            self._installs[skill_id] = self._installs.get(skill_id, 0) + count
+        for agent_id, (count, last_active) in agents.items():
+            pending = self._agents.setdefault(agent_id, [0, last_active])
+            pending[0] += count
+
+    async def _write(
+        self,
+        connection: AsyncConnection,
+        task_rows: List[Dict[str, Any]],
+        installs: Dict[str, int],
+        agents: Dict[str, List[Any]],
+    ) -> None:
+        """Upsert each table's pending rows in batches of ``batch_size``"""
+        if connection.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        if task_rows:
+            stmt = insert(tasks_table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[tasks_table.c.id],
+                set_={
+                    name: stmt.excluded[name] for name in TASK_COLUMNS if name != "id"
+                },
+            )
+            for start in range(0, len(task_rows), self.batch_size):
+                await connection.execute(
+                    stmt, task_rows[start : start + self.batch_size]
+                )
+
+        if installs:
+            now = datetime.utcnow()
+            stmt = insert(skill_usage_table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[skill_usage_table.c.skill_id],
+                set_={
+                    "installs": skill_usage_table.c.installs + stmt.excluded.installs,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            )
+            await connection.execute(
+                stmt,
+                [
+                    {"skill_id": skill_id, "installs": count, "updated_at": now}
+                    for skill_id, count in installs.items()
+                ],
+            )
+
+        if agents:
+            stmt = insert(agent_activity_table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[agent_activity_table.c.agent_id],
+                set_={
+                    "task_count": agent_activity_table.c.task_count
+                    + stmt.excluded.task_count,
+                    "last_active": stmt.excluded.last_active,
+                },
+            )
+            await connection.execute(
+                stmt,
+                [
+                    {
+                        "agent_id": agent_id,
+                        "task_count": count,
+                        "last_active": last_active,
+                    }
+                    for agent_id, (count, last_active) in agents.items()
+                ],
+            )
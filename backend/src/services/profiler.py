@@ -0,0 +1,312 @@
+"""
+Profiler
+On-demand cProfile capture of requests and statistical sampling of a worker
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from collections import Counter
+from datetime import datetime
+import cProfile
+import heapq
+import hmac
+import itertools
+import marshal
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+
+# (file, line, function) as used by pstats
+FunctionKey = Tuple[str, int, str]
+
+
+def _label(filename: str, line: int, name: str) -> str:
+    """Frame label for collapsed stacks"""
+    if filename == "~":
+        return name  # built-in
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def collapse_pstats(stats: Dict[FunctionKey, Any], max_depth: int = 64) -> str:
+    """
+    Collapsed-stack text approximated from cProfile's call graph.
+
+    cProfile keeps caller/callee edges rather than whole stacks, so a
+    function's time is split between its callers in proportion to the
+    time each edge accounts for. Values are microseconds.
+    """
+    callees: Dict[FunctionKey, Dict[FunctionKey, float]] = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, {})[func] = edge[3]
+
+    lines: Counter = Counter()
+
+    def walk(func: FunctionKey, stack: List[FunctionKey], share: float) -> None:
+        _, _, own, total, _ = stats[func]
+        path = ";".join(_label(*frame) for frame in stack)
+        lines[path] += own * share * 1_000_000
+        if len(stack) >= max_depth:
+            return
+        for callee, edge_time in callees.get(func, {}).items():
+            callee_total = stats[callee][3]
+            callee_share = edge_time * share / callee_total if callee_total else 0.0
+            if callee in stack or callee_total * callee_share < 1e-6:
+                continue
+            walk(callee, stack + [callee], callee_share)
+
+    for func, (_, _, _, _, callers) in stats.items():
+        if not callers:
+            walk(func, [func], 1.0)
+
+    return "".join(
+        f"{path} {round(value)}\n"
+        for path, value in sorted(lines.items())
+        if round(value) > 0
+    )
+
+
+class RequestProfile:
+    """cProfile statistics of one request"""
+
+    __slots__ = ("id", "method", "path", "status", "duration", "started_at", "stats")
+
+    def __init__(
+        self,
+        method: str,
+        path: str,
+        status: int,
+        duration: float,
+        started_at: datetime,
+        stats: Dict[FunctionKey, Any],
+    ):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.status = status
+        self.duration = duration
+        self.started_at = started_at
+        self.stats = stats
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "duration_ms": round(self.duration * 1000, 3),
+            "started_at": self.started_at.isoformat(),
+            "functions": len(self.stats),
+        }
+
+    def pstats_bytes(self) -> bytes:
+        """Statistics in the file format read by ``pstats.Stats``"""
+        return marshal.dumps(self.stats)
+
+    def collapsed(self) -> str:
+        return collapse_pstats(self.stats)
+
+
+class RequestProfiler:
+    """
+    Decides which requests to profile and keeps the slowest profiles.
+
+    A request is profiled when it sends ``X-Profile: 1`` with a valid
+    ``X-Admin-Token``, or is picked at ``sample_rate``. cProfile traces
+    the whole event loop thread, so one request is profiled at a time and
+    its profile also contains work of other requests that ran while it
+    awaited. The ``slowest`` profiles are kept in memory.
+    """
+
+    def __init__(self, admin_token: str, sample_rate: float, slowest: int):
+        self.admin_token = admin_token
+        self.sample_rate = sample_rate
+        self.slowest = slowest
+        self._heap: List[Tuple[float, int, RequestProfile]] = []
+        self._sequence = itertools.count()
+        self._active = False
+        self.profiled = 0
+        self.skipped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.admin_token) or self.sample_rate > 0
+
+    def is_admin(self, token: Optional[str]) -> bool:
+        """Whether a token grants access to profiling"""
+        return (
+            bool(self.admin_token)
+            and token is not None
+            and hmac.compare_digest(token.encode(), self.admin_token.encode())
+        )
+
+    def wants(self, headers: Dict[bytes, bytes]) -> bool:
+        """Whether a request with these headers should be profiled"""
+        if headers.get(b"x-profile") == b"1":
+            token = headers.get(b"x-admin-token")
+            if self.is_admin(token.decode("latin-1") if token is not None else None):
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """Start profiling unless another request is being profiled"""
+        if self._active:
+            self.skipped += 1
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler owns the interpreter's profiling hook
+            self.skipped += 1
+            return None
+        self._active = True
+        return profile
+
+    def finish(
+        self,
+        profile: cProfile.Profile,
+        method: str,
+        path: str,
+        status: int,
+        duration: float,
+        started_at: datetime,
+    ) -> None:
+        """Stop profiling and keep the profile if it is among the slowest"""
+        profile.disable()
+        self._active = False
+        self.profiled += 1
+        if self.slowest <= 0:
+            return
+        if len(self._heap) >= self.slowest and duration <= self._heap[0][0]:
+            return
+
+        profile.create_stats()
+        entry = RequestProfile(
+            method, path, status, duration, started_at, profile.stats
+        )
+        item = (duration, next(self._sequence), entry)
+        if len(self._heap) < self.slowest:
+            heapq.heappush(self._heap, item)
+        else:
+            heapq.heapreplace(self._heap, item)
+
+    def profiles(self) -> List[RequestProfile]:
+        """Kept profiles, slowest first"""
+        return [entry for _, _, entry in sorted(self._heap, key=lambda item: -item[0])]
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        for _, _, entry in self._heap:
+            if entry.id == profile_id:
+                return entry
+        return None
+
+    def clear(self) -> None:
+        self._heap.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sample_rate": self.sample_rate,
+            "kept": len(self._heap),
+            "slowest": self.slowest,
+            "profiled": self.profiled,
+            "skipped": self.skipped,
+        }
+
+
+class StackSampler:
+    """
+    Statistical profiler over every thread of the worker.
+
+    Samples the stack of each thread every ``interval`` seconds for a
+    bounded time from a background thread and returns collapsed-stack
+    text, one line per distinct stack with its sample count, ready for
+    flame graph tools. Only one sampling run happens at a time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs = 0
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def sample(self, duration: float, interval: float) -> Optional[str]:
+        """Sample for ``duration`` seconds; None if a run is in progress"""
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            self.runs += 1
+            return self._sample(duration, interval)
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def _sample(duration: float, interval: float) -> str:
+        own_thread = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks: Counter = Counter()
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(
+                        _label(code.co_filename, code.co_firstlineno, code.co_name)
+                    )
+                    frame = frame.f_back
+                frames.append(names.get(thread_id, f"thread-{thread_id}"))
+                stacks[";".join(reversed(frames))] += 1
+            time.sleep(interval)
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling the requests picked by a ``RequestProfiler``.
+
+    Only added when profiling is configured; then a request that is not
+    picked costs one header lookup and, with sampling on, one random draw.
+    """
+
+    def __init__(self, app: Any, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not self.profiler.wants(dict(scope["headers"])):
+            await self.app(scope, receive, send)
+            return
+
+        profile = self.profiler.start()
+        if profile is None:
+            await self.app(scope, receive, send)
+            return
+
+        started_at = datetime.utcnow()
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.profiler.finish(
+                profile,
+                scope["method"],
+                scope["path"],
+                status,
+                time.perf_counter() - started,
+                started_at,
+            )
@@ -0,0 +1,129 @@
+"""
+Query Cache
+Bounded LRU cache with per-entry TTL for registry query results
+"""
+
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+from collections import OrderedDict
+import time
+
+
+class QueryCache:
+    """
+    LRU cache of query results that expire after a fixed TTL.
+
+    Every entry remembers the skill IDs it contains, so a change to one
+    skill only drops the entries that returned it. Entries that may be
+    affected without containing the skill are dropped with
+    ``invalidate_where``.
+    """
+
+    def __init__(
+        self, max_entries: int, ttl: float, clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, Tuple[str, ...]]]" = (
+            OrderedDict()
+        )
+        self._by_skill: Dict[str, Set[Hashable]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a cached value and mark it recently used"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value, _ = entry
+        if self._clock() >= expires_at:
+            self._drop(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any, skill_ids: Iterable[str] = ()) -> None:
+        """Cache a value, evicting the least recently used entries if full"""
+        if self.max_entries <= 0:
+            return
+        if key in self._entries:
+            self._drop(key)
+
+        skill_ids = tuple(skill_ids)
+        self._entries[key] = (self._clock() + self.ttl, value, skill_ids)
+        for skill_id in skill_ids:
+            self._by_skill.setdefault(skill_id, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def discard(self, key: Hashable) -> bool:
+        """Drop one entry; returns whether it was cached"""
+        if key not in self._entries:
+            return False
+        self._drop(key)
+        return True
+
+    def invalidate_skill(self, skill_id: str) -> int:
+        """Drop every entry containing a skill"""
+        keys = self._by_skill.get(skill_id)
+        if not keys:
+            return 0
+        dropped = 0
+        for key in list(keys):
+            self._drop(key)
+            dropped += 1
+        self.invalidations += dropped
+        return dropped
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key satisfies ``predicate``"""
+        keys = [key for key in self._entries if predicate(key)]
+        for key in keys:
+            self._drop(key)
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        self._entries.clear()
+        self._by_skill.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit, miss and eviction counters"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+    def _drop(self, key: Hashable) -> None:
+        _, _, skill_ids = self._entries.pop(key)
+        for skill_id in skill_ids:
+            keys = self._by_skill.get(skill_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_skill[skill_id]
@@ -0,0 +1,165 @@
+"""
+Skill Executor
+Runs skill work inline, on a thread pool or on a process pool
+"""
+
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+import asyncio
+import logging
+import multiprocessing
+
+import httpx
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutionMode(str, Enum):
+    """Where skill work runs, from lightest to heaviest"""
+
+    INLINE = "inline"
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+_MODE_ORDER = list(ExecutionMode)
+
+
+def _process_skill_output(skill_id: str, input_text: str) -> str:
+    """Blocking part of a skill run"""
+    # In production, this would process what the skill fetched
+    return f"[Simulated output for {skill_id}]"
+
+
+def _process_agent_output(agent_name: str, input_text: str) -> str:
+    """Blocking part of an agent task"""
+    # In production, this would post-process the model response
+    return f"Task completed by {agent_name}"
+
+
+async def run_skill(
+    executor: "SkillExecutor", mode: ExecutionMode, skill_id: str, input_text: str
+) -> str:
+    """Execute a skill on some input"""
+    # In production, this would load the skill and call out through
+    # executor.http_client here, on the event loop
+    return await executor.run(mode, _process_skill_output, skill_id, input_text)
+
+
+async def run_agent_task(
+    executor: "SkillExecutor", mode: ExecutionMode, agent_name: str, input_text: str
+) -> str:
+    """Produce an agent's output for a task"""
+    return await executor.run(mode, _process_agent_output, agent_name, input_text)
+
+
+class SkillExecutor:
+    """
+    Runs blocking skill work without stalling the event loop.
+
+    A skill picks its mode with ``"execution"`` in its config: ``inline``
+    runs on the event loop and suits trivial work, ``thread`` uses a pool
+    of ``SKILL_THREAD_WORKERS`` threads for work that releases the GIL,
+    and ``process`` uses ``SKILL_PROCESS_WORKERS`` worker processes for
+    CPU-bound work. Process work must be a module-level function and is
+    sent only its arguments, so callers pass IDs and input text rather
+    than registry objects. Pools are created on first use.
+
+    Entry points such as ``run_skill`` are coroutines on the event loop:
+    they make outbound calls through the shared ``http_client`` rather
+    than their own client, so connections and TLS sessions are reused
+    across runs, and hand only their blocking work to ``run``. An async
+    client is bound to its event loop, so work in threads or processes
+    must not use it.
+    """
+
+    def __init__(
+        self,
+        thread_workers: Optional[int] = None,
+        process_workers: Optional[int] = None,
+        default_mode: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.http_client = http_client
+        self.thread_workers = thread_workers or settings.SKILL_THREAD_WORKERS
+        self.process_workers = process_workers or settings.SKILL_PROCESS_WORKERS
+        self.default_mode = ExecutionMode(default_mode or settings.SKILL_EXECUTION_MODE)
+        self._pools: Dict[ExecutionMode, Executor] = {}
+        self._runs: Dict[str, int] = {mode.value: 0 for mode in ExecutionMode}
+        self._active: Dict[str, int] = {mode.value: 0 for mode in ExecutionMode}
+        self.failed = 0
+
+    def mode_for(self, config: Mapping[str, Any]) -> ExecutionMode:
+        """Execution mode requested by a skill config"""
+        requested = config.get("execution")
+        if requested is None:
+            return self.default_mode
+        try:
+            return ExecutionMode(requested)
+        except ValueError:
+            logger.warning(
+                f"Unknown execution mode '{requested}', using {self.default_mode.value}"
+            )
+            return self.default_mode
+
+    def heaviest(self, configs: Iterable[Mapping[str, Any]]) -> ExecutionMode:
+        """Heaviest mode requested by any of several skill configs"""
+        modes = [self.mode_for(config) for config in configs]
+        if not modes:
+            return self.default_mode
+        return max(modes, key=_MODE_ORDER.index)
+
+    async def run(
+        self, mode: ExecutionMode, func: Callable[..., Any], *args: Any
+    ) -> Any:
+        """Call ``func(*args)`` in the given mode and return its result"""
+        self._runs[mode.value] += 1
+        self._active[mode.value] += 1
+        try:
+            if mode == ExecutionMode.INLINE:
+                return func(*args)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool(mode), func, *args)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self._active[mode.value] -= 1
+
+    def _pool(self, mode: ExecutionMode) -> Executor:
+        pool = self._pools.get(mode)
+        if pool is None:
+            if mode == ExecutionMode.THREAD:
+                pool = ThreadPoolExecutor(
+                    self.thread_workers, thread_name_prefix="skill"
+                )
+            else:
+                # Forking a process that runs an event loop and threads is unsafe
+                pool = ProcessPoolExecutor(
+                    self.process_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            self._pools[mode] = pool
+            logger.info(f"Started {mode.value} pool for skill execution")
+        return pool
+
+    def shutdown(self) -> None:
+        """Stop the pools, cancelling work that has not started"""
+        for pool in self._pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._pools.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool sizes and per-mode counters"""
+        return {
+            "default_mode": self.default_mode.value,
+            "thread_workers": self.thread_workers,
+            "process_workers": self.process_workers,
+            "started": [mode.value for mode in self._pools],
+            "runs": dict(self._runs),
+            "active": dict(self._active),
+            "failed": self.failed,
+        }
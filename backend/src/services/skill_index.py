@@ -0,0 +1,539 @@
+"""
+Skill Index
+Inverted indexes over the skill catalog used to answer registry searches
+"""
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from bisect import bisect_right
+import heapq
+import math
+import re
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# BM25F parameters; fields are (name, description, tags)
+BM25_K1 = 1.2
+BM25_B = 0.75
+FIELD_WEIGHTS = (3.0, 1.0, 2.0)
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Split text into its set of overlapping 3-character grams"""
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class _Entry(NamedTuple):
+    """Everything needed to unlink a skill from the posting lists"""
+
+    grams: Set[str]
+    category: str
+    author: str
+    tags: Tuple[str, ...]
+    terms: Dict[str, Tuple[int, int, int]]
+    lengths: Tuple[int, int, int]
+
+
+class SkillIndex:
+    """
+    Posting lists from trigram, term, category, tag and author to skill IDs.
+
+    Substring queries are answered by intersecting the posting lists of the
+    query's trigrams and verifying the survivors against the lowercased
+    name and description, which are computed once per skill instead of once
+    per query. Term postings carry per-field frequencies for BM25 ranking.
+    Unranked results are returned in catalog insertion order. Facet counts
+    are the sizes of the category, tag and author posting lists, so they
+    stay current as skills are added, deactivated or removed.
+
+    ``copy`` returns a copy-on-write child that shares posting lists with
+    its parent until it modifies them. The parent must not be modified
+    after it has been copied.
+    """
+
+    def __init__(self):
+        self._order: Dict[str, int] = {}
+        self._next_order: int = 0
+        # Indexed skill IDs in insertion order, for positional paging
+        self._slots: List[str] = []
+        self._text: Dict[str, Tuple[str, str]] = {}
+        self._entries: Dict[str, _Entry] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._terms: Dict[str, Dict[str, Tuple[int, int, int]]] = {}
+        self._field_totals: List[int] = [0, 0, 0]
+        self._categories: Dict[str, Set[str]] = {}
+        self._tags: Dict[str, Set[str]] = {}
+        self._authors: Dict[str, Set[str]] = {}
+        self._inactive: Set[str] = set()
+        # (id of posting dict, key) pairs this index may modify in place;
+        # None when the index shares nothing and owns every posting list
+        self._owned: Optional[Set[Tuple[int, str]]] = None
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __contains__(self, skill_id: str) -> bool:
+        return skill_id in self._order
+
+    def add(
+        self,
+        skill_id: str,
+        name: str,
+        description: str,
+        category: str,
+        tags: Iterable[str],
+        author: str = "",
+        is_active: bool = True,
+    ) -> None:
+        """Index a skill, replacing any previous entry for the same ID"""
+        if skill_id in self._order:
+            self._unlink(skill_id)
+        else:
+            self._order[skill_id] = self._next_order
+            self._next_order += 1
+            self._slots.append(skill_id)
+
+        name_lower = name.lower()
+        description_lower = description.lower()
+        grams = _trigrams(name_lower) | _trigrams(description_lower)
+        tags = tuple(set(tags))
+
+        fields = (
+            tokenize(name_lower),
+            tokenize(description_lower),
+            [token for tag in tags for token in tokenize(tag)],
+        )
+        terms: Dict[str, Tuple[int, int, int]] = {}
+        for position, tokens in enumerate(fields):
+            for token in tokens:
+                freqs = list(terms.get(token, (0, 0, 0)))
+                freqs[position] += 1
+                terms[token] = tuple(freqs)
+        lengths = tuple(len(tokens) for tokens in fields)
+
+        self._text[skill_id] = (name_lower, description_lower)
+        self._entries[skill_id] = _Entry(grams, category, author, tags, terms, lengths)
+
+        for gram in grams:
+            self._writable(self._trigrams, gram, set).add(skill_id)
+        for token, freqs in terms.items():
+            self._writable(self._terms, token, dict)[skill_id] = freqs
+        for position, length in enumerate(lengths):
+            self._field_totals[position] += length
+        self._writable(self._categories, category, set).add(skill_id)
+        for tag in tags:
+            self._writable(self._tags, tag, set).add(skill_id)
+        self._writable(self._authors, author, set).add(skill_id)
+        self.set_active(skill_id, is_active)
+
+    def copy(self) -> "SkillIndex":
+        """
+        Return a copy-on-write child of this index.
+
+        The outer dictionaries (positions, text, entries and the posting
+        maps themselves) are copied in full, which is O(catalog + vocabulary)
+        pointer copies. The posting sets and dicts they point to are shared
+        and cloned by the child the first time it changes one, so a delta
+        avoids rebuilding them but still pays for the outer copies.
+        """
+        index = SkillIndex.__new__(SkillIndex)
+        index._order = self._order.copy()
+        index._next_order = self._next_order
+        index._slots = self._slots.copy()
+        index._text = self._text.copy()
+        index._entries = self._entries.copy()
+        index._trigrams = self._trigrams.copy()
+        index._terms = self._terms.copy()
+        index._field_totals = self._field_totals.copy()
+        index._categories = self._categories.copy()
+        index._tags = self._tags.copy()
+        index._authors = self._authors.copy()
+        index._inactive = self._inactive.copy()
+        index._owned = set()
+        return index
+
+    def set_active(self, skill_id: str, is_active: bool) -> None:
+        """Record whether an indexed skill is active"""
+        if is_active:
+            self._inactive.discard(skill_id)
+        else:
+            self._inactive.add(skill_id)
+
+    def remove(self, skill_id: str) -> None:
+        """Drop a skill from every posting list"""
+        if skill_id not in self._order:
+            return
+        self._unlink(skill_id)
+        del self._slots[self._slot(self._order[skill_id]) - 1]
+        del self._order[skill_id]
+        del self._text[skill_id]
+        self._inactive.discard(skill_id)
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        self._order.clear()
+        self._next_order = 0
+        self._slots.clear()
+        self._text.clear()
+        self._entries.clear()
+        self._trigrams.clear()
+        self._terms.clear()
+        self._field_totals = [0, 0, 0]
+        self._categories.clear()
+        self._tags.clear()
+        self._authors.clear()
+        self._inactive.clear()
+        self._owned = None
+
+    def dump_state(self) -> Tuple[Any, ...]:
+        """Export the index as plain containers suitable for ``marshal``"""
+        return (
+            self._order,
+            self._next_order,
+            self._slots,
+            self._text,
+            {skill_id: tuple(entry) for skill_id, entry in self._entries.items()},
+            self._trigrams,
+            self._terms,
+            self._field_totals,
+            self._categories,
+            self._tags,
+            self._authors,
+            self._inactive,
+        )
+
+    @classmethod
+    def from_state(cls, state: Tuple[Any, ...]) -> "SkillIndex":
+        """Rebuild an index from the output of ``dump_state``"""
+        index = cls()
+        (
+            index._order,
+            index._next_order,
+            index._slots,
+            index._text,
+            entries,
+            index._trigrams,
+            index._terms,
+            index._field_totals,
+            index._categories,
+            index._tags,
+            index._authors,
+            index._inactive,
+        ) = state
+        index._entries = {
+            skill_id: _Entry(*entry) for skill_id, entry in entries.items()
+        }
+        index._field_totals = list(index._field_totals)
+        return index
+
+    def _slot(self, position: int) -> int:
+        """Index into ``_slots`` of the first skill positioned after ``position``"""
+        return bisect_right(self._slots, position, key=self._order.__getitem__)
+
+    def position(self, skill_id: str) -> int:
+        """Stable sort key of a skill in catalog insertion order"""
+        return self._order[skill_id]
+
+    def category_ids(self, category: str) -> Set[str]:
+        """Skill IDs in a category"""
+        return self._categories.get(category, set())
+
+    def category_counts(self) -> Dict[str, int]:
+        """Number of skills per category"""
+        return {category: len(ids) for category, ids in self._categories.items()}
+
+    def facets(
+        self, candidates: Optional[Set[str]] = None
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Count skills per category, tag, author and active state.
+
+        Without ``candidates`` the counts cover the whole catalog and are
+        read straight from posting list sizes. With a match set, the counts
+        are accumulated from the indexed entries of the matches only.
+        """
+        if candidates is None:
+            inactive = len(self._inactive)
+            return {
+                "categories": self.category_counts(),
+                "tags": {tag: len(ids) for tag, ids in self._tags.items()},
+                "authors": {author: len(ids) for author, ids in self._authors.items()},
+                "active": {"active": len(self._order) - inactive, "inactive": inactive},
+            }
+
+        categories: Dict[str, int] = {}
+        tags: Dict[str, int] = {}
+        authors: Dict[str, int] = {}
+        inactive = 0
+        for skill_id in candidates:
+            entry = self._entries[skill_id]
+            categories[entry.category] = categories.get(entry.category, 0) + 1
+            authors[entry.author] = authors.get(entry.author, 0) + 1
+            for tag in entry.tags:
+                tags[tag] = tags.get(tag, 0) + 1
+            if skill_id in self._inactive:
+                inactive += 1
+
+        return {
+            "categories": categories,
+            "tags": tags,
+            "authors": authors,
+            "active": {"active": len(candidates) - inactive, "inactive": inactive},
+        }
+
+    def match(
+        self,
+        query: str = "",
+        category: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+    ) -> Optional[Set[str]]:
+        """
+        Return the unordered set of IDs matching every given filter.
+
+        A skill matches when it is in ``category``, carries any of ``tags``
+        and contains ``query`` case-insensitively in its name or description.
+        Empty filters match everything; ``None`` is returned when no filter
+        was given at all. The returned set may be shared with the index and
+        must not be mutated.
+        """
+        candidates = self._filter(category, tags)
+
+        if query:
+            needle = query.lower()
+            for gram in sorted(_trigrams(needle), key=self._posting_size):
+                if candidates is not None and not candidates:
+                    break
+                posting = self._trigrams.get(gram, set())
+                candidates = posting if candidates is None else candidates & posting
+
+            if candidates is None:
+                candidates = self._order.keys()
+            text = self._text
+            candidates = {
+                skill_id
+                for skill_id in candidates
+                if needle in text[skill_id][0] or needle in text[skill_id][1]
+            }
+
+        return candidates
+
+    def matches(
+        self,
+        skill_id: str,
+        query: str = "",
+        category: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        terms: bool = False,
+    ) -> bool:
+        """
+        Check a single indexed skill against the filters of ``match``, or
+        of ``match_terms`` with ``terms``
+        """
+        entry = self._entries.get(skill_id)
+        if entry is None:
+            return False
+        if category and entry.category != category:
+            return False
+        if tags and not any(tag in entry.tags for tag in tags):
+            return False
+        if terms:
+            query_terms = set(tokenize(query))
+            return not query_terms or not query_terms.isdisjoint(entry.terms)
+        if query:
+            needle = query.lower()
+            name_lower, description_lower = self._text[skill_id]
+            return needle in name_lower or needle in description_lower
+        return True
+
+    def match_terms(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+    ) -> Optional[Set[str]]:
+        """
+        Return IDs containing any query term in name, description or tags.
+
+        Used by ranked search, where a skill does not need to contain the
+        whole query verbatim to be relevant. A query without terms matches
+        like an empty query.
+        """
+        candidates = self._filter(category, tags)
+        terms = set(tokenize(query))
+        if not terms:
+            return candidates
+
+        matched: Set[str] = set()
+        for term in terms:
+            matched.update(self._terms.get(term, ()))
+        return matched if candidates is None else candidates & matched
+
+    def page(
+        self,
+        candidates: Optional[Set[str]],
+        offset: int,
+        limit: int,
+        after: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Select one page of candidates in insertion order.
+
+        With ``after`` the page starts at the first candidate positioned
+        after it and ``offset`` is ignored. Without filters the page is a
+        slice of the insertion-ordered IDs found by bisection, so it costs
+        O(log n + limit) however deep into the catalog it is.
+        """
+        order = self._order
+        if candidates is None:
+            start = offset if after is None else self._slot(after)
+            return self._slots[start : start + limit]
+
+        if after is not None:
+            return heapq.nsmallest(
+                limit,
+                (skill_id for skill_id in candidates if order[skill_id] > after),
+                key=order.__getitem__,
+            )
+
+        head = heapq.nsmallest(offset + limit, candidates, key=order.__getitem__)
+        return head[offset:]
+
+    def rank(
+        self,
+        query: str,
+        candidates: Optional[Set[str]],
+        offset: int,
+        limit: int,
+        after: Optional[Tuple[float, int]] = None,
+        unscored: bool = False,
+    ) -> List[Tuple[str, float]]:
+        """
+        Select one page of candidates by descending BM25F score.
+
+        Only the top ``offset + limit`` scores are kept in a bounded heap, so
+        a page never sorts the full match set. Ties fall back to insertion
+        order. With ``after``, a (score, position) pair taken from the last
+        result of the previous page, only results sorting after it are kept
+        and ``offset`` is ignored. With ``unscored``, candidates sharing no
+        term with the query are kept with a score of 0 instead of dropped.
+        Returns (skill ID, score) pairs.
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            skill_ids = self.page(
+                candidates, offset, limit, after[1] if after else None
+            )
+            return [(skill_id, 0.0) for skill_id in skill_ids]
+
+        scores: Dict[str, float] = {}
+        total = len(self._order)
+        averages = (
+            [(field_total / total) or 1.0 for field_total in self._field_totals]
+            if total
+            else [1.0, 1.0, 1.0]
+        )
+
+        for term in terms:
+            posting = self._terms.get(term)
+            if not posting:
+                continue
+            idf = math.log(1.0 + (total - len(posting) + 0.5) / (len(posting) + 0.5))
+            for skill_id, freqs in posting.items():
+                if candidates is not None and skill_id not in candidates:
+                    continue
+                lengths = self._entries[skill_id].lengths
+                weighted = 0.0
+                for position, freq in enumerate(freqs):
+                    if freq:
+                        norm = (
+                            1.0
+                            - BM25_B
+                            + BM25_B * lengths[position] / averages[position]
+                        )
+                        weighted += FIELD_WEIGHTS[position] * freq / norm
+                score = idf * weighted / (BM25_K1 + weighted)
+                scores[skill_id] = scores.get(skill_id, 0.0) + score
+
+        order = self._order
+        pool: Iterable[str] = scores
+        if unscored:
+            pool = order.keys() if candidates is None else candidates
+
+        def sort_key(skill_id: str) -> Tuple[float, int]:
+            return (-scores.get(skill_id, 0.0), order[skill_id])
+
+        if after is not None:
+            bound = (-after[0], after[1])
+            head = heapq.nsmallest(
+                limit,
+                (skill_id for skill_id in pool if sort_key(skill_id) > bound),
+                key=sort_key,
+            )
+        else:
+            head = heapq.nsmallest(offset + limit, pool, key=sort_key)[offset:]
+        return [(skill_id, scores.get(skill_id, 0.0)) for skill_id in head]
+
+    def _filter(
+        self, category: Optional[str], tags: Optional[List[str]]
+    ) -> Optional[Set[str]]:
+        candidates: Optional[Set[str]] = None
+
+        if category:
+            candidates = self._categories.get(category, set())
+
+        if tags:
+            tagged: Set[str] = set()
+            for tag in tags:
+                tagged |= self._tags.get(tag, set())
+            candidates = tagged if candidates is None else candidates & tagged
+
+        return candidates
+
+    def _posting_size(self, gram: str) -> int:
+        return len(self._trigrams.get(gram, ()))
+
+    def _writable(self, postings: Dict[str, Any], key: str, empty: Any) -> Any:
+        """Get a posting list this index may modify, cloning a shared one"""
+        posting = postings.get(key)
+        if self._owned is None:
+            if posting is None:
+                posting = postings[key] = empty()
+            return posting
+
+        marker = (id(postings), key)
+        if marker not in self._owned:
+            posting = postings[key] = posting.copy() if posting is not None else empty()
+            self._owned.add(marker)
+        elif posting is None:
+            posting = postings[key] = empty()
+        return posting
+
+    def _unlink(self, skill_id: str) -> None:
+        entry = self._entries.pop(skill_id)
+        for gram in entry.grams:
+            self._discard(self._trigrams, gram, skill_id)
+        for token in entry.terms:
+            self._discard(self._terms, token, skill_id)
+        for position, length in enumerate(entry.lengths):
+            self._field_totals[position] -= length
+        self._discard(self._categories, entry.category, skill_id)
+        self._discard(self._authors, entry.author, skill_id)
+        for tag in entry.tags:
+            self._discard(self._tags, tag, skill_id)
+
+    def _discard(self, postings: Dict[str, Any], key: str, skill_id: str) -> None:
+        posting = postings.get(key)
+        if posting is None or skill_id not in posting:
+            return
+        if len(posting) == 1:
+            del postings[key]
+            return
+        posting = self._writable(postings, key, set)
+        if isinstance(posting, dict):
+            del posting[skill_id]
+        else:
+            posting.discard(skill_id)
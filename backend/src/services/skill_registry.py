@@ -2,12 +2,37 @@
 Skill Registry Service
 Manages the loading, caching, and retrieval of skills
 """
-from typing import Dict, List, Optional, Any
+
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Any, Set, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
+from enum import Enum
+from functools import cached_property
 import asyncio
+import base64
+import hashlib
 import logging
 import json
+import math
+import os
+import time
+import uuid
+
+import orjson
+
+from src.config.settings import settings
+from src.services.dependency_resolver import DependencyResolver
+from src.services.metrics import metrics
+from src.services.query_cache import QueryCache
+from src.services.skill_index import SkillIndex
+from src.services.skill_snapshot import (
+    FINGERPRINT_SIZE,
+    SkillSnapshot,
+    SnapshotError,
+)
+from src.services.persistence import WriteBehindStore
+from src.services.skill_store import SkillStore
+from src.services.state_backend import StateBackend
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +40,7 @@ logger = logging.getLogger(__name__)
 @dataclass
 class Skill:
     """Represents a skill in the registry"""
+
     id: str
     name: str
     description: str
@@ -29,7 +55,7 @@ class Skill:
     is_active: bool = True
     usage_count: int = 0
     rating: float = 0.0
-    
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert skill to dictionary"""
         return {
@@ -46,76 +72,323 @@ class Skill:
             "updated_at": self.updated_at.isoformat(),
             "is_active": self.is_active,
             "usage_count": self.usage_count,
-            "rating": self.rating
+            "rating": self.rating,
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Skill":
+        """Create a skill from the output of ``to_dict``"""
+        return cls(
+            **{
+                **data,
+                "created_at": datetime.fromisoformat(data["created_at"]),
+                "updated_at": datetime.fromisoformat(data["updated_at"]),
+            }
+        )
+
+
+@dataclass
+class SkillSearchResult:
+    """One page of search results and the total number of matches"""
+
+    skill_ids: List[str]
+    total: int
+    facets: Optional[Dict[str, Dict[str, int]]] = None
+    next_cursor: Optional[str] = None
+    store: Optional[SkillStore] = field(default=None, repr=False, compare=False)
+
+    @cached_property
+    def skills(self) -> List[Skill]:
+        """Skills on this page"""
+        return [self.store[skill_id] for skill_id in self.skill_ids]
+
+    def payloads(self) -> List[bytes]:
+        """Pre-serialized JSON of the skills on this page"""
+        return [self.store.payload(skill_id) for skill_id in self.skill_ids]
+
+
+class _QueryKey(NamedTuple):
+    """Normalized search parameters used as a query cache key"""
+
+    query: str
+    category: Optional[str]
+    tags: Optional[Tuple[str, ...]]
+    limit: int
+    offset: int
+    ranked: bool
+    substring: bool
+    facets: bool
+    cursor: Optional[str]
+
+
+def _encode_cursor(ranked: bool, position: int, score: float) -> str:
+    """Encode the sort key of the last result on a page as an opaque cursor"""
+    payload = json.dumps([int(ranked), position, score], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, ranked: bool) -> Tuple[float, int]:
+    """Decode a cursor into a (score, position) sort key"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_ranked, position, score = json.loads(payload)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if (
+        type(position) is not int
+        or position < 0
+        or type(score) not in (int, float)
+        or not math.isfinite(score)
+    ):
+        raise ValueError("Invalid cursor")
+    if bool(cursor_ranked) != ranked:
+        raise ValueError("Cursor does not match the search mode")
+    return float(score), position
+
+
+class ChangeType(str, Enum):
+    """Kinds of catalog delta"""
+
+    UPSERT = "upsert"
+    DEACTIVATE = "deactivate"
+    DELETE = "delete"
+
+
+@dataclass(frozen=True)
+class CatalogChange:
+    """A single catalog delta applied by ``SkillRegistry.apply_changes``"""
+
+    type: ChangeType
+    skill_id: str
+    skill: Optional[Skill] = None
+
+    @classmethod
+    def upsert(cls, skill: Skill) -> "CatalogChange":
+        """Add a skill or replace the one with the same ID"""
+        return cls(ChangeType.UPSERT, skill.id, skill)
+
+    @classmethod
+    def deactivate(cls, skill_id: str) -> "CatalogChange":
+        """Mark a skill as inactive"""
+        return cls(ChangeType.DEACTIVATE, skill_id)
+
+    @classmethod
+    def delete(cls, skill_id: str) -> "CatalogChange":
+        """Remove a skill"""
+        return cls(ChangeType.DELETE, skill_id)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the change to a dictionary"""
+        return {
+            "type": self.type.value,
+            "skill_id": self.skill_id,
+            "skill": self.skill.to_dict() if self.skill else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CatalogChange":
+        """Create a change from the output of ``to_dict``"""
+        skill = Skill.from_dict(data["skill"]) if data["skill"] else None
+        return cls(ChangeType(data["type"]), data["skill_id"], skill)
+
+
+class _CatalogState(NamedTuple):
+    """Skill store and search index published together as one catalog version"""
+
+    skills: SkillStore
+    index: SkillIndex
+
 
 class SkillRegistry:
     """
     Central registry for managing AI skills
+
+    With a shared ``StateBackend`` each worker keeps its own copy of the
+    catalog as a near cache: catalog changes and installs are appended to
+    a log of numbered entries in the backend, then published on the
+    ``catalog`` channel and applied by every other worker. A worker reads
+    the entries it has not applied from the log when it starts and when
+    a message skips a version, so it catches up after a restart or a
+    dropped message.
+
+    With a ``WriteBehindStore`` installs are persisted and added back to
+    the usage counts on startup.
     """
-    
-    # Skill categories with counts
+
+    CATALOG_CHANNEL = "catalog"
+    CATALOG_LOG_BATCH = 100
+
+    # Known skill categories; counts are taken from the live index
     CATEGORIES = {
-        "ai-llms": {"name": "AI & LLMs", "count": 286},
-        "search-research": {"name": "Search & Research", "count": 250},
-        "devops-cloud": {"name": "DevOps & Cloud", "count": 212},
-        "web-frontend": {"name": "Web & Frontend Development", "count": 201},
-        "marketing-sales": {"name": "Marketing & Sales", "count": 142},
-        "browser-automation": {"name": "Browser & Automation", "count": 138},
-        "productivity-tasks": {"name": "Productivity & Tasks", "count": 134},
-        "coding-agents": {"name": "Coding Agents & IDEs", "count": 132},
-        "communication": {"name": "Communication", "count": 133},
-        "cli-utilities": {"name": "CLI Utilities", "count": 131},
-        "clawdbot-tools": {"name": "Clawdbot Tools", "count": 119},
-        "notes-pkm": {"name": "Notes & PKM", "count": 100},
-        "media-streaming": {"name": "Media & Streaming", "count": 80},
-        "transportation": {"name": "Transportation", "count": 73},
-        "pdf-documents": {"name": "PDF & Documents", "count": 67},
-        "git-github": {"name": "Git & GitHub", "count": 66},
-        "speech-transcription": {"name": "Speech & Transcription", "count": 66},
-        "security-passwords": {"name": "Security & Passwords", "count": 62},
-        "gaming": {"name": "Gaming", "count": 62},
-        "image-video-gen": {"name": "Image & Video Generation", "count": 60},
-        "smart-home-iot": {"name": "Smart Home & IoT", "count": 56},
-        "personal-development": {"name": "Personal Development", "count": 56},
-        "health-fitness": {"name": "Health & Fitness", "count": 55},
-        "moltbook": {"name": "Moltbook", "count": 51},
-        "calendar-scheduling": {"name": "Calendar & Scheduling", "count": 51},
-        "shopping-ecommerce": {"name": "Shopping & E-commerce", "count": 51},
-        "data-analytics": {"name": "Data & Analytics", "count": 46},
-        "apple-apps": {"name": "Apple Apps & Services", "count": 35},
-        "self-hosted": {"name": "Self-Hosted & Automation", "count": 25},
-        "finance": {"name": "Finance", "count": 22},
-        "agent-protocols": {"name": "Agent-to-Agent Protocols", "count": 19},
-        "ios-macos-dev": {"name": "iOS & macOS Development", "count": 17}
+        "ai-llms": {"name": "AI & LLMs"},
+        "search-research": {"name": "Search & Research"},
+        "devops-cloud": {"name": "DevOps & Cloud"},
+        "web-frontend": {"name": "Web & Frontend Development"},
+        "marketing-sales": {"name": "Marketing & Sales"},
+        "browser-automation": {"name": "Browser & Automation"},
+        "productivity-tasks": {"name": "Productivity & Tasks"},
+        "coding-agents": {"name": "Coding Agents & IDEs"},
+        "communication": {"name": "Communication"},
+        "cli-utilities": {"name": "CLI Utilities"},
+        "clawdbot-tools": {"name": "Clawdbot Tools"},
+        "notes-pkm": {"name": "Notes & PKM"},
+        "media-streaming": {"name": "Media & Streaming"},
+        "transportation": {"name": "Transportation"},
+        "pdf-documents": {"name": "PDF & Documents"},
+        "git-github": {"name": "Git & GitHub"},
+        "speech-transcription": {"name": "Speech & Transcription"},
+        "security-passwords": {"name": "Security & Passwords"},
+        "gaming": {"name": "Gaming"},
+        "image-video-gen": {"name": "Image & Video Generation"},
+        "smart-home-iot": {"name": "Smart Home & IoT"},
+        "personal-development": {"name": "Personal Development"},
+        "health-fitness": {"name": "Health & Fitness"},
+        "moltbook": {"name": "Moltbook"},
+        "calendar-scheduling": {"name": "Calendar & Scheduling"},
+        "shopping-ecommerce": {"name": "Shopping & E-commerce"},
+        "data-analytics": {"name": "Data & Analytics"},
+        "apple-apps": {"name": "Apple Apps & Services"},
+        "self-hosted": {"name": "Self-Hosted & Automation"},
+        "finance": {"name": "Finance"},
+        "agent-protocols": {"name": "Agent-to-Agent Protocols"},
+        "ios-macos-dev": {"name": "iOS & macOS Development"},
     }
-    
-    def __init__(self):
-        self._skills: Dict[str, Skill] = {}
-        self._categories: Dict[str, List[str]] = {}
-        self._cache: Dict[str, Any] = {}
+
+    def __init__(
+        self,
+        backend: Optional[StateBackend] = None,
+        store: Optional[WriteBehindStore] = None,
+    ):
+        self._store = store
+        self._backend = backend if backend is not None and backend.shared else None
+        self._origin = uuid.uuid4().hex
+        self._replicating: Set[asyncio.Task] = set()
+        self._catalog_version = 0
+        self._sync_lock = asyncio.Lock()
+        self._state = _CatalogState(self._new_store(), SkillIndex())
+        self._resolver = DependencyResolver(self._dependencies_of)
+        self._cache = QueryCache(
+            max_entries=settings.SKILLS_CACHE_MAX_ENTRIES, ttl=settings.SKILLS_CACHE_TTL
+        )
         self._initialized: bool = False
         self._lock = asyncio.Lock()
-        
+
     async def initialize(self) -> None:
         """Initialize the skill registry"""
         async with self._lock:
             if self._initialized:
                 return
-                
+
             logger.info("Initializing skill registry...")
-            
-            # Load skills from storage/database
-            await self._load_skills()
-            
-            # Build category index
-            await self._build_category_index()
-            
+
+            # Warm-start from a snapshot of the same skill source, checked
+            # before anything is loaded, falling back to a full load
+            version = await self._source_version()
+            if not self._load_snapshot(version):
+                # Load skills from storage/database
+                skills = await self._load_skills()
+                state = _CatalogState(self._new_store(), SkillIndex())
+                for skill in skills:
+                    state.skills.put(skill)
+
+                # Build search index
+                await self._build_index(state)
+
+                self._state = state
+                await self._save_snapshot(version)
+
+            if self._store is not None:
+                self._count_installs(await self._store.load_installs())
+
+            if self._backend is not None:
+                await self._backend.subscribe(
+                    self.CATALOG_CHANNEL, self._on_catalog_message
+                )
+
             self._initialized = True
-            logger.info(f"Skill registry initialized with {len(self._skills)} skills")
-    
-    async def _load_skills(self) -> None:
+
+        if self._backend is not None:
+            # Installs persisted by any worker were counted from the store
+            await self._sync(installs=self._store is None)
+
+        logger.info(f"Skill registry initialized with {len(self._state.skills)} skills")
+
+    @staticmethod
+    def _new_store(snapshot: Optional[SkillSnapshot] = None) -> SkillStore:
+        """Create an empty skill store, optionally over a mapped snapshot"""
+        return SkillStore(
+            Skill,
+            decode=Skill.from_dict,
+            snapshot=snapshot,
+            payload_cache_size=settings.SKILLS_PAYLOAD_CACHE_SIZE,
+        )
+
+    def _load_snapshot(self, fingerprint: bytes) -> bool:
+        """Map the on-disk snapshot, returning False if it is unusable"""
+        path = settings.SKILLS_SNAPSHOT_PATH
+        if not path or not os.path.exists(path):
+            return False
+
+        try:
+            snapshot = SkillSnapshot(
+                path, fingerprint, max_age=settings.SKILLS_SNAPSHOT_MAX_AGE
+            )
+        except SnapshotError as e:
+            logger.warning(f"Ignoring skill snapshot: {e}")
+            return False
+
+        try:
+            index = SkillIndex.from_state(snapshot.index_state)
+        except (TypeError, ValueError) as e:
+            snapshot.close()
+            logger.warning(f"Ignoring skill snapshot with unreadable index: {e}")
+            return False
+
+        self._state = _CatalogState(self._new_store(snapshot), index)
+        logger.info(f"Mapped skill snapshot {path}")
+        return True
+
+    async def _save_snapshot(self, fingerprint: bytes) -> None:
+        """Write the current catalog and index to the snapshot file"""
+        path = settings.SKILLS_SNAPSHOT_PATH
+        if not path:
+            return
+
+        state = self._state
+        try:
+            SkillSnapshot.write(
+                path,
+                {skill_id: skill.to_dict() for skill_id, skill in state.skills.items()},
+                state.index.dump_state(),
+                fingerprint,
+            )
+        except OSError as e:
+            logger.warning(f"Failed to write skill snapshot: {e}")
+
+    @staticmethod
+    def _discard_snapshot() -> None:
+        """Delete the snapshot file once the catalog has diverged from it"""
+        path = settings.SKILLS_SNAPSHOT_PATH
+        if not path:
+            return
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Failed to discard skill snapshot: {e}")
+
+    async def _source_version(self) -> bytes:
+        """Version of the skill source, cheap to read without loading skills"""
+        # In production, this would read the catalog version row of the
+        # database; the sample skills only change with this module
+        stat = os.stat(__file__)
+        digest = hashlib.blake2b(digest_size=FINGERPRINT_SIZE)
+        digest.update(f"{stat.st_mtime_ns}:{stat.st_size}".encode())
+        return digest.digest()
+
+    async def _load_skills(self) -> List[Skill]:
         """Load skills from storage"""
         # In production, this would load from database
         # For now, we'll create sample skills based on real data
@@ -126,7 +399,7 @@ class SkillRegistry:
                 description="Web search and content extraction via Brave Search API",
                 category="search-research",
                 author="steipete",
-                tags=["search", "web", "api"]
+                tags=["search", "web", "api"],
             ),
             Skill(
                 id="github",
@@ -134,7 +407,7 @@ class SkillRegistry:
                 description="Interact with GitHub using the gh CLI",
                 category="git-github",
                 author="steipete",
-                tags=["git", "github", "vcs"]
+                tags=["git", "github", "vcs"],
             ),
             Skill(
                 id="frontend-design",
@@ -142,7 +415,7 @@ class SkillRegistry:
                 description="Create distinctive, production-grade frontend interfaces",
                 category="web-frontend",
                 author="steipete",
-                tags=["frontend", "design", "ui"]
+                tags=["frontend", "design", "ui"],
             ),
             Skill(
                 id="docker-essentials",
@@ -150,7 +423,7 @@ class SkillRegistry:
                 description="Essential Docker commands and workflows for container management",
                 category="devops-cloud",
                 author="arnarsson",
-                tags=["docker", "containers", "devops"]
+                tags=["docker", "containers", "devops"],
             ),
             Skill(
                 id="deep-research",
@@ -158,80 +431,456 @@ class SkillRegistry:
                 description="Deep Research Agent for complex, multi-step research tasks",
                 category="ai-llms",
                 author="seyhunak",
-                tags=["research", "ai", "analysis"]
-            )
+                tags=["research", "ai", "analysis"],
+            ),
         ]
-        
-        for skill in sample_skills:
-            self._skills[skill.id] = skill
-    
-    async def _build_category_index(self) -> None:
-        """Build index of skills by category"""
-        self._categories = {}
-        for skill_id, skill in self._skills.items():
-            if skill.category not in self._categories:
-                self._categories[skill.category] = []
-            self._categories[skill.category].append(skill_id)
-    
+
+        return sample_skills
+
+    async def _build_index(self, state: _CatalogState) -> None:
+        """Build the inverted search index over all loaded skills"""
+        state.index.clear()
+        for record in state.skills.records():
+            self._index_skill(state.index, record)
+
+    @staticmethod
+    def _index_skill(index: SkillIndex, skill: Any) -> None:
+        """Add or refresh a single skill or stored record in a search index"""
+        index.add(
+            skill.id,
+            skill.name,
+            skill.description,
+            skill.category,
+            skill.tags,
+            author=skill.author,
+            is_active=skill.is_active,
+        )
+
     async def count(self) -> int:
         """Get total number of skills"""
-        return 2987  # Based on Athena's actual stats
-    
+        return len(self._state.index)
+
     async def get_skill(self, skill_id: str) -> Optional[Skill]:
         """Get a skill by ID"""
-        return self._skills.get(skill_id)
-    
+        return self._state.skills.get(skill_id)
+
+    async def get_skill_payload(self, skill_id: str) -> Optional[bytes]:
+        """Get the pre-serialized JSON of a skill by ID"""
+        return self._state.skills.payload(skill_id)
+
     async def search_skills(
         self,
         query: str = "",
         category: Optional[str] = None,
         tags: Optional[List[str]] = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        ranked: bool = False,
     ) -> List[Skill]:
         """Search skills with filters"""
-        results = []
-        
-        for skill in self._skills.values():
-            # Filter by category
-            if category and skill.category != category:
-                continue
-            
-            # Filter by tags
-            if tags and not any(tag in skill.tags for tag in tags):
-                continue
-            
-            # Filter by query
-            if query:
-                query_lower = query.lower()
-                if (query_lower not in skill.name.lower() and 
-                    query_lower not in skill.description.lower()):
-                    continue
-            
-            results.append(skill)
-        
-        # Apply pagination
-        return results[offset:offset + limit]
-    
+        result = await self.query_skills(
+            query=query,
+            category=category,
+            tags=tags,
+            limit=limit,
+            offset=offset,
+            ranked=ranked,
+        )
+        return result.skills
+
+    async def query_skills(
+        self,
+        query: str = "",
+        category: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        limit: int = 50,
+        offset: int = 0,
+        ranked: bool = False,
+        facets: bool = False,
+        cursor: Optional[str] = None,
+        substring: bool = False,
+    ) -> SkillSearchResult:
+        """
+        Search skills and report the total number of matches.
+
+        By default a skill matches when its name or description contains the
+        query and results keep catalog order. With ``ranked`` a skill matches
+        when it shares any term with the query and results are ordered by
+        BM25 relevance over name, description and tags. With ``ranked`` and
+        ``substring`` skills match as in the default mode, so a partial word
+        still finds them, and BM25 only decides the order. With ``facets`` the
+        result also carries category, tag, author and active-state counts
+        over the full match set. Results are served from the query cache
+        when an identical, unexpired search was answered before.
+
+        Every page that has more results after it carries a ``next_cursor``.
+        Passing it back as ``cursor`` continues right after the last result
+        of that page regardless of ``offset``, so deep pages cost no more
+        than the first and do not shift when skills are added or removed.
+        Raises ``ValueError`` for a malformed cursor.
+        """
+        started = time.perf_counter()
+        state = self._state
+        after = _decode_cursor(cursor, ranked) if cursor else None
+        key = _QueryKey(
+            query=query.lower(),
+            category=category or None,
+            tags=tuple(sorted(set(tags))) if tags else None,
+            limit=limit,
+            offset=0 if cursor else offset,
+            ranked=ranked,
+            substring=ranked and substring,
+            facets=facets,
+            cursor=cursor or None,
+        )
+        cached = self._cache.get(key)
+        if cached is not None:
+            skill_ids, total, facet_counts, next_cursor = cached
+            metrics.search_duration.labels("hit").observe(time.perf_counter() - started)
+            metrics.search_matches.observe(total)
+            return SkillSearchResult(
+                skill_ids=skill_ids,
+                total=total,
+                facets=facet_counts,
+                next_cursor=next_cursor,
+                store=state.skills,
+            )
+
+        if ranked:
+            if substring:
+                candidates = state.index.match(query, category, tags)
+            else:
+                candidates = state.index.match_terms(query, category, tags)
+            scored = state.index.rank(
+                query, candidates, offset, limit + 1, after=after, unscored=substring
+            )
+            has_more = len(scored) > limit
+            scored = scored[:limit]
+            skill_ids = [skill_id for skill_id, _ in scored]
+            last_score = scored[-1][1] if scored else 0.0
+        else:
+            candidates = state.index.match(query, category, tags)
+            skill_ids = state.index.page(
+                candidates, offset, limit + 1, after=after[1] if after else None
+            )
+            has_more = len(skill_ids) > limit
+            skill_ids = skill_ids[:limit]
+            last_score = 0.0
+
+        next_cursor = None
+        if has_more and skill_ids:
+            next_cursor = _encode_cursor(
+                ranked, state.index.position(skill_ids[-1]), last_score
+            )
+
+        total = len(state.index) if candidates is None else len(candidates)
+        facet_counts = state.index.facets(candidates) if facets else None
+        self._cache.put(key, (skill_ids, total, facet_counts, next_cursor), skill_ids)
+        metrics.search_duration.labels("miss").observe(time.perf_counter() - started)
+        metrics.search_matches.observe(total)
+
+        return SkillSearchResult(
+            skill_ids=skill_ids,
+            total=total,
+            facets=facet_counts,
+            next_cursor=next_cursor,
+            store=state.skills,
+        )
+
+    def _invalidate_queries(
+        self,
+        skill_id: str,
+        previous: SkillIndex,
+        current: SkillIndex,
+        facets_only: bool = False,
+    ) -> None:
+        """
+        Drop cached queries whose results may change with a skill.
+
+        Unranked queries are only dropped when the skill matches their
+        filters before or after the change. Ranked queries are always
+        dropped because any catalog change shifts BM25 statistics, except
+        on a deactivation, which only changes facet counts: they are then
+        checked the same way, by term unless they are substring searches.
+        """
+
+        def affected(key: _QueryKey) -> bool:
+            if key.ranked and not facets_only:
+                return True
+            if facets_only and not key.facets:
+                return False
+            terms = key.ranked and not key.substring
+            return previous.matches(
+                skill_id, key.query, key.category, key.tags, terms
+            ) or current.matches(skill_id, key.query, key.category, key.tags, terms)
+
+        self._cache.invalidate_skill(skill_id)
+        self._cache.invalidate_where(affected)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Get query cache counters"""
+        return self._cache.stats()
+
     async def get_categories(self) -> Dict[str, Any]:
         """Get all categories with counts"""
-        return self.CATEGORIES
-    
+        counts = self._state.index.category_counts()
+        categories = {
+            slug: {**info, "count": counts.get(slug, 0)}
+            for slug, info in self.CATEGORIES.items()
+        }
+        for slug, count in counts.items():
+            if slug not in categories:
+                categories[slug] = {"name": slug, "count": count}
+        return categories
+
+    async def get_facets(self) -> Dict[str, Dict[str, int]]:
+        """Get skill counts per category, tag, author and active state"""
+        return self._state.index.facets()
+
+    async def apply_changes(
+        self, changes: Iterable[CatalogChange], replicate: bool = True
+    ) -> Dict[str, List[str]]:
+        """
+        Apply a batch of catalog deltas as one atomic update.
+
+        The changes are applied in a worker thread to copies of the current
+        skill store and index, and the result is published with a single
+        assignment. Copying is O(catalog) regardless of the batch size, so
+        batch changes together rather than applying them one at a time.
+        Reads never take the lock: each one works on the version that was
+        current when it started, so it neither waits for an update nor sees
+        a partly applied one. Updates are serialized.
+
+        Returns the applied skill IDs and the IDs that were skipped because
+        the skill to deactivate or delete does not exist. Unless
+        ``replicate`` is False, the changes are also sent to other workers.
+        """
+        changes = list(changes)
+        async with self._lock:
+            previous = self._state
+            state, applied, missing = await asyncio.to_thread(
+                self._apply_changes, previous, changes
+            )
+            self._state = state
+            if applied and self._backend is None:
+                # A restart must not map a catalog without these changes;
+                # with a catalog log it replays them onto the snapshot
+                self._discard_snapshot()
+
+            for skill_id, facets_only in applied.items():
+                self._invalidate_queries(
+                    skill_id, previous.index, state.index, facets_only
+                )
+                self._resolver.invalidate(skill_id)
+
+        if applied:
+            logger.info(
+                f"Applied {len(changes)} catalog changes to {len(applied)} skills"
+            )
+            if replicate:
+                await self._replicate(changes=[change.to_dict() for change in changes])
+        return {"applied": list(applied), "missing": missing}
+
+    def _apply_changes(
+        self, previous: _CatalogState, changes: List[CatalogChange]
+    ) -> Tuple[_CatalogState, Dict[str, bool], List[str]]:
+        """
+        Build the next catalog version without modifying ``previous``.
+
+        Applied IDs map to True when every change to the skill was a
+        deactivation, which only affects cached facet counts.
+        """
+        skills = previous.skills.copy()
+        index = previous.index.copy()
+        applied: Dict[str, bool] = {}
+        missing: List[str] = []
+        now = datetime.utcnow()
+
+        for change in changes:
+            skill_id = change.skill_id
+            if change.type is ChangeType.UPSERT:
+                skills.put(change.skill)
+                self._index_skill(index, change.skill)
+                found = True
+            elif change.type is ChangeType.DEACTIVATE:
+                found = skills.update(skill_id, is_active=False, updated_at=now)
+                if found:
+                    index.set_active(skill_id, False)
+            else:
+                found = skills.remove(skill_id)
+                if found:
+                    index.remove(skill_id)
+
+            if not found:
+                missing.append(skill_id)
+                continue
+            applied[skill_id] = (
+                applied.get(skill_id, True) and change.type is ChangeType.DEACTIVATE
+            )
+
+        return _CatalogState(skills, index), applied, missing
+
+    async def add_skill(self, skill: Skill) -> None:
+        """Add a skill to the registry, replacing any existing one with the same ID"""
+        await self.apply_changes([CatalogChange.upsert(skill)])
+
+    async def remove_skill(self, skill_id: str) -> bool:
+        """Remove a skill from the registry"""
+        result = await self.apply_changes([CatalogChange.delete(skill_id)])
+        return not result["missing"]
+
+    async def deactivate_skill(self, skill_id: str) -> bool:
+        """Mark a skill as inactive"""
+        result = await self.apply_changes([CatalogChange.deactivate(skill_id)])
+        return not result["missing"]
+
+    def _dependencies_of(self, skill_id: str) -> Optional[Tuple[str, ...]]:
+        """Direct dependencies of a skill, or None if it does not exist"""
+        record = self._state.skills.record(skill_id)
+        return record.dependencies if record else None
+
+    async def resolve_dependencies(self, skill_ids: List[str]) -> List[str]:
+        """
+        Resolve skills and their transitive dependencies in install order.
+
+        Raises ``MissingSkillError`` or ``DependencyCycleError``.
+        """
+        return self._resolver.resolve(skill_ids)
+
     async def install_skill(self, skill_id: str) -> bool:
-        """Install a skill"""
-        skill = await self.get_skill(skill_id)
-        if not skill:
+        """
+        Install a skill together with its dependencies.
+
+        Returns False if the skill does not exist; raises ``DependencyError``
+        if its dependencies cannot be resolved.
+        """
+        if skill_id not in self._state.skills:
             return False
-        
-        skill.usage_count += 1
-        skill.updated_at = datetime.utcnow()
-        logger.info(f"Installed skill: {skill_id}")
+
+        await self.install_skills([skill_id])
         return True
-    
+
+    async def install_skills(self, skill_ids: List[str]) -> List[str]:
+        """
+        Install a set of skills and their dependencies in one call.
+
+        The whole set is resolved before anything is installed, so a
+        missing skill or a cycle installs nothing. Returns the installed
+        skill IDs in install order, each exactly once.
+        """
+        async with self._lock:
+            install_order = self._resolver.resolve(skill_ids)
+            self._count_installs({skill_id: 1 for skill_id in install_order})
+
+        if self._store is not None:
+            for skill_id in install_order:
+                self._store.record_install(skill_id)
+
+        logger.info(f"Installed skills: {', '.join(install_order)}")
+        await self._replicate(installs=install_order)
+        return install_order
+
+    def _count_installs(self, installs: Mapping[str, int]) -> None:
+        """Add install counts to the usage counts of skills; call with the lock held"""
+        # Usage counts are updated in place on the current version, so the
+        # lock keeps a concurrent catalog update from dropping them
+        skills = self._state.skills
+        now = datetime.utcnow()
+
+        for skill_id, count in installs.items():
+            record = skills.record(skill_id)
+            if record is None:
+                continue
+            skills.update(
+                skill_id, usage_count=record.usage_count + count, updated_at=now
+            )
+            self._cache.invalidate_skill(skill_id)
+
+    @staticmethod
+    def _log_key(version: int) -> str:
+        """Backend key of a catalog log entry"""
+        return f"catalog:log:{version}"
+
+    async def _replicate(self, **message: Any) -> None:
+        """Log catalog changes or installs and publish them to the other workers"""
+        if self._backend is None:
+            return
+        try:
+            async with self._sync_lock:
+                # Claim the next free version; losing the race to another
+                # worker means applying its entry and trying the next one
+                while True:
+                    await self._catch_up()
+                    version = self._catalog_version + 1
+                    entry = orjson.dumps(
+                        {"origin": self._origin, "version": version, **message}
+                    )
+                    (added,) = await self._backend.add_many(
+                        {self._log_key(version): entry}
+                    )
+                    if added:
+                        self._catalog_version = version
+                        break
+            await self._backend.publish(self.CATALOG_CHANNEL, entry)
+        except Exception as e:
+            logger.error(f"Failed to replicate catalog update: {e}")
+
+    def _on_catalog_message(self, message: bytes) -> None:
+        """Apply a catalog update published by another worker"""
+        data = orjson.loads(message)
+        if data["origin"] == self._origin:
+            return
+        task = asyncio.create_task(self._sync(data))
+        self._replicating.add(task)
+        task.add_done_callback(self._replicating.discard)
+
+    async def _sync(
+        self, data: Optional[Dict[str, Any]] = None, installs: bool = True
+    ) -> None:
+        """Apply a published log entry, reading any skipped ones from the log"""
+        async with self._sync_lock:
+            if data is not None and data["version"] == self._catalog_version + 1:
+                await self._apply_entry(data)
+                self._catalog_version += 1
+            elif data is None or data["version"] > self._catalog_version:
+                await self._catch_up(installs)
+
+    async def _catch_up(self, installs: bool = True) -> None:
+        """Apply log entries after the last applied version, with the sync lock held"""
+        start = self._catalog_version
+        while True:
+            first = self._catalog_version + 1
+            entries = await self._backend.get_many(
+                [self._log_key(first + i) for i in range(self.CATALOG_LOG_BATCH)]
+            )
+            for entry in entries:
+                if entry is None:
+                    if self._catalog_version > start:
+                        logger.info(
+                            f"Caught up with catalog log from version {start} "
+                            f"to {self._catalog_version}"
+                        )
+                    return
+                await self._apply_entry(orjson.loads(entry), installs)
+                self._catalog_version += 1
+
+    async def _apply_entry(self, data: Dict[str, Any], installs: bool = True) -> None:
+        """Apply the changes and installs of a log entry from another worker"""
+        if "changes" in data:
+            changes = [CatalogChange.from_dict(change) for change in data["changes"]]
+            await self.apply_changes(changes, replicate=False)
+        if installs and "installs" in data:
+            async with self._lock:
+                self._count_installs({skill_id: 1 for skill_id in data["installs"]})
+
     async def cleanup(self) -> None:
         """Cleanup resources"""
-        self._skills.clear()
-        self._categories.clear()
+        for task in self._replicating:
+            task.cancel()
+        self._state.skills.close()
+        self._state = _CatalogState(self._new_store(), SkillIndex())
+        self._resolver.clear()
         self._cache.clear()
+        self._catalog_version = 0
         self._initialized = False
         logger.info("Skill registry cleaned up")
@@ -0,0 +1,158 @@
+"""
+Skill Snapshot
+Versioned, memory-mapped binary snapshot of the skill catalog and its index
+"""
+
+from typing import Any, Dict, Iterator, Optional, Tuple
+import json
+import marshal
+import mmap
+import os
+import struct
+import time
+import zlib
+
+SNAPSHOT_MAGIC = b"ATHSNAP\x00"
+SNAPSHOT_VERSION = 5
+FINGERPRINT_SIZE = 16
+
+# magic, format version, created timestamp, catalog fingerprint,
+# directory length, directory crc32
+_HEADER = struct.Struct(f"<8sHd{FINGERPRINT_SIZE}sQI")
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot is missing, stale or corrupt"""
+
+
+class SkillSnapshot:
+    """
+    Read-only view over a snapshot file.
+
+    The file is a fixed header followed by a marshalled directory (record
+    locations plus the serialized search index) and the JSON-encoded skill
+    records. Opening reads the header and unmarshals the directory, so the
+    index is rebuilt in each process's own memory in time proportional to
+    its size; this skips tokenizing the catalog but is not constant time.
+    Only the records stay in the shared page cache until they are decoded
+    on first access, so forked workers share those pages alone.
+
+    The header carries a fingerprint of the catalog source the snapshot
+    was built from; a snapshot whose fingerprint differs from the expected
+    one is rejected as stale, as is one older than ``max_age``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fingerprint: bytes,
+        max_age: Optional[float] = None,
+    ):
+        self.path = path
+        try:
+            with open(path, "rb") as handle:
+                self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"Cannot open snapshot {path}: {e}") from e
+
+        try:
+            self._read_directory(fingerprint, max_age)
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def _read_directory(self, fingerprint: bytes, max_age: Optional[float]) -> None:
+        if len(self._mmap) < _HEADER.size:
+            raise SnapshotError("Snapshot is truncated")
+
+        magic, version, created_at, source, length, checksum = _HEADER.unpack_from(
+            self._mmap, 0
+        )
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError("Not a skill snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f"Unsupported snapshot version {version}")
+        if source != fingerprint:
+            raise SnapshotError("Snapshot was built from a different catalog")
+        if max_age is not None and time.time() - created_at > max_age:
+            raise SnapshotError("Snapshot is stale")
+
+        start = _HEADER.size
+        directory = self._mmap[start : start + length]
+        if len(directory) != length or zlib.crc32(directory) != checksum:
+            raise SnapshotError("Snapshot directory checksum mismatch")
+
+        try:
+            self._locations, self.index_state = marshal.loads(directory)
+        except (EOFError, ValueError, TypeError) as e:
+            raise SnapshotError(f"Snapshot directory is unreadable: {e}") from e
+
+        self.created_at = created_at
+        self._records_start = start + length
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def __contains__(self, skill_id: str) -> bool:
+        return skill_id in self._locations
+
+    def ids(self) -> Iterator[str]:
+        """Skill IDs in catalog order"""
+        return iter(self._locations)
+
+    def record(self, skill_id: str) -> Dict[str, Any]:
+        """Decode a single skill record"""
+        offset, length, checksum = self._locations[skill_id]
+        start = self._records_start + offset
+        data = self._mmap[start : start + length]
+        if zlib.crc32(data) != checksum:
+            raise SnapshotError(f"Snapshot record {skill_id} checksum mismatch")
+        return json.loads(data)
+
+    def close(self) -> None:
+        """Unmap the snapshot file"""
+        self._mmap.close()
+
+    @staticmethod
+    def write(
+        path: str,
+        records: Dict[str, Dict[str, Any]],
+        index_state: Any,
+        fingerprint: bytes,
+    ) -> None:
+        """
+        Atomically write a snapshot of ``records`` and ``index_state``,
+        built from the catalog source identified by ``fingerprint``.
+
+        The file is written next to ``path`` and renamed over it, so readers
+        either see the previous snapshot or the complete new one.
+        """
+        locations: Dict[str, Tuple[int, int, int]] = {}
+        chunks = []
+        offset = 0
+        for skill_id, record in records.items():
+            data = json.dumps(record, separators=(",", ":")).encode()
+            locations[skill_id] = (offset, len(data), zlib.crc32(data))
+            chunks.append(data)
+            offset += len(data)
+
+        directory = marshal.dumps((locations, index_state))
+        header = _HEADER.pack(
+            SNAPSHOT_MAGIC,
+            SNAPSHOT_VERSION,
+            time.time(),
+            fingerprint,
+            len(directory),
+            zlib.crc32(directory),
+        )
+
+        directory_name = os.path.dirname(path)
+        if directory_name:
+            os.makedirs(directory_name, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as handle:
+            handle.write(header)
+            handle.write(directory)
+            for chunk in chunks:
+                handle.write(chunk)
+        os.replace(tmp_path, path)
@@ -0,0 +1,281 @@
+"""
+Skill Store
+Compact slotted storage for skill records
+"""
+
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Set, Tuple
+from datetime import datetime, timedelta, timezone
+import sys
+
+import orjson
+
+from src.services.skill_snapshot import SkillSnapshot
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Fields shared by Skill and SkillRecord, in constructor order
+SKILL_FIELDS = (
+    "id",
+    "name",
+    "description",
+    "category",
+    "author",
+    "version",
+    "tags",
+    "dependencies",
+    "config",
+    "created_at",
+    "updated_at",
+    "is_active",
+    "usage_count",
+    "rating",
+)
+
+
+class _AwareMicros(int):
+    """Microseconds since the epoch of a datetime that was timezone-aware"""
+
+    __slots__ = ()
+
+
+def _to_micros(value: datetime) -> int:
+    """Convert a naive UTC or aware datetime to microseconds since the epoch"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return _AwareMicros((value - _EPOCH) // _MICROSECOND)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _from_micros(value: int) -> datetime:
+    """
+    Convert microseconds since the epoch back to a UTC datetime, aware in
+    ``timezone.utc`` if it was aware when stored and naive otherwise
+    """
+    restored = _EPOCH + timedelta(microseconds=value)
+    if isinstance(value, _AwareMicros):
+        return restored.replace(tzinfo=timezone.utc)
+    return restored
+
+
+class SkillRecord:
+    """
+    Slotted, compact form of a skill.
+
+    Repeated strings (category, author, version, tags, dependencies) are
+    interned, lists become shared tuples, an empty config is stored as
+    ``None`` and timestamps are kept as integer microseconds in UTC.
+    """
+
+    __slots__ = SKILL_FIELDS
+
+    def __init__(self, **fields: Any):
+        for name in SKILL_FIELDS:
+            setattr(self, name, fields[name])
+
+
+class SkillStore(Mapping):
+    """
+    Mapping of skill ID to skill backed by compact records.
+
+    Lookups build a fresh skill object from the stored record, so objects
+    only exist at the API boundary and mutating one does not change the
+    store; use ``put`` and ``update`` instead. Stored records are replaced
+    rather than modified, so ``copy`` can share them with the copy. When
+    opened over a snapshot, records are decoded from it on first access and
+    iteration follows snapshot order, then newly added IDs.
+
+    The JSON encoding of recently requested skills is cached as bytes (up
+    to ``payload_cache_size`` entries, oldest first out) and dropped when
+    the skill changes.
+    """
+
+    def __init__(
+        self,
+        skill_type: Callable[..., Any],
+        decode: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        snapshot: Optional[SkillSnapshot] = None,
+        payload_cache_size: int = 0,
+    ):
+        self._skill_type = skill_type
+        self._decode = decode
+        self._snapshot = snapshot
+        self._payloads: Dict[str, bytes] = {}
+        self._payload_cache_size = payload_cache_size
+        self._records: Dict[str, SkillRecord] = {}
+        self._added: Dict[str, SkillRecord] = {}
+        self._deleted: Set[str] = set()
+        self._tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+    def __getitem__(self, skill_id: str) -> Any:
+        record = self.record(skill_id)
+        if record is None:
+            raise KeyError(skill_id)
+        return self._materialize(record)
+
+    def __contains__(self, skill_id: object) -> bool:
+        if skill_id in self._added:
+            return True
+        return self._in_snapshot(skill_id)
+
+    def __iter__(self) -> Iterator[str]:
+        if self._snapshot is not None:
+            for skill_id in self._snapshot.ids():
+                if skill_id not in self._deleted:
+                    yield skill_id
+        yield from self._added
+
+    def __len__(self) -> int:
+        snapshot_count = len(self._snapshot) if self._snapshot is not None else 0
+        return snapshot_count - len(self._deleted) + len(self._added)
+
+    def copy(self) -> "SkillStore":
+        """
+        Return a store with the same contents that can be changed without
+        affecting this one. Records and the snapshot are shared; the maps
+        of changed, added and deleted skills are copied, which is O(n) in
+        the skills held outside the snapshot (every skill without one).
+        """
+        store = SkillStore.__new__(SkillStore)
+        store._skill_type = self._skill_type
+        store._decode = self._decode
+        store._snapshot = self._snapshot
+        store._payloads = self._payloads.copy()
+        store._payload_cache_size = self._payload_cache_size
+        store._records = self._records.copy()
+        store._added = self._added.copy()
+        store._deleted = self._deleted.copy()
+        store._tuples = self._tuples.copy()
+        return store
+
+    def record(self, skill_id: str) -> Optional[SkillRecord]:
+        """Get the stored record for a skill without building a skill object"""
+        record = self._added.get(skill_id)
+        if record is not None:
+            return record
+        record = self._records.get(skill_id)
+        if record is not None:
+            return record
+        if not self._in_snapshot(skill_id):
+            return None
+        record = self._compact(self._decode(self._snapshot.record(skill_id)))
+        self._records[skill_id] = record
+        return record
+
+    def payload(self, skill_id: str) -> Optional[bytes]:
+        """Get the JSON encoding of a skill's ``to_dict`` output"""
+        payload = self._payloads.get(skill_id)
+        if payload is not None:
+            return payload
+
+        record = self.record(skill_id)
+        if record is None:
+            return None
+        payload = orjson.dumps(self._materialize(record).to_dict())
+
+        if self._payload_cache_size > 0:
+            if len(self._payloads) >= self._payload_cache_size:
+                del self._payloads[next(iter(self._payloads))]
+            self._payloads[skill_id] = payload
+        return payload
+
+    def records(self) -> Iterator[SkillRecord]:
+        """Iterate over stored records in catalog order"""
+        for skill_id in self:
+            yield self.record(skill_id)
+
+    def put(self, skill: Any) -> None:
+        """Store a skill, replacing any existing record with the same ID"""
+        record = self._compact(skill)
+        self._payloads.pop(skill.id, None)
+        if self._in_snapshot(skill.id):
+            self._records[skill.id] = record
+        else:
+            self._added[skill.id] = record
+
+    def update(self, skill_id: str, **changes: Any) -> bool:
+        """Change fields of a stored skill"""
+        record = self.record(skill_id)
+        if record is None:
+            return False
+        self._payloads.pop(skill_id, None)
+        fields = {name: getattr(record, name) for name in SKILL_FIELDS}
+        for name, value in changes.items():
+            if name in ("created_at", "updated_at"):
+                value = _to_micros(value)
+            fields[name] = value
+        if skill_id in self._added:
+            self._added[skill_id] = SkillRecord(**fields)
+        else:
+            self._records[skill_id] = SkillRecord(**fields)
+        return True
+
+    def remove(self, skill_id: str) -> bool:
+        """Delete a stored skill"""
+        self._payloads.pop(skill_id, None)
+        if skill_id in self._added:
+            del self._added[skill_id]
+            return True
+        if self._in_snapshot(skill_id):
+            self._records.pop(skill_id, None)
+            self._deleted.add(skill_id)
+            return True
+        return False
+
+    def close(self) -> None:
+        """Drop all records and release the snapshot"""
+        self._records.clear()
+        self._added.clear()
+        self._deleted.clear()
+        self._tuples.clear()
+        self._payloads.clear()
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+
+    def _in_snapshot(self, skill_id: object) -> bool:
+        return (
+            self._snapshot is not None
+            and skill_id in self._snapshot
+            and skill_id not in self._deleted
+        )
+
+    def _shared_tuple(self, values: Any) -> Tuple[str, ...]:
+        values = tuple(sys.intern(value) for value in values)
+        return self._tuples.setdefault(values, values)
+
+    def _compact(self, skill: Any) -> SkillRecord:
+        return SkillRecord(
+            id=skill.id,
+            name=skill.name,
+            description=skill.description,
+            category=sys.intern(skill.category),
+            author=sys.intern(skill.author),
+            version=sys.intern(skill.version),
+            tags=self._shared_tuple(skill.tags),
+            dependencies=self._shared_tuple(skill.dependencies),
+            config=dict(skill.config) if skill.config else None,
+            created_at=_to_micros(skill.created_at),
+            updated_at=_to_micros(skill.updated_at),
+            is_active=skill.is_active,
+            usage_count=skill.usage_count,
+            rating=skill.rating,
+        )
+
+    def _materialize(self, record: SkillRecord) -> Any:
+        return self._skill_type(
+            id=record.id,
+            name=record.name,
+            description=record.description,
+            category=record.category,
+            author=record.author,
+            version=record.version,
+            tags=list(record.tags),
+            dependencies=list(record.dependencies),
+            config=dict(record.config) if record.config else {},
+            created_at=_from_micros(record.created_at),
+            updated_at=_from_micros(record.updated_at),
+            is_active=record.is_active,
+            usage_count=record.usage_count,
+            rating=record.rating,
+        )
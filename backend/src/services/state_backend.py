@@ -0,0 +1,360 @@
+"""
+State Backend
+Key-value state and pub/sub shared between API worker processes
+"""
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+import asyncio
+import logging
+import time
+import uuid
+
+from src.services.query_cache import QueryCache
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[bytes], None]
+
+
+class StateBackend:
+    """
+    Interface of a state backend.
+
+    Values are bytes under string keys, optionally expiring after a TTL.
+    Multi-key operations are sent in one round trip. Handlers subscribed
+    to a channel are called with every message published to it, from any
+    process sharing the backend. ``shared`` tells whether other processes
+    can see the state at all.
+    """
+
+    shared = False
+
+    async def start(self) -> None:
+        """Connect to the backend"""
+
+    async def close(self) -> None:
+        """Release connections and stop delivering messages"""
+
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        """Values of several keys, None where missing"""
+        raise NotImplementedError
+
+    async def set_many(
+        self, items: Mapping[str, bytes], ttl: Optional[float] = None
+    ) -> None:
+        """Set several keys"""
+        raise NotImplementedError
+
+    async def add_many(
+        self, items: Mapping[str, bytes], ttl: Optional[float] = None
+    ) -> List[bool]:
+        """Set each key that does not exist yet; returns which were set"""
+        raise NotImplementedError
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        """Send a message to every subscriber of a channel"""
+        raise NotImplementedError
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        """Call ``handler`` with each message published to a channel"""
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        """Backend type and counters"""
+        return {"backend": type(self).__name__, "shared": self.shared}
+
+
+class InMemoryStateBackend(StateBackend):
+    """
+    State kept in this process.
+
+    Messages are delivered on the next event loop iteration, as they would
+    be from a server. Services only share state through a backend marked
+    ``shared``; pass ``shared=True`` to let several services in one
+    process stand in for separate workers.
+    """
+
+    def __init__(
+        self, shared: bool = False, clock: Callable[[], float] = time.monotonic
+    ):
+        self.shared = shared
+        self._clock = clock
+        self._values: Dict[str, Tuple[Optional[float], bytes]] = {}
+        self._handlers: Dict[str, List[MessageHandler]] = {}
+        self.round_trips = 0
+        self.published = 0
+
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        self.round_trips += 1
+        now = self._clock()
+        values = []
+        for key in keys:
+            entry = self._values.get(key)
+            if entry is not None and entry[0] is not None and entry[0] <= now:
+                del self._values[key]
+                entry = None
+            values.append(entry[1] if entry is not None else None)
+        return values
+
+    async def set_many(
+        self, items: Mapping[str, bytes], ttl: Optional[float] = None
+    ) -> None:
+        self.round_trips += 1
+        expires_at = self._clock() + ttl if ttl else None
+        for key, value in items.items():
+            self._values[key] = (expires_at, value)
+
+    async def add_many(
+        self, items: Mapping[str, bytes], ttl: Optional[float] = None
+    ) -> List[bool]:
+        existing = await self.get_many(list(items))
+        expires_at = self._clock() + ttl if ttl else None
+        added = []
+        for (key, value), current in zip(items.items(), existing):
+            if current is None:
+                self._values[key] = (expires_at, value)
+            added.append(current is None)
+        return added
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        self.round_trips += 1
+        self.published += 1
+        loop = asyncio.get_running_loop()
+        for handler in self._handlers.get(channel, ()):
+            loop.call_soon(handler, message)
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        self._handlers.setdefault(channel, []).append(handler)
+
+    async def close(self) -> None:
+        self._handlers.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **super().stats(),
+            "keys": len(self._values),
+            "round_trips": self.round_trips,
+            "published": self.published,
+        }
+
+
+class RedisStateBackend(StateBackend):
+    """
+    State kept in Redis and shared by every worker using the same server.
+
+    Keys are prefixed with ``prefix``. Reads of several keys use one MGET
+    and writes of several keys one non-transactional pipeline. A single
+    pub/sub connection per process dispatches messages to the handlers.
+    """
+
+    shared = True
+
+    def __init__(self, url: str, prefix: str = "athena:"):
+        import redis.asyncio as redis
+
+        self.url = url
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+        self._handlers: Dict[str, List[MessageHandler]] = {}
+        self.round_trips = 0
+        self.published = 0
+        self.received = 0
+
+    async def start(self) -> None:
+        await self._client.ping()
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        logger.info(f"Connected to Redis state backend at {self.url}")
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        self._handlers.clear()
+        await self._client.aclose()
+
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        if not keys:
+            return []
+        self.round_trips += 1
+        return await self._client.mget([self.prefix + key for key in keys])
+
+    async def set_many(
+        self, items: Mapping[str, bytes], ttl: Optional[float] = None
+    ) -> None:
+        if not items:
+            return
+        px = int(ttl * 1000) if ttl else None
+        async with self._client.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.set(self.prefix + key, value, px=px)
+            self.round_trips += 1
+            await pipe.execute()
+
+    async def add_many(
+        self, items: Mapping[str, bytes], ttl: Optional[float] = None
+    ) -> List[bool]:
+        if not items:
+            return []
+        px = int(ttl * 1000) if ttl else None
+        async with self._client.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.set(self.prefix + key, value, nx=True, px=px)
+            self.round_trips += 1
+            return [bool(result) for result in await pipe.execute()]
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        self.round_trips += 1
+        self.published += 1
+        await self._client.publish(self.prefix + channel, message)
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        if channel not in self._handlers:
+            await self._pubsub.subscribe(self.prefix + channel)
+        self._handlers.setdefault(channel, []).append(handler)
+        if self._listener is None:
+            self._listener = asyncio.create_task(
+                self._listen(), name="state-backend-listener"
+            )
+
+    async def _listen(self) -> None:
+        async for message in self._pubsub.listen():
+            if message["type"] != "message":
+                continue
+            channel = message["channel"].decode()[len(self.prefix) :]
+            self.received += 1
+            for handler in self._handlers.get(channel, ()):
+                try:
+                    handler(message["data"])
+                except Exception as e:
+                    logger.error(f"State message handler for {channel} failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **super().stats(),
+            "round_trips": self.round_trips,
+            "published": self.published,
+            "received": self.received,
+        }
+
+
+def create_state_backend(name: str, redis_url: str) -> StateBackend:
+    """Backend selected by the ``STATE_BACKEND`` setting"""
+    if name == "redis":
+        return RedisStateBackend(redis_url)
+    if name == "memory":
+        return InMemoryStateBackend()
+    raise ValueError(f"Unknown state backend: {name}")
+
+
+class NearCache:
+    """
+    Local cache in front of a namespace of a state backend.
+
+    Reads are served from a local ``QueryCache`` and fall back to the
+    backend for misses, fetching all of them in one round trip. Writes go
+    to both and publish the written keys on the namespace's invalidation
+    channel, so other processes drop their stale local copies;
+    ``on_invalidate`` is also told which keys changed elsewhere.
+    """
+
+    def __init__(
+        self,
+        backend: StateBackend,
+        namespace: str,
+        max_entries: int,
+        ttl: float,
+        on_invalidate: Optional[Callable[[Set[str]], None]] = None,
+    ):
+        self.backend = backend
+        self.namespace = namespace
+        self.origin = uuid.uuid4().hex
+        self._local = QueryCache(max_entries=max_entries, ttl=ttl)
+        self._on_invalidate = on_invalidate
+        self.remote_hits = 0
+        self.invalidations = 0
+
+    @property
+    def channel(self) -> str:
+        return f"{self.namespace}:invalidate"
+
+    async def start(self) -> None:
+        """Start listening for invalidations from other processes"""
+        await self.backend.subscribe(self.channel, self._invalidate)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """Values of the keys that exist"""
+        found: Dict[str, bytes] = {}
+        misses = []
+        for key in keys:
+            value = self._local.get(key)
+            if value is None:
+                misses.append(key)
+            else:
+                found[key] = value
+
+        if misses:
+            values = await self.backend.get_many([self._key(key) for key in misses])
+            for key, value in zip(misses, values):
+                if value is not None:
+                    found[key] = value
+                    self._local.put(key, value)
+                    self.remote_hits += 1
+        return found
+
+    async def set_many(
+        self, items: Mapping[str, bytes], ttl: Optional[float] = None
+    ) -> None:
+        """Write values and invalidate other processes' copies"""
+        if not items:
+            return
+        for key, value in items.items():
+            self._local.put(key, value)
+        await self.backend.set_many(
+            {self._key(key): value for key, value in items.items()}, ttl
+        )
+        await self.backend.publish(
+            self.channel, "\n".join([self.origin, *items]).encode()
+        )
+
+    def clear(self) -> None:
+        """Drop the local copies"""
+        self._local.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Local cache counters plus backend fetches and invalidations"""
+        return {
+            **self._local.stats(),
+            "remote_hits": self.remote_hits,
+            "remote_invalidations": self.invalidations,
+        }
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _invalidate(self, message: bytes) -> None:
+        origin, *keys = message.decode().split("\n")
+        if origin == self.origin:
+            return
+        changed = set(keys)
+        for key in changed:
+            self._local.discard(key)
+        self.invalidations += len(changed)
+        if self._on_invalidate is not None:
+            self._on_invalidate(changed)
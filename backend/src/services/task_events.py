@@ -0,0 +1,178 @@
+"""
+Task Events
+Publish/subscribe fan-out of task status changes and output chunks
+"""
+
+from typing import Any, Dict, NamedTuple, Optional, Set
+from datetime import datetime
+import asyncio
+import logging
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+class TaskEvent(NamedTuple):
+    """An event encoded once and shared by every subscriber"""
+
+    kind: str
+    task_id: str
+    final: bool
+    text: str
+    sse: bytes
+
+
+class Subscription:
+    """
+    Bounded queue of events for one topic.
+
+    A subscriber that falls ``max_queued`` events behind is dropped
+    instead of slowing down the publisher; ``overflowed`` is then set and
+    ``get`` returns None. Use as a context manager to unsubscribe.
+    """
+
+    def __init__(self, bus: "TaskEventBus", topic: str, max_queued: int):
+        self.topic = topic
+        self.overflowed = False
+        self._bus = bus
+        self._queue: "asyncio.Queue[Optional[TaskEvent]]" = asyncio.Queue(max_queued)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[TaskEvent]:
+        """
+        Wait for the next event.
+
+        Returns None when nothing arrived within ``timeout`` or the
+        subscription overflowed.
+        """
+        if self.overflowed:
+            return None
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        """Stop receiving events"""
+        self._bus._unsubscribe(self)
+
+    def _deliver(self, event: TaskEvent) -> bool:
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.overflowed = True
+            # Wake a waiting consumer so it notices the overflow
+            self._queue.get_nowait()
+            self._queue.put_nowait(None)
+            return False
+
+
+class TaskEventBus:
+    """
+    Fan-out of task events to subscribers of a task or an agent.
+
+    Each event is serialized once, as JSON text and as a Server-Sent Events
+    frame, and the same objects are queued for every subscriber. Nothing
+    is encoded when a task has no subscribers.
+    """
+
+    def __init__(self, max_queued: int):
+        self.max_queued = max_queued
+        self._topics: Dict[str, Set[Subscription]] = {}
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    @staticmethod
+    def task_topic(task_id: str) -> str:
+        """Topic of a single task's events"""
+        return f"task:{task_id}"
+
+    @staticmethod
+    def agent_topic(agent_id: str) -> str:
+        """Topic of the events of every task of an agent"""
+        return f"agent:{agent_id}"
+
+    def subscribe(self, topic: str) -> Subscription:
+        """Subscribe to a task or agent topic"""
+        subscription = Subscription(self, topic, self.max_queued)
+        self._topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def publish(
+        self,
+        kind: str,
+        task: Any,
+        final: bool = False,
+        chunk: Optional[str] = None,
+        attempt: Optional[int] = None,
+    ) -> int:
+        """Send an event about a task to its subscribers and its agent's"""
+        task_subscribers = self._topics.get(self.task_topic(task.id))
+        agent_subscribers = self._topics.get(self.agent_topic(task.agent_id))
+        if not task_subscribers and not agent_subscribers:
+            return 0
+
+        payload = {
+            "event": kind,
+            "task_id": task.id,
+            "agent_id": task.agent_id,
+            "status": task.status,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+        if chunk is not None:
+            payload["chunk"] = chunk
+        if attempt is not None:
+            payload["attempt"] = attempt
+        if final:
+            payload["output"] = task.output
+            payload["error"] = task.error
+
+        data = orjson.dumps(payload)
+        event = TaskEvent(
+            kind=kind,
+            task_id=task.id,
+            final=final,
+            text=data.decode(),
+            sse=b"event: " + kind.encode() + b"\ndata: " + data + b"\n\n",
+        )
+        self.published += 1
+
+        delivered = 0
+        for subscribers in (task_subscribers, agent_subscribers):
+            for subscription in list(subscribers or ()):
+                if subscription._deliver(event):
+                    delivered += 1
+                else:
+                    self.dropped += 1
+                    logger.warning(f"Dropping slow subscriber to {subscription.topic}")
+                    self._unsubscribe(subscription)
+        self.delivered += delivered
+        return delivered
+
+    def stats(self) -> Dict[str, Any]:
+        """Subscriber and delivery counters"""
+        return {
+            "topics": len(self._topics),
+            "subscribers": sum(
+                len(subscribers) for subscribers in self._topics.values()
+            ),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._topics.get(subscription.topic)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._topics[subscription.topic]
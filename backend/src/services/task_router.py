@@ -0,0 +1,116 @@
+"""
+Task Router
+Chooses an agent for a task from the skills it needs and current load
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Set
+import random
+
+ROUTING_STRATEGIES = ("p2c", "least_loaded")
+
+
+class TaskRouter:
+    """
+    Routes tasks to agents by skill and load.
+
+    Agents are indexed by skill and by type when they are added, so
+    finding the candidates for a task is a set intersection. Among the
+    candidates the one with the lowest expected wait, (queue depth + 1)
+    times its recent execution latency, is chosen: either among two
+    random candidates ("p2c", power of two choices) or among all of them
+    ("least_loaded").
+    """
+
+    def __init__(self, strategy: str = "p2c", smoothing: float = 0.2):
+        if strategy not in ROUTING_STRATEGIES:
+            raise ValueError(f"Unknown routing strategy: {strategy}")
+        self.strategy = strategy
+        self.smoothing = smoothing
+        self._by_skill: Dict[str, Set[str]] = {}
+        self._by_type: Dict[str, Set[str]] = {}
+        self._agents: Set[str] = set()
+        self._latency: Dict[str, float] = {}
+        self.routed = 0
+
+    def add_agent(self, agent_id: str, agent_type: str, skills: Iterable[str]) -> None:
+        """Index an agent by its type and skills"""
+        self._agents.add(agent_id)
+        self._by_type.setdefault(agent_type, set()).add(agent_id)
+        for skill in skills:
+            self._by_skill.setdefault(skill, set()).add(agent_id)
+
+    def clear(self) -> None:
+        """Forget all agents"""
+        self._by_skill.clear()
+        self._by_type.clear()
+        self._agents.clear()
+        self._latency.clear()
+
+    def observe(self, agent_id: str, duration: float) -> None:
+        """Fold an execution time into an agent's moving average latency"""
+        previous = self._latency.get(agent_id)
+        if previous is None:
+            self._latency[agent_id] = duration
+        else:
+            self._latency[agent_id] = previous + self.smoothing * (duration - previous)
+
+    def candidates(
+        self, skills: Iterable[str] = (), agent_type: Optional[str] = None
+    ) -> Set[str]:
+        """Agents that have every skill and, if given, the type"""
+        postings: List[Set[str]] = [
+            self._by_skill.get(skill, set()) for skill in set(skills)
+        ]
+        if agent_type is not None:
+            postings.append(self._by_type.get(agent_type, set()))
+        if not postings:
+            return set(self._agents)
+
+        postings.sort(key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result &= posting
+        return result
+
+    def choose(
+        self,
+        candidates: Iterable[str],
+        depth: Callable[[str], float],
+        available: Optional[Callable[[str], bool]] = None,
+    ) -> Optional[str]:
+        """
+        Pick the candidate with the lowest expected wait.
+
+        Candidates for which ``available`` is false are only used when no
+        other candidate is left.
+        """
+        pool = sorted(candidates)
+        if available is not None:
+            pool = [agent_id for agent_id in pool if available(agent_id)] or pool
+        if not pool:
+            return None
+
+        if self.strategy == "p2c" and len(pool) > 2:
+            pool = random.sample(pool, 2)
+
+        default = (
+            sum(self._latency.values()) / len(self._latency) if self._latency else 1.0
+        )
+        self.routed += 1
+        return min(
+            pool,
+            key=lambda agent_id: (depth(agent_id) + 1)
+            * self._latency.get(agent_id, default),
+        )
+
+    def stats(self) -> Dict[str, object]:
+        """Strategy, index size and recent latencies"""
+        return {
+            "strategy": self.strategy,
+            "skills_indexed": len(self._by_skill),
+            "routed": self.routed,
+            "latency_ms": {
+                agent_id: round(latency * 1000, 3)
+                for agent_id, latency in self._latency.items()
+            },
+        }
@@ -0,0 +1,268 @@
+"""
+Task Scheduler
+Priority queue drained by a bounded pool of async workers
+"""
+
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+)
+from collections import deque
+from dataclasses import dataclass
+import asyncio
+import itertools
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerFullError(Exception):
+    """Raised when the scheduler queue is at capacity"""
+
+
+class Reservation:
+    """Queue room held for jobs that are about to be submitted"""
+
+    def __init__(self, scheduler: "TaskScheduler", count: int):
+        self._scheduler = scheduler
+        self.remaining = count
+
+    def __enter__(self) -> "Reservation":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.release()
+
+    def release(self) -> None:
+        """Give back the room no job was submitted into"""
+        self._scheduler._reserved -= self.remaining
+        self.remaining = 0
+
+
+@dataclass
+class _Job:
+    """A queued coroutine factory and the future reporting its outcome"""
+
+    run: Callable[[], Awaitable[Any]]
+    group: Optional[Hashable]
+    future: asyncio.Future
+
+
+class TaskScheduler:
+    """
+    Runs submitted jobs on a fixed number of worker tasks.
+
+    Jobs wait in a priority queue, higher priority first and FIFO within a
+    priority. At most ``max_per_group`` jobs of the same group run at once,
+    or the group's own limit set with ``set_limit``. A worker that takes a
+    job of a saturated group parks it until one of that group's jobs
+    finishes, so a busy group never holds up the others.
+    """
+
+    def __init__(self, max_workers: int, max_per_group: int, max_queue: int = 0):
+        self.max_workers = max_workers
+        self.max_per_group = max_per_group
+        self.max_queue = max_queue
+        self._queue: "asyncio.PriorityQueue[Tuple[int, int, _Job]]" = (
+            asyncio.PriorityQueue()
+        )
+        self._sequence = itertools.count()
+        self._parked: Dict[Hashable, Deque[Tuple[int, int, _Job]]] = {}
+        self._parked_count = 0
+        self._reserved = 0
+        self._running: Dict[Optional[Hashable], int] = {}
+        self._waiting: Dict[Optional[Hashable], int] = {}
+        self._limits: Dict[Hashable, int] = {}
+        self._workers: List[asyncio.Task] = []
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def __len__(self) -> int:
+        """Number of jobs waiting to run"""
+        return self._queue.qsize() + self._parked_count
+
+    def start(self) -> None:
+        """Start the worker tasks"""
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"task-worker-{number}")
+            for number in range(self.max_workers)
+        ]
+        logger.info(f"Task scheduler started with {self.max_workers} workers")
+
+    async def stop(self) -> None:
+        """Stop the workers and cancel every job that has not finished"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        while not self._queue.empty():
+            self._queue.get_nowait()[2].future.cancel()
+        for parked in self._parked.values():
+            for entry in parked:
+                entry[2].future.cancel()
+        self._parked.clear()
+        self._parked_count = 0
+        self._running.clear()
+        self._waiting.clear()
+        self._limits.clear()
+
+    def submit(
+        self,
+        run: Callable[[], Awaitable[Any]],
+        group: Optional[Hashable] = None,
+        priority: int = 0,
+        reservation: Optional[Reservation] = None,
+    ) -> asyncio.Future:
+        """
+        Queue a job and return a future for its result.
+
+        ``run`` is called by a worker to create the coroutine. Jobs without
+        a group are not subject to the per-group limit. A job submitted
+        with a ``reservation`` that has room left takes its place there;
+        otherwise ``SchedulerFullError`` is raised when ``max_queue`` jobs
+        are already waiting.
+        """
+        if reservation is not None and reservation.remaining > 0:
+            reservation.remaining -= 1
+            self._reserved -= 1
+        elif not self.has_room():
+            self.rejected += 1
+            raise SchedulerFullError(f"Task queue is full ({self.max_queue} waiting)")
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(
+            (-priority, next(self._sequence), _Job(run, group, future))
+        )
+        self._waiting[group] = self._waiting.get(group, 0) + 1
+        self.submitted += 1
+        return future
+
+    def has_room(self, count: int = 1) -> bool:
+        """Whether ``count`` more jobs can be queued"""
+        return (
+            not self.max_queue or len(self) + self._reserved + count <= self.max_queue
+        )
+
+    def reserve(self, count: int) -> Reservation:
+        """
+        Hold room for ``count`` jobs until they are submitted with the
+        reservation or it is released. Raises ``SchedulerFullError`` if the
+        queue cannot take them all.
+        """
+        if not self.has_room(count):
+            self.rejected += count
+            raise SchedulerFullError(
+                f"Task queue cannot take {count} more tasks "
+                f"({len(self)} of {self.max_queue} waiting)"
+            )
+        self._reserved += count
+        return Reservation(self, count)
+
+    def running(self, group: Optional[Hashable] = None) -> int:
+        """Number of jobs running, overall or for one group"""
+        if group is None:
+            return sum(self._running.values())
+        return self._running.get(group, 0)
+
+    def limit(self, group: Hashable) -> int:
+        """Number of a group's jobs allowed to run at once"""
+        return self._limits.get(group, self.max_per_group)
+
+    def set_limit(self, group: Hashable, limit: int) -> None:
+        """Change how many of a group's jobs may run at once"""
+        self._limits[group] = limit
+        parked = self._parked.get(group)
+        free = limit - self._running.get(group, 0)
+        while parked and free > 0:
+            self._queue.put_nowait(parked.popleft())
+            self._parked_count -= 1
+            free -= 1
+        if parked is not None and not parked:
+            del self._parked[group]
+
+    def depth(self, group: Optional[Hashable]) -> int:
+        """Number of a group's jobs that are waiting or running"""
+        return self._waiting.get(group, 0) + self._running.get(group, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, concurrency and outcome counters"""
+        return {
+            "workers": len(self._workers),
+            "max_per_group": self.max_per_group,
+            "queued": len(self),
+            "reserved": self._reserved,
+            "parked": self._parked_count,
+            "running": self.running(),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            entry = await self._queue.get()
+            job = entry[2]
+            if job.future.done():
+                self._unwait(job.group)
+                continue
+            if job.group is not None and self._running.get(job.group, 0) >= self.limit(
+                job.group
+            ):
+                self._parked.setdefault(job.group, deque()).append(entry)
+                self._parked_count += 1
+                continue
+            self._unwait(job.group)
+            await self._run(job)
+
+    def _unwait(self, group: Optional[Hashable]) -> None:
+        remaining = self._waiting[group] - 1
+        if remaining:
+            self._waiting[group] = remaining
+        else:
+            del self._waiting[group]
+
+    async def _run(self, job: _Job) -> None:
+        self._running[job.group] = self._running.get(job.group, 0) + 1
+        try:
+            result = await job.run()
+        except asyncio.CancelledError:
+            job.future.cancel()
+            raise
+        except Exception as e:
+            self.failed += 1
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            self.completed += 1
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            self._release(job.group)
+
+    def _release(self, group: Optional[Hashable]) -> None:
+        """Free a group's slot and requeue the next job parked on it"""
+        remaining = self._running[group] - 1
+        if remaining:
+            self._running[group] = remaining
+        else:
+            del self._running[group]
+
+        parked = self._parked.get(group)
+        if parked:
+            self._queue.put_nowait(parked.popleft())
+            self._parked_count -= 1
+            if not parked:
+                del self._parked[group]
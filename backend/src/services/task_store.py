@@ -0,0 +1,190 @@
+"""
+Task Store
+Live tasks plus a bounded, expiring archive of finished ones
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from collections import OrderedDict
+import sys
+import time
+
+TASK_FIELDS = (
+    "id",
+    "agent_id",
+    "input",
+    "output",
+    "status",
+    "created_at",
+    "completed_at",
+    "error",
+    "attempts",
+)
+
+FINISHED_STATUSES = frozenset({"completed", "failed"})
+
+
+class TaskRecord:
+    """Slotted, read-only form of a finished task kept in the archive"""
+
+    __slots__ = TASK_FIELDS
+
+    def __init__(self, **fields: Any):
+        for name in TASK_FIELDS:
+            setattr(self, name, fields[name])
+
+
+class TaskStore:
+    """
+    Tasks by ID with retention for finished tasks.
+
+    Pending, queued and running tasks are kept as live objects. ``finish``
+    moves a task into the archive as a compact record; archived tasks
+    expire ``ttl`` seconds after they finish and the oldest are evicted
+    once more than ``max_finished`` are kept. Lookups of archived tasks
+    return a fresh task object.
+
+    Tasks added as pending are tracked until ``start`` is called for them.
+    ``abandoned`` hands back those left pending for ``pending_ttl``
+    seconds, and the oldest beyond ``max_pending``, for the owner to
+    finish, so tasks that are created but never submitted do not
+    accumulate.
+    """
+
+    def __init__(
+        self,
+        task_type: Callable[..., Any],
+        max_finished: int,
+        ttl: float,
+        max_pending: int = 0,
+        pending_ttl: float = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._task_type = task_type
+        self.max_finished = max_finished
+        self.ttl = ttl
+        self.max_pending = max_pending
+        self.pending_ttl = pending_ttl
+        self._clock = clock
+        self._live: Dict[str, Any] = {}
+        self._pending: "OrderedDict[str, float]" = OrderedDict()
+        self._archive: "OrderedDict[str, Tuple[float, TaskRecord]]" = OrderedDict()
+        self.archived = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.abandons = 0
+
+    def __len__(self) -> int:
+        return len(self._live) + len(self._archive)
+
+    def __contains__(self, task_id: object) -> bool:
+        return task_id in self._live or task_id in self._archive
+
+    def add(self, task: Any) -> None:
+        """Store a new task"""
+        self._expire()
+        self._live[task.id] = task
+        if task.status == "pending":
+            self._pending[task.id] = self._clock() + self.pending_ttl
+
+    def start(self, task_id: str) -> None:
+        """Stop tracking a task as pending once it has been submitted"""
+        self._pending.pop(task_id, None)
+
+    def abandoned(self) -> List[Any]:
+        """
+        Pending tasks past ``pending_ttl`` or beyond ``max_pending``,
+        oldest first; they are no longer tracked as pending
+        """
+        tasks = []
+        now = self._clock()
+        while self._pending:
+            task_id, expires_at = next(iter(self._pending.items()))
+            expired = self.pending_ttl > 0 and expires_at <= now
+            over = 0 < self.max_pending < len(self._pending)
+            if not expired and not over:
+                break
+            del self._pending[task_id]
+            task = self._live.get(task_id)
+            if task is not None:
+                tasks.append(task)
+        self.abandons += len(tasks)
+        return tasks
+
+    def get(self, task_id: str) -> Optional[Any]:
+        """Get a live task, or a copy of an archived one"""
+        task = self._live.get(task_id)
+        if task is not None:
+            return task
+
+        self._expire()
+        entry = self._archive.get(task_id)
+        if entry is None:
+            return None
+        record = entry[1]
+        return self._task_type(**{name: getattr(record, name) for name in TASK_FIELDS})
+
+    def discard(self, task_id: str) -> Optional[Any]:
+        """Forget a live task without archiving it; returns the task"""
+        self._pending.pop(task_id, None)
+        return self._live.pop(task_id, None)
+
+    def finish(self, task_id: str) -> None:
+        """Move a finished task into the archive"""
+        task = self._live.get(task_id)
+        if task is None or task.status not in FINISHED_STATUSES:
+            return
+        del self._live[task_id]
+        self._pending.pop(task_id, None)
+        if self.max_finished <= 0:
+            self.evictions += 1
+            return
+
+        record = TaskRecord(
+            id=task.id,
+            agent_id=sys.intern(task.agent_id),
+            input=task.input,
+            output=task.output,
+            status=sys.intern(task.status),
+            created_at=task.created_at,
+            completed_at=task.completed_at,
+            error=task.error,
+            attempts=task.attempts,
+        )
+        self._archive[task_id] = (self._clock() + self.ttl, record)
+        self.archived += 1
+
+        while len(self._archive) > self.max_finished:
+            self._archive.popitem(last=False)
+            self.evictions += 1
+        self._expire()
+
+    def clear(self) -> None:
+        """Drop all tasks"""
+        self._live.clear()
+        self._pending.clear()
+        self._archive.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Task counts and retention counters"""
+        self._expire()
+        return {
+            "live": len(self._live),
+            "pending": len(self._pending),
+            "archived": len(self._archive),
+            "max_finished": self.max_finished,
+            "ttl": self.ttl,
+            "total_archived": self.archived,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "abandoned": self.abandons,
+        }
+
+    def _expire(self) -> None:
+        """Drop archived tasks past their TTL, oldest first"""
+        now = self._clock()
+        while self._archive:
+            task_id, (expires_at, _) = next(iter(self._archive.items()))
+            if expires_at > now:
+                break
+            del self._archive[task_id]
+            self.expirations += 1
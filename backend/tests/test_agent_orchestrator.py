@@ -0,0 +1,116 @@
+"""
+Agent orchestrator tests
+"""
+
+import asyncio
+
+import pytest
+
+from src.config.settings import settings
+from src.services.agent_orchestrator import AgentOrchestrator
+
+
+@pytest.fixture
+async def orchestrator():
+    orchestrator = AgentOrchestrator()
+    await orchestrator.initialize()
+    yield orchestrator
+    await orchestrator.cleanup()
+
+
+async def test_cancelled_task_is_finished(orchestrator):
+    async def hang(agent, task):
+        await asyncio.sleep(60)
+        yield "never"
+
+    orchestrator._perform = hang
+    task = await orchestrator.create_task("data-agent", "hang")
+    await orchestrator.submit_task(task.id)
+    while task.status != "running":
+        await asyncio.sleep(0.01)
+
+    await orchestrator._scheduler.stop()
+
+    assert task.status == "failed"
+    assert task.error == "Task was cancelled"
+    assert task.completed_at is not None
+    assert orchestrator._task_states["running"] == 0
+
+
+async def test_timeout_covers_all_attempts(orchestrator, monkeypatch):
+    monkeypatch.setattr(settings, "AGENT_TIMEOUT", 0.3)
+    monkeypatch.setattr(settings, "TASK_RETRY_BACKOFF_BASE", 0.0)
+    orchestrator._agents["data-agent"].config.retry_count = 5
+
+    async def slow(agent, task):
+        await asyncio.sleep(0.2)
+        raise RuntimeError("flaky")
+        yield
+
+    orchestrator._perform = slow
+    task = await orchestrator.create_task("data-agent", "slow")
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await orchestrator.execute_task(task.id)
+
+    assert task.status == "failed"
+    assert task.error == "Task timed out after 0.3s"
+    assert task.attempts == 2
+    assert loop.time() - started < 0.5
+
+
+async def test_task_store_stays_bounded(monkeypatch):
+    monkeypatch.setattr(settings, "TASK_RETENTION_MAX_FINISHED", 50)
+    monkeypatch.setattr(settings, "TASK_PENDING_MAX", 20)
+    monkeypatch.setattr(settings, "TASK_COALESCE_DUPLICATES", False)
+    monkeypatch.setattr(settings, "TASK_RESULT_CACHE_SIZE", 0)
+    orchestrator = AgentOrchestrator()
+    await orchestrator.initialize()
+
+    async def instant(agent, task):
+        yield "done"
+
+    orchestrator._perform = instant
+    try:
+        for cycle in range(40):
+            tasks = await orchestrator.create_tasks(
+                [("data-agent", f"job {cycle}-{i}") for i in range(10)]
+            )
+            await orchestrator.submit_tasks(tasks)
+            for task in tasks:
+                await orchestrator.wait_task(task)
+            # Created and never submitted
+            await orchestrator.create_task("coding-agent", f"orphan {cycle}")
+
+            assert len(orchestrator._tasks) <= 50 + 20
+
+        states = orchestrator._task_states
+        assert states["completed"] == 400
+        assert states["pending"] == orchestrator._tasks.stats()["pending"] <= 20
+        assert states["pending"] + states["failed"] == 40
+    finally:
+        await orchestrator.cleanup()
+
+
+async def test_follower_of_cancelled_task_is_finished(orchestrator):
+    async def hang(agent, task):
+        await asyncio.sleep(60)
+        yield "never"
+
+    orchestrator._perform = hang
+    leader = await orchestrator.create_task("data-agent", "same input")
+    follower = await orchestrator.create_task("data-agent", "same  input")
+    await orchestrator.submit_task(leader.id)
+    await orchestrator.submit_task(follower.id)
+    events = orchestrator.subscribe_task(follower.id)
+
+    await orchestrator._scheduler.stop()
+    await asyncio.sleep(0)
+
+    assert follower.status == "failed"
+    assert follower.error == "Task was cancelled"
+    assert follower.completed_at is not None
+    assert orchestrator._task_states["queued"] == 0
+    assert follower.id not in orchestrator._tasks._live
+    event = await events.get(timeout=1)
+    assert event is not None and event.final
@@ -0,0 +1,19 @@
+"""
+Agents API tests
+"""
+
+from fastapi.testclient import TestClient
+
+from src.main import app
+
+
+def test_install_skills_of_built_in_agent():
+    with TestClient(app) as client:
+        response = client.post("/api/agents/coding-agent/skills/install")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "partial"
+    assert body["installed"] == ["github", "docker-essentials"]
+    assert body["missing"] == ["git-essentials", "coding-agent"]
+    assert body["total"] == 2
@@ -0,0 +1,34 @@
+"""
+Execution policy tests
+"""
+
+import asyncio
+
+import pytest
+
+from src.services.execution_policy import (
+    CircuitBreaker,
+    ExecutionPolicy,
+    PolicyCounters,
+)
+
+
+async def test_no_retry_starts_after_the_deadline():
+    loop = asyncio.get_running_loop()
+    policy = ExecutionPolicy(retries=5, backoff_base=0.0, deadline=loop.time() + 0.05)
+    breaker = CircuitBreaker("agent", failure_threshold=100, reset_timeout=60)
+    counters = PolicyCounters()
+    calls = 0
+
+    async def attempt() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.03)
+        raise RuntimeError("flaky")
+
+    with pytest.raises(RuntimeError):
+        await policy.run(attempt, breaker, counters)
+
+    assert calls == 2
+    assert counters.retries == 1
+    assert breaker.stats()["consecutive_failures"] == 2
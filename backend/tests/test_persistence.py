@@ -0,0 +1,44 @@
+"""
+Write-behind store tests
+"""
+
+import asyncio
+
+import pytest
+
+from src.services.agent_orchestrator import Task
+from src.services.persistence import WriteBehindStore
+
+pytest.importorskip("aiosqlite")
+
+
+async def test_close_keeps_the_batch_being_flushed(tmp_path):
+    url = f"sqlite:///{tmp_path / 'athena.db'}"
+    store = WriteBehindStore(url, batch_size=1, flush_interval=60, max_backlog=100)
+    await store.start()
+
+    writing = asyncio.Event()
+    write = store._write
+
+    async def slow_write(*args):
+        writing.set()
+        await asyncio.sleep(0.1)
+        await write(*args)
+
+    store._write = slow_write
+    task = Task(id="t1", agent_id="coding-agent", input="hi", status="completed")
+    store.record_task(task)
+    await writing.wait()
+    store.record_install("github")
+
+    # Closes while the flusher is in the middle of writing the task
+    await store.close()
+
+    reopened = WriteBehindStore(url, batch_size=1, flush_interval=60, max_backlog=100)
+    await reopened.start()
+    try:
+        row = await reopened.get_task("t1")
+        assert row is not None and row["status"] == "completed"
+        assert await reopened.load_installs() == {"github": 1}
+    finally:
+        await reopened.close()
@@ -0,0 +1,31 @@
+"""
+Profiler tests
+"""
+
+from datetime import datetime
+
+from src.services.profiler import RequestProfiler
+
+
+def _profile(profiler: RequestProfiler, duration: float) -> None:
+    profile = profiler.start()
+    assert profile is not None
+    profiler.finish(profile, "GET", "/", 200, duration, datetime.utcnow())
+
+
+def test_keeps_nothing_when_slowest_is_zero():
+    profiler = RequestProfiler(admin_token="", sample_rate=1.0, slowest=0)
+
+    _profile(profiler, 0.5)
+
+    assert profiler.profiles() == []
+    assert profiler.stats()["profiled"] == 1
+
+
+def test_keeps_the_slowest_profiles():
+    profiler = RequestProfiler(admin_token="", sample_rate=1.0, slowest=2)
+
+    for duration in (0.1, 0.3, 0.2, 0.05):
+        _profile(profiler, duration)
+
+    assert [entry.duration for entry in profiler.profiles()] == [0.3, 0.2]
@@ -0,0 +1,38 @@
+"""
+Skill executor tests
+"""
+
+import threading
+
+import httpx
+
+from src.services.skill_executor import ExecutionMode, SkillExecutor
+
+
+def _parse(body: str) -> str:
+    return f"{body} parsed on {threading.current_thread().name}"
+
+
+async def test_skill_calls_out_on_the_loop_and_offloads_parsing():
+    requests = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append((request.url.path, threading.current_thread()))
+        return httpx.Response(200, text="results")
+
+    async def search_skill(executor, mode, input_text):
+        response = await executor.http_client.get(
+            "https://search.example/q", params={"q": input_text}
+        )
+        return await executor.run(mode, _parse, response.text)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handle)) as client:
+        executor = SkillExecutor(http_client=client)
+        try:
+            output = await search_skill(executor, ExecutionMode.THREAD, "docker")
+        finally:
+            executor.shutdown()
+
+    assert requests == [("/q", threading.current_thread())]
+    assert output.startswith("results parsed on skill")
+    assert executor.stats()["runs"]["thread"] == 1
@@ -0,0 +1,288 @@
+"""
+Skill Index tests
+SkillIndex answers compared with the linear scan it replaced
+"""
+
+import base64
+import json
+import random
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from src.services.skill_index import SkillIndex
+from src.services.skill_registry import _decode_cursor
+
+WORDS = [
+    "docker",
+    "github",
+    "search",
+    "deep",
+    "research",
+    "frontend",
+    "design",
+    "kubernetes",
+    "api",
+    "data",
+    "pipeline",
+    "agent",
+    "web",
+    "browser",
+    "test",
+]
+CATEGORIES = ["devops", "git-github", "search-research", "frontend", "ai-llms"]
+TAGS = ["cli", "cloud", "python", "rust", "llm", "docs"]
+AUTHORS = ["athena", "community", "acme"]
+
+
+def _random_skill(rng: random.Random, skill_id: str) -> Dict[str, Any]:
+    def phrase(count: int) -> str:
+        words = [rng.choice(WORDS) for _ in range(count)]
+        return " ".join(
+            word.capitalize() if rng.random() < 0.3 else word for word in words
+        )
+
+    return {
+        "id": skill_id,
+        "name": phrase(rng.randint(1, 3)),
+        "description": phrase(rng.randint(0, 8)),
+        "category": rng.choice(CATEGORIES),
+        "tags": rng.sample(TAGS, rng.randint(0, 3)),
+        "author": rng.choice(AUTHORS),
+        "is_active": rng.random() < 0.8,
+    }
+
+
+def _linear_search(
+    skills: Dict[str, Dict[str, Any]],
+    query: str = "",
+    category: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+) -> List[str]:
+    """The registry's search before the index, over skills in catalog order"""
+    results = []
+    for skill in skills.values():
+        if category and skill["category"] != category:
+            continue
+        if tags and not any(tag in skill["tags"] for tag in tags):
+            continue
+        if query:
+            query_lower = query.lower()
+            if (
+                query_lower not in skill["name"].lower()
+                and query_lower not in skill["description"].lower()
+            ):
+                continue
+        results.append(skill["id"])
+    return results
+
+
+def _linear_facets(skills: Dict[str, Dict[str, Any]], ids: List[str]) -> Dict[str, Any]:
+    categories: Dict[str, int] = {}
+    tags: Dict[str, int] = {}
+    authors: Dict[str, int] = {}
+    inactive = 0
+    for skill_id in ids:
+        skill = skills[skill_id]
+        categories[skill["category"]] = categories.get(skill["category"], 0) + 1
+        authors[skill["author"]] = authors.get(skill["author"], 0) + 1
+        for tag in set(skill["tags"]):
+            tags[tag] = tags.get(tag, 0) + 1
+        inactive += not skill["is_active"]
+    return {
+        "categories": categories,
+        "tags": tags,
+        "authors": authors,
+        "active": {"active": len(ids) - inactive, "inactive": inactive},
+    }
+
+
+def _index(index: SkillIndex, skill: Dict[str, Any]) -> None:
+    index.add(
+        skill["id"],
+        skill["name"],
+        skill["description"],
+        skill["category"],
+        skill["tags"],
+        author=skill["author"],
+        is_active=skill["is_active"],
+    )
+
+
+def _random_query(
+    rng: random.Random, skills: Dict[str, Dict[str, Any]]
+) -> Dict[str, Any]:
+    query = ""
+    roll = rng.random()
+    if roll < 0.5 and skills:
+        skill = skills[rng.choice(list(skills))]
+        text = rng.choice([skill["name"], skill["description"]]) or skill["name"]
+        start = rng.randrange(len(text))
+        query = text[start : start + rng.randint(1, 8)]
+        if rng.random() < 0.3:
+            query = query.upper()
+    elif roll < 0.7:
+        query = rng.choice(WORDS + ["zzz", "ck", "a"])
+    return {
+        "query": query,
+        "category": rng.choice(CATEGORIES) if rng.random() < 0.3 else None,
+        "tags": rng.sample(TAGS, rng.randint(1, 2)) if rng.random() < 0.3 else None,
+    }
+
+
+def _mutate(
+    rng: random.Random,
+    index: SkillIndex,
+    skills: Dict[str, Dict[str, Any]],
+    removed: Dict[str, Dict[str, Any]],
+    next_id: List[int],
+) -> None:
+    """Apply one random change to both the index and the reference catalog"""
+    roll = rng.random()
+    if roll < 0.3 or not skills:
+        skill = _random_skill(rng, f"skill-{next_id[0]}")
+        next_id[0] += 1
+        skills[skill["id"]] = skill
+        _index(index, skill)
+    elif roll < 0.5:
+        skill_id = rng.choice(list(skills))
+        removed[skill_id] = skills.pop(skill_id)
+        index.remove(skill_id)
+    elif roll < 0.65 and removed:
+        # Re-adding appends the skill at the end of catalog order
+        skill_id = rng.choice(list(removed))
+        skills[skill_id] = removed.pop(skill_id)
+        _index(index, skills[skill_id])
+    elif roll < 0.8:
+        # Updating keeps the skill's position
+        skill_id = rng.choice(list(skills))
+        skill = _random_skill(rng, skill_id)
+        skills[skill_id] = skill
+        _index(index, skill)
+    else:
+        skill = skills[rng.choice(list(skills))]
+        skill["is_active"] = not skill["is_active"]
+        index.set_active(skill["id"], skill["is_active"])
+
+
+def _assert_equivalent(
+    rng: random.Random, index: SkillIndex, skills: Dict[str, Dict[str, Any]]
+) -> None:
+    assert len(index) == len(skills)
+    assert index.facets() == _linear_facets(skills, list(skills))
+    assert index.category_counts() == _linear_facets(skills, list(skills))["categories"]
+
+    for _ in range(20):
+        filters = _random_query(rng, skills)
+        expected = _linear_search(skills, **filters)
+        candidates = index.match(**filters)
+
+        total = len(index) if candidates is None else len(candidates)
+        assert total == len(expected), filters
+        if candidates is not None:
+            assert index.facets(candidates) == _linear_facets(skills, expected)
+
+        offset = rng.randint(0, 10)
+        limit = rng.randint(1, 10)
+        assert (
+            index.page(candidates, offset, limit) == expected[offset : offset + limit]
+        )
+
+        # Walking every page by cursor visits the full result in order
+        walked: List[str] = []
+        after = None
+        while True:
+            page = index.page(candidates, 0, limit, after=after)
+            if not page:
+                break
+            walked.extend(page)
+            after = index.position(page[-1])
+        assert walked == expected
+
+        by_term = index.match_terms(**filters)
+        for skill_id in rng.sample(list(skills), min(5, len(skills))):
+            assert index.matches(skill_id, **filters) == (skill_id in expected)
+            assert index.matches(skill_id, **filters, terms=True) == (
+                by_term is None or skill_id in by_term
+            )
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_matches_linear_scan_through_random_changes(seed):
+    rng = random.Random(seed)
+    index = SkillIndex()
+    skills: Dict[str, Dict[str, Any]] = {}
+    removed: Dict[str, Dict[str, Any]] = {}
+    next_id = [0]
+
+    for _ in range(rng.randint(20, 80)):
+        _mutate(rng, index, skills, removed, next_id)
+    _assert_equivalent(rng, index, skills)
+
+    for _ in range(10):
+        for _ in range(rng.randint(1, 15)):
+            _mutate(rng, index, skills, removed, next_id)
+        _assert_equivalent(rng, index, skills)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_copy_diverges_without_changing_parent(seed):
+    rng = random.Random(seed)
+    parent = SkillIndex()
+    skills: Dict[str, Dict[str, Any]] = {}
+    removed: Dict[str, Dict[str, Any]] = {}
+    next_id = [0]
+    for _ in range(50):
+        _mutate(rng, parent, skills, removed, next_id)
+
+    frozen = {
+        skill_id: dict(skill, tags=list(skill["tags"]))
+        for skill_id, skill in skills.items()
+    }
+    child = parent.copy()
+    child_skills = {skill_id: dict(skill) for skill_id, skill in skills.items()}
+    for _ in range(30):
+        _mutate(rng, child, child_skills, dict(removed), next_id)
+
+    _assert_equivalent(rng, child, child_skills)
+    _assert_equivalent(rng, parent, frozen)
+
+
+def test_state_round_trip_keeps_answers():
+    rng = random.Random(42)
+    index = SkillIndex()
+    skills: Dict[str, Dict[str, Any]] = {}
+    removed: Dict[str, Dict[str, Any]] = {}
+    next_id = [0]
+    for _ in range(100):
+        _mutate(rng, index, skills, removed, next_id)
+
+    _assert_equivalent(rng, SkillIndex.from_state(index.dump_state()), skills)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rank_unscored_keeps_substring_matches(seed):
+    rng = random.Random(seed)
+    index = SkillIndex()
+    skills: Dict[str, Dict[str, Any]] = {}
+    for position in range(60):
+        skill = _random_skill(rng, f"skill-{position}")
+        skills[skill["id"]] = skill
+        _index(index, skill)
+
+    for query in ["dock", "docker", "earch", "api data", "zzz"]:
+        expected = _linear_search(skills, query)
+        candidates = index.match(query)
+        ranked = index.rank(query, candidates, 0, len(skills), unscored=True)
+        assert sorted(skill_id for skill_id, _ in ranked) == sorted(expected)
+        scores = [score for _, score in ranked]
+        assert scores == sorted(scores, reverse=True)
+
+
+@pytest.mark.parametrize(
+    "payload", [[0, -5, 0], [0, True, 0], [0, 1.5, 0], [1, 0, "x"]]
+)
+def test_decode_cursor_rejects_bad_positions(payload):
+    cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        _decode_cursor(cursor.rstrip("="), bool(payload[0]))
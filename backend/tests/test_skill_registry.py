@@ -0,0 +1,120 @@
+"""
+Skill Registry Tests
+Query cache invalidation, warm starts from a snapshot and catalog
+replication between workers
+"""
+
+import asyncio
+import dataclasses
+
+from src.config.settings import settings
+from src.services.skill_registry import CatalogChange, SkillRegistry
+from src.services.skill_snapshot import FINGERPRINT_SIZE
+from src.services.state_backend import InMemoryStateBackend
+
+
+async def _until(condition, timeout: float = 1.0) -> None:
+    """Wait for a message to be delivered"""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+async def _renamed(registry: SkillRegistry, skill_id: str, name: str) -> None:
+    skill = await registry.get_skill(skill_id)
+    await registry.apply_changes(
+        [CatalogChange.upsert(dataclasses.replace(skill, name=name))]
+    )
+
+
+async def test_ranked_facets_follow_deactivation_of_term_match():
+    registry = SkillRegistry()
+    await registry.initialize()
+
+    # Both skills match by term but not as a substring; only one is on the
+    # page, so dropping cached pages that show it does not cover the other
+    query = "docker research"
+    before = await registry.query_skills(query, limit=1, ranked=True, facets=True)
+    assert before.total == 2
+    assert before.facets["active"] == {"active": 2, "inactive": 0}
+
+    (off_page,) = {"docker-essentials", "deep-research"} - set(before.skill_ids)
+    assert await registry.deactivate_skill(off_page)
+    after = await registry.query_skills(query, limit=1, ranked=True, facets=True)
+    assert after.facets["active"] == {"active": 1, "inactive": 1}
+
+
+async def test_warm_start_does_not_load_skills(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SKILLS_SNAPSHOT_PATH", str(tmp_path / "skills"))
+    await SkillRegistry().initialize()
+
+    async def fail():
+        raise AssertionError("skills loaded despite a current snapshot")
+
+    registry = SkillRegistry()
+    monkeypatch.setattr(registry, "_load_skills", fail)
+    await registry.initialize()
+    assert await registry.count() == 5
+    assert (await registry.get_skill("github")).name == "GitHub"
+
+
+async def test_changed_source_reloads_skills(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SKILLS_SNAPSHOT_PATH", str(tmp_path / "skills"))
+    await SkillRegistry().initialize()
+
+    async def changed_version():
+        return b"\x01" * FINGERPRINT_SIZE
+
+    registry = SkillRegistry()
+    monkeypatch.setattr(registry, "_source_version", changed_version)
+    loads = []
+    load_skills = registry._load_skills
+
+    async def counted_load():
+        loads.append(1)
+        return await load_skills()
+
+    monkeypatch.setattr(registry, "_load_skills", counted_load)
+    await registry.initialize()
+    assert loads == [1]
+    assert await registry.count() == 5
+
+
+async def test_late_worker_catches_up_from_the_catalog_log():
+    backend = InMemoryStateBackend(shared=True)
+    first = SkillRegistry(backend=backend)
+    await first.initialize()
+    await _renamed(first, "github", "GitHub CLI")
+    assert await first.deactivate_skill("deep-research")
+    await first.install_skills(["brave-search"])
+
+    late = SkillRegistry(backend=backend)
+    await late.initialize()
+    assert (await late.get_skill("github")).name == "GitHub CLI"
+    assert not (await late.get_skill("deep-research")).is_active
+    assert (await late.get_skill("brave-search")).usage_count == 1
+
+    # Changes after it joined arrive as messages
+    await _renamed(first, "github", "GitHub")
+    await _until(lambda: late._state.skills["github"].name == "GitHub")
+
+
+async def test_worker_reads_a_dropped_message_from_the_catalog_log(monkeypatch):
+    backend = InMemoryStateBackend(shared=True)
+    writer, reader = SkillRegistry(backend=backend), SkillRegistry(backend=backend)
+    await writer.initialize()
+    await reader.initialize()
+
+    publish = backend.publish
+
+    async def drop(channel, message):
+        pass
+
+    monkeypatch.setattr(backend, "publish", drop)
+    await _renamed(writer, "github", "GitHub CLI")
+    monkeypatch.setattr(backend, "publish", publish)
+    await _renamed(writer, "brave-search", "Brave")
+
+    await _until(lambda: reader._state.skills["brave-search"].name == "Brave")
+    assert (await reader.get_skill("github")).name == "GitHub CLI"
@@ -0,0 +1,43 @@
+"""
+Skill snapshot tests
+"""
+
+import pytest
+
+from src.services.skill_index import SkillIndex
+from src.services.skill_snapshot import SkillSnapshot, SnapshotError
+
+FINGERPRINT = b"\x01" * 16
+
+
+def _write(path, fingerprint=FINGERPRINT):
+    records = {"a": {"id": "a", "name": "Alpha"}, "b": {"id": "b", "name": "Beta"}}
+    SkillSnapshot.write(str(path), records, SkillIndex().dump_state(), fingerprint)
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "skills.snapshot"
+    _write(path)
+
+    snapshot = SkillSnapshot(str(path), FINGERPRINT)
+    try:
+        assert sorted(snapshot.ids()) == ["a", "b"]
+        assert snapshot.record("b") == {"id": "b", "name": "Beta"}
+    finally:
+        snapshot.close()
+
+
+def test_rejects_other_catalog(tmp_path):
+    path = tmp_path / "skills.snapshot"
+    _write(path)
+
+    with pytest.raises(SnapshotError):
+        SkillSnapshot(str(path), b"\x02" * 16)
+
+
+def test_rejects_stale(tmp_path):
+    path = tmp_path / "skills.snapshot"
+    _write(path)
+
+    with pytest.raises(SnapshotError):
+        SkillSnapshot(str(path), FINGERPRINT, max_age=-1)
@@ -0,0 +1,45 @@
+"""
+Skill store tests
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from src.services.skill_registry import Skill
+from src.services.skill_store import SkillStore
+
+
+def _skill(**fields):
+    return Skill(
+        id="a",
+        name="Alpha",
+        description="First",
+        category="tools",
+        author="athena",
+        version="1.0.0",
+        **fields,
+    )
+
+
+def test_naive_timestamps_stay_naive():
+    store = SkillStore(Skill)
+    created = datetime(2024, 5, 1, 12, 30, 0, 123456)
+    store.put(_skill(created_at=created, updated_at=created))
+
+    assert store["a"].created_at == created
+    assert store["a"].created_at.tzinfo is None
+
+
+def test_aware_timestamps_come_back_in_utc():
+    store = SkillStore(Skill)
+    created = datetime(2024, 5, 1, 14, 30, tzinfo=timezone(timedelta(hours=2)))
+    store.put(_skill(created_at=created, updated_at=created))
+
+    skill = store["a"]
+    assert skill.created_at == created
+    assert skill.created_at.tzinfo is timezone.utc
+    assert skill.created_at.hour == 12
+
+    later = datetime(2024, 6, 1, tzinfo=timezone.utc)
+    store.update("a", updated_at=later)
+    assert store["a"].updated_at == later
+    assert store["a"].updated_at.tzinfo is timezone.utc
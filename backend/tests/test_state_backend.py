@@ -0,0 +1,114 @@
+"""
+State backend tests
+Near caches sharing a backend, in memory and over Redis
+"""
+
+import asyncio
+
+import pytest
+
+from src.services.state_backend import (
+    InMemoryStateBackend,
+    NearCache,
+    RedisStateBackend,
+)
+
+
+async def _until(condition, timeout: float = 1.0) -> None:
+    """Wait for a message to be delivered"""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+async def redis_backends(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    import redis.asyncio as redis
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        redis.Redis,
+        "from_url",
+        lambda url, **kwargs: fakeredis.FakeAsyncRedis(server=server),
+    )
+    backends = [RedisStateBackend("redis://fake"), RedisStateBackend("redis://fake")]
+    for backend in backends:
+        await backend.start()
+    yield backends
+    for backend in backends:
+        await backend.close()
+
+
+async def _near_caches(first, second):
+    changed = []
+    caches = [
+        NearCache(first, "tasks", max_entries=100, ttl=60),
+        NearCache(
+            second, "tasks", max_entries=100, ttl=60, on_invalidate=changed.append
+        ),
+    ]
+    for cache in caches:
+        await cache.start()
+    return caches, changed
+
+
+async def _check_shared_near_caches(caches, changed):
+    writer, reader = caches
+
+    await writer.set_many({"a": b"1", "b": b"2"})
+    await _until(lambda: changed)
+    assert changed == [{"a", "b"}]
+    assert await reader.get_many(["a", "b", "c"]) == {"a": b"1", "b": b"2"}
+    assert reader.stats()["remote_hits"] == 2
+
+    # The reader's local copy is dropped when the writer changes the key
+    await writer.set_many({"a": b"3"})
+    await _until(lambda: len(changed) == 2)
+    assert changed[1] == {"a"}
+    assert await reader.get_many(["a", "b"]) == {"a": b"3", "b": b"2"}
+    assert reader.stats()["remote_hits"] == 3
+
+    # Writers ignore their own invalidations
+    assert writer.stats()["remote_invalidations"] == 0
+
+
+async def test_near_caches_over_shared_memory_backend():
+    backend = InMemoryStateBackend(shared=True)
+    caches, changed = await _near_caches(backend, backend)
+
+    await _check_shared_near_caches(caches, changed)
+
+
+async def test_near_caches_over_redis(redis_backends):
+    caches, changed = await _near_caches(*redis_backends)
+
+    await _check_shared_near_caches(caches, changed)
+    assert redis_backends[1].stats()["received"] >= 2
+
+
+async def test_redis_get_many_uses_one_mget(redis_backends):
+    backend = redis_backends[0]
+    await backend.set_many({"x": b"1", "y": b"2"}, ttl=60)
+    trips = backend.round_trips
+
+    assert await backend.get_many(["x", "missing", "y"]) == [b"1", None, b"2"]
+    assert backend.round_trips == trips + 1
+    assert await backend.get_many([]) == []
+
+
+async def test_redis_add_many_sets_only_new_keys(redis_backends):
+    first, second = redis_backends
+    assert await first.add_many({"claim:1": b"a", "claim:2": b"a"}, ttl=60) == [
+        True,
+        True,
+    ]
+    trips = second.round_trips
+
+    assert await second.add_many({"claim:2": b"b", "claim:3": b"b"}, ttl=60) == [
+        False,
+        True,
+    ]
+    assert second.round_trips == trips + 1
+    assert await first.get_many(["claim:2", "claim:3"]) == [b"a", b"b"]
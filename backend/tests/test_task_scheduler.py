@@ -0,0 +1,40 @@
+"""
+Task scheduler tests
+"""
+
+import pytest
+
+from src.services.task_scheduler import SchedulerFullError, TaskScheduler
+
+
+async def _job():
+    return None
+
+
+async def test_reserved_room_is_not_taken_by_other_submitters():
+    scheduler = TaskScheduler(max_workers=1, max_per_group=1, max_queue=4)
+
+    with scheduler.reserve(3) as reservation:
+        scheduler.submit(_job)
+        with pytest.raises(SchedulerFullError):
+            scheduler.submit(_job)
+        with pytest.raises(SchedulerFullError):
+            scheduler.reserve(1)
+
+        for _ in range(3):
+            scheduler.submit(_job, reservation=reservation)
+        assert reservation.remaining == 0
+
+    assert len(scheduler) == 4
+    assert not scheduler.has_room()
+
+
+async def test_released_reservation_frees_unused_room():
+    scheduler = TaskScheduler(max_workers=1, max_per_group=1, max_queue=4)
+
+    with scheduler.reserve(4) as reservation:
+        scheduler.submit(_job, reservation=reservation)
+
+    assert scheduler.stats()["reserved"] == 0
+    assert scheduler.has_room(3)
+    assert not scheduler.has_room(4)
@@ -0,0 +1,34 @@
+"""
+Task store tests
+"""
+
+from src.services.agent_orchestrator import Task
+from src.services.task_store import TaskStore
+
+
+def test_pending_tasks_are_abandoned_after_ttl():
+    now = [0.0]
+    store = TaskStore(
+        Task, max_finished=10, ttl=60, pending_ttl=5, clock=lambda: now[0]
+    )
+    stale = Task(id="stale", agent_id="a", input="x")
+    started = Task(id="started", agent_id="a", input="y")
+    store.add(stale)
+    store.add(started)
+    store.start("started")
+
+    assert store.abandoned() == []
+    now[0] = 6.0
+    assert store.abandoned() == [stale]
+    assert store.abandoned() == []
+    assert store.stats()["abandoned"] == 1
+
+
+def test_oldest_pending_tasks_are_abandoned_beyond_limit():
+    store = TaskStore(Task, max_finished=10, ttl=60, max_pending=2)
+    tasks = [Task(id=str(i), agent_id="a", input="x") for i in range(4)]
+    for task in tasks:
+        store.add(task)
+
+    assert store.abandoned() == tasks[:2]
+    assert store.stats()["pending"] == 2
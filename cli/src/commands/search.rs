@@ -8,6 +8,7 @@ use serde::Deserialize;
 #[derive(Deserialize)]
 struct SearchResponse {
     total: u32,
+    next_cursor: Option<String>,
     skills: Vec<SkillResult>,
 }
 
@@ -25,6 +26,7 @@ pub async fn execute(
     query: &str,
     category: Option<&str>,
     limit: u32,
+    all: bool,
 ) -> Result<()> {
     let pb = ProgressBar::new_spinner();
     pb.set_style(
@@ -36,34 +38,50 @@ pub async fn execute(
     pb.enable_steady_tick(std::time::Duration::from_millis(100));
 
     // Build URL with query parameters
-    let mut url = format!("{}/skills?query={}&limit={}", api_url, query, limit);
+    let mut base_url = format!("{}/skills?query={}&limit={}", api_url, query, limit);
     if let Some(cat) = category {
-        url.push_str(&format!("&category={}", cat));
+        base_url.push_str(&format!("&category={}", cat));
     }
 
-    // Make API request
     let client = reqwest::Client::new();
-    let response = client.get(&url).send().await?;
-    
-    pb.finish_and_clear();
+    let mut cursor: Option<String> = None;
+    let mut shown = 0;
 
-    if response.status().is_success() {
-        let data: SearchResponse = response.json().await?;
-        
-        println!("{} {} results for '{}'\n", 
-            "Found".green().bold(), 
-            data.total.to_string().yellow(),
-            query.cyan()
-        );
-
-        if data.skills.is_empty() {
-            println!("{}", "No skills found matching your query.".dimmed());
+    loop {
+        let mut url = base_url.clone();
+        if let Some(c) = &cursor {
+            url.push_str(&format!("&cursor={}", c));
+        }
+
+        // Make API request
+        let response = client.get(&url).send().await?;
+
+        pb.finish_and_clear();
+
+        if !response.status().is_success() {
+            println!("{} Failed to search: {}", "Error:".red().bold(), response.status());
             return Ok(());
         }
 
-        for (i, skill) in data.skills.iter().enumerate() {
-            println!("{}. {} {}", 
-                (i + 1).to_string().dimmed(),
+        let data: SearchResponse = response.json().await?;
+
+        if cursor.is_none() {
+            println!("{} {} results for '{}'\n",
+                "Found".green().bold(),
+                data.total.to_string().yellow(),
+                query.cyan()
+            );
+
+            if data.skills.is_empty() {
+                println!("{}", "No skills found matching your query.".dimmed());
+                return Ok(());
+            }
+        }
+
+        for skill in data.skills.iter() {
+            shown += 1;
+            println!("{}. {} {}",
+                shown.to_string().dimmed(),
                 skill.name.bold(),
                 format!("({})", skill.id).dimmed()
             );
@@ -73,10 +91,14 @@ pub async fn execute(
             println!();
         }
 
-        println!("{}", format!("Run 'athena install <skill-id>' to install a skill").dimmed());
-    } else {
-        println!("{} Failed to search: {}", "Error:".red().bold(), response.status());
+        // Follow the cursor to the next page when streaming every result
+        match data.next_cursor {
+            Some(next) if all => cursor = Some(next),
+            _ => break,
+        }
     }
 
+    println!("{}", format!("Run 'athena install <skill-id>' to install a skill").dimmed());
+
     Ok(())
 }
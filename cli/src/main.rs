@@ -44,6 +44,9 @@ enum Commands {
         /// Maximum results
         #[arg(short, long, default_value = "10")]
         limit: u32,
+        /// Page through every matching skill
+        #[arg(short, long)]
+        all: bool,
     },
 
     /// Install a skill from the registry
@@ -120,8 +123,8 @@ async fn main() -> Result<()> {
 
     // Execute command
     match &cli.command {
-        Commands::Search { query, category, limit } => {
-            commands::search::execute(&cli.api_url, query, category.as_deref(), *limit).await?;
+        Commands::Search { query, category, limit, all } => {
+            commands::search::execute(&cli.api_url, query, category.as_deref(), *limit, *all).await?;
         }
         Commands::Install { skill, force } => {
             commands::install::execute(&cli.api_url, skill, *force).await?;
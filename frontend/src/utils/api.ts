@@ -37,11 +37,13 @@ api.interceptors.response.use(
 
 // API methods
 export const skillsApi = {
-  list: (params?: { query?: string; category?: string; limit?: number; offset?: number }) =>
+  list: (params?: { query?: string; category?: string; limit?: number; offset?: number; ranked?: boolean; cursor?: string }) =>
     api.get('/skills', { params }),
   get: (id: string) => api.get(`/skills/${id}`),
   install: (skillId: string) => api.post('/skills/install', { skill_id: skillId }),
   getCategories: () => api.get('/skills/categories'),
+  listByCategory: (category: string, params?: { limit?: number; cursor?: string }) =>
+    api.get(`/skills/category/${category}`, { params }),
 };
 
 export const agentsApi = {
@@ -50,7 +52,15 @@ export const agentsApi = {
   getStats: () => api.get('/agents/stats'),
   createTask: (agentId: string, input: string) =>
     api.post('/agents/task', { agent_id: agentId, input }),
-  executeTask: (taskId: string) => api.post(`/agents/task/${taskId}/execute`),
+  routeTask: (input: string, skills: string[], agentType?: string) =>
+    api.post('/agents/task', { input, skills, agent_type: agentType }),
+  executeTask: (taskId: string, priority?: number) =>
+    api.post(`/agents/task/${taskId}/execute`, null, { params: { priority } }),
+  getTask: (taskId: string) => api.get(`/agents/task/${taskId}`),
+  streamTask: (taskId: string) => new EventSource(`${API_BASE_URL}/agents/task/${taskId}/events`),
+  streamAgent: (agentId: string) => new EventSource(`${API_BASE_URL}/agents/${agentId}/events`),
+  batchTasks: (tasks: { agent_id: string; input: string }[], options?: { priority?: number; wait?: boolean }) =>
+    api.post('/agents/tasks/batch', { tasks, ...options }),
 };
 
 export const commandsApi = {